@@ -1467,7 +1467,7 @@ exog_symbols_data = [
         "Potential Lead": "5-20 days"
     },
     
-    A# Credit Market & Yield Curve Indicators
+    # Credit Market & Yield Curve Indicators
     {
         "Symbol": "SHY",
         "Title": "1-3 Year Treasury Bond ETF",
@@ -2510,7 +2510,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Consumer confidence signal, predicts discretionary spending and stock trends.",
         "Exchange": "Other (FRED)",
         "Type": "Monthly",
-        "Lag number": 14-28,
+        "Lag number": "14-28",
         "Source": "FRED",
         "Potential Lead": "5-30 days"
     },
@@ -2534,7 +2534,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Housing market signal, predicts real estate stock trends (e.g., DHI).",
         "Exchange": "Other (NAHB)",
         "Type": "Monthly",
-        "Lag number": 7-14,
+        "Lag number": "7-14",
         "Source": "Other (NAHB ~external fetch)",
         "Potential Lead": "5-20 days"
     },
@@ -2547,7 +2547,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Consumer spending signal, predicts retail stock trends (e.g., TGT).",
         "Exchange": "Other (FRED)",
         "Type": "Monthly",
-        "Lag number": 14-21,
+        "Lag number": "14-21",
         "Source": "FRED",
         "Potential Lead": "5-15 days"
     },
@@ -2560,7 +2560,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Manufacturing activity signal, predicts industrial stock trends (e.g., CAT).",
         "Exchange": "Other (ISM)",
         "Type": "Monthly",
-        "Lag number": 7-14,
+        "Lag number": "7-14",
         "Source": "Other (ISM ~external fetch)",
         "Potential Lead": "5-20 days"
     },
@@ -2571,7 +2571,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Services activity signal, predicts service stock trends (e.g., SBUX).",
         "Exchange": "Other (ISM)",
         "Type": "Monthly",
-        "Lag number": 7-14,
+        "Lag number": "7-14",
         "Source": "Other (ISM ~external fetch)",
         "Potential Lead": "5-20 days"
     },
@@ -2582,7 +2582,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Manufacturing signal, predicts industrial stock performance.",
         "Exchange": "Other (Markit)",
         "Type": "Monthly",
-        "Lag number": 7-14,
+        "Lag number": "7-14",
         "Source": "Other (Markit ~external fetch)",
         "Potential Lead": "5-20 days"
     },
@@ -2608,7 +2608,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Discretionary spending signal, predicts consumer stock trends (e.g., MCD).",
         "Exchange": "Other (NRA)",
         "Type": "Monthly",
-        "Lag number": 7-14,
+        "Lag number": "7-14",
         "Source": "Other (NRA ~external fetch)",
         "Potential Lead": "5-15 days"
     },
@@ -2632,7 +2632,7 @@ exog_symbols_data = [
         "Explanation of why it may be important": "Consumer stress signal, rising delinquencies predict weakening consumer stocks (e.g., F).",
         "Exchange": "Other (Experian)",
         "Type": "Quarterly",
-        "Lag number": 30-90,
+        "Lag number": "30-90",
         "Source": "Other (Experian ~external fetch)",
         "Potential Lead": "5-15 days"
     },
@@ -0,0 +1,90 @@
+# benchmarks/bench_accumulation.py
+
+"""
+Compare growing a DataFrame with pd.concat inside the per-ticker loop against
+the columnar BarAccumulator, on a synthetic universe.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_accumulation --tickers 8000 --rows 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.bar_accumulator import BarAccumulator, OHLC_RESULT_COLUMNS
+
+
+def synthetic_bars(n_tickers, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-02', periods=rows).strftime('%Y-%m-%dT05:00:00Z')
+    universe = {}
+    for i in range(n_tickers):
+        prices = 100 + rng.standard_normal(rows).cumsum()
+        universe[f"T{i:05d}"] = [
+            {'t': t, 'o': p, 'h': p + 1, 'l': p - 1, 'c': p, 'v': 1000, 'n': 10, 'vw': p}
+            for t, p in zip(dates, prices)
+        ]
+    return universe
+
+
+def concat_loop(universe):
+    df_all = pd.DataFrame()
+    for ticker, bars in universe.items():
+        df = pd.DataFrame(bars).rename(columns={'o': 'open', 'h': 'high', 'l': 'low', 'c': 'close'})
+        df['ticker'] = ticker
+        df['date'] = df['t'].str[:10]
+        df_all = pd.concat([df_all, df[OHLC_RESULT_COLUMNS]])
+    return df_all
+
+
+def accumulator_loop(universe):
+    accumulator = BarAccumulator(OHLC_RESULT_COLUMNS)
+    for ticker, bars in universe.items():
+        accumulator.add_bars(ticker, bars)
+    return accumulator.to_frame()
+
+
+def open_price_concat(universe):
+    df_all = pd.DataFrame()
+    for ticker, bars in universe.items():
+        df_all = pd.concat([df_all, pd.DataFrame({'ticker': [ticker], 'date': ['2024-01-02'], 'open': [bars[0]['o']]})])
+    return df_all
+
+
+def open_price_accumulator(universe):
+    accumulator = BarAccumulator(['ticker', 'date', 'open'])
+    for ticker, bars in universe.items():
+        accumulator.add_row(ticker, date='2024-01-02', open=bars[0]['o'])
+    return accumulator.to_frame()
+
+
+def timed(func, universe):
+    start = time.perf_counter()
+    result = func(universe)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=8000)
+    parser.add_argument('--rows', type=int, default=5, help='Bars per ticker.')
+    args = parser.parse_args()
+
+    universe = synthetic_bars(args.tickers, args.rows)
+    print(f"{args.tickers} tickers x {args.rows} bars")
+    for label, func in [
+        ('daily bars, pd.concat loop', concat_loop),
+        ('daily bars, BarAccumulator', accumulator_loop),
+        ('open prices, pd.concat loop', open_price_concat),
+        ('open prices, BarAccumulator', open_price_accumulator),
+    ]:
+        seconds, rows = timed(func, universe)
+        print(f"{label:<32} {seconds:8.3f} s  ({rows} rows)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_etl_emulator.py
+
+"""
+ETL download throughput against the local Alpaca emulator.
+
+Compares three ways of pulling daily bars for a universe, with a fixed
+per-request latency standing in for the network round trip:
+
+- one SDK `get_bars` call per ticker (the original loop);
+- `fetch_alpaca_bars_batched` (multi-symbol requests);
+- `download_bars` (concurrent per-ticker requests paced by a token bucket).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_etl_emulator --tickers 500 --latency 0.05
+"""
+
+import argparse
+import time
+
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.alpaca_utils import fetch_alpaca_bars_batched
+from src.utils.alpaca_async import download_bars
+
+
+def per_ticker_loop(client, tickers, start, end):
+    rows = 0
+    for ticker in tickers:
+        rows += len(client.get_bars(ticker, '1Day', start, end, limit=None))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every response.')
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2024-12-31')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    with AlpacaEmulator(n_symbols=args.tickers, start_date=args.start, end_date=args.end,
+                        latency=args.latency) as emulator:
+        client = emulator.client()
+        tickers = emulator.symbols
+        for symbol in tickers:
+            emulator.daily_bars(symbol)  # Generate data up front so only serving is timed
+
+        runs = {
+            'per-ticker get_bars': lambda: per_ticker_loop(client, tickers, args.start, args.end),
+            'multi-symbol batched': lambda: sum(len(f) for f in fetch_alpaca_bars_batched(
+                client, tickers, '1Day', args.start, args.end).values()),
+            'async downloader': lambda: download_bars(
+                tickers, args.start, args.end, key_id=emulator.key_id, secret_key=emulator.secret_key,
+                max_concurrency=args.concurrency, requests_per_minute=10 ** 6)['rows'],
+        }
+        print(f"{args.tickers} tickers, {args.start} to {args.end}, {args.latency * 1000:.0f} ms latency")
+        for name, run in runs.items():
+            before = emulator.stats['requests']
+            start = time.perf_counter()
+            rows = run()
+            seconds = time.perf_counter() - start
+            requests = emulator.stats['requests'] - before
+            print(f"  {name:<22} {seconds:8.2f} s  {requests:6d} requests  {rows / seconds:12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from .etl import (
     populate_prices, 
     populate_tickers,
     recreate_database,
+    sync_universe,
     update_daily_prices,
 )
 
@@ -15,11 +16,14 @@ from .utils import (
     get_db_connection,
     fetch_active_tickers,
     get_latest_price_date,
+    fetch_latest_price_dates,
     last_data_date, 
     last_fetch_date,
     fetch_database_stock_tickers,
     populate_alpaca_full_history,
-    fetch_price_range
+    fetch_price_range,
+    fetch_price_panel,
+    get_price_fingerprint
     )
 
 from .statistics import (
@@ -53,9 +57,11 @@ __all__ = [
     'get_db_connection',
     'fetch_active_tickers',
     'get_latest_price_date',
+    'fetch_latest_price_dates',
     'populate_prices',
     'populate_tickers',
     'recreate_database',
+    'sync_universe',
     'update_daily_prices',
     'plot_stock_trends_with_intervals',
     'last_data_date',
@@ -69,6 +75,8 @@ __all__ = [
     'exp_smooth_ci_pi',
     'sma_smoother',
     'fetch_price_range',
+    'fetch_price_panel',
+    'get_price_fingerprint',
     'ax_smoothed_prices',
     'ax_residuals',
     'ax_log_difference',
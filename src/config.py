@@ -6,5 +6,6 @@ BASE_DIR = Path(__file__).resolve().parent.parent  # Two .parents to reach stat_
 # Directories relative to BASE_DIR
 DB_DIR = BASE_DIR / 'databases'
 LOG_DIR = BASE_DIR / 'logs'
+CACHE_DIR = BASE_DIR / 'cache'
 CREDENTIALS_DIR = BASE_DIR / 'credentials'
 
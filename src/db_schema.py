@@ -47,6 +47,40 @@ DATABASES = {
         );
         """,
         """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_asset_dividends_key
+            ON asset_dividends (asset_id, ex_date, dividend_type);
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_corporate_actions_key
+            ON corporate_actions (asset_id, action_type, action_date);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS corporate_action_pulls (
+            pull_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            since TEXT,
+            until TEXT,
+            requests INTEGER,
+            announcements INTEGER,
+            dividends INTEGER,
+            actions INTEGER,
+            invalidations INTEGER,
+            pulled_at TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS price_invalidations (
+            invalidation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            asset_id INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            reason TEXT,
+            reference TEXT,
+            flagged_at TEXT,
+            cleared_at TEXT,
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
         CREATE TABLE IF NOT EXISTS asset_prices (
             price_id INTEGER PRIMARY KEY AUTOINCREMENT,
             asset_id INTEGER,
@@ -57,9 +91,176 @@ DATABASES = {
             close REAL,
             adjusted_close REAL,
             volume INTEGER,
+            trade_count INTEGER,
+            vwap REAL,
+            fetched_at TEXT,
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_asset_prices_asset_date_fetched
+            ON asset_prices (asset_id, date, fetched_at);
+        """,
+        # Superseded by the covering index above; drop it from older databases.
+        """
+        DROP INDEX IF EXISTS idx_asset_prices_asset_date;
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS asset_prices_intraday (
+            asset_id INTEGER,
+            timestamp TEXT,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            trade_count INTEGER,
+            vwap REAL,
+            fetched_at TEXT,
+            PRIMARY KEY (asset_id, timestamp),
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS price_quarantine (
+            asset_id INTEGER,
+            date TEXT,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            reasons TEXT,
             fetched_at TEXT,
+            PRIMARY KEY (asset_id, date),
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS price_quality (
+            asset_id INTEGER PRIMARY KEY,
+            rows_checked INTEGER DEFAULT 0,
+            rows_quarantined INTEGER DEFAULT 0,
+            ohlc_issues INTEGER DEFAULT 0,
+            nonpositive_issues INTEGER DEFAULT 0,
+            outlier_issues INTEGER DEFAULT 0,
+            duplicate_issues INTEGER DEFAULT 0,
+            score REAL,
+            last_issue_date TEXT,
+            updated_at TEXT,
             FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
         );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS backfill_progress (
+            job_name TEXT,
+            symbol TEXT,
+            asset_id INTEGER,
+            status TEXT,
+            last_date TEXT,
+            rows_written INTEGER DEFAULT 0,
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (job_name, symbol),
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS market_calendar (
+            date TEXT PRIMARY KEY,
+            open TEXT,
+            close TEXT,
+            fetched_at TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS market_calendar_coverage (
+            coverage_id INTEGER PRIMARY KEY CHECK (coverage_id = 1),
+            start_date TEXT,
+            end_date TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS open_capture_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_date TEXT,
+            started_at TEXT,
+            tickers INTEGER,
+            captured INTEGER,
+            rounds INTEGER,
+            calendar_seconds REAL,
+            wait_seconds REAL,
+            snapshot_seconds REAL,
+            total_seconds REAL,
+            after_open_seconds REAL
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS unfillable_price_gaps (
+            asset_id INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            checked_at TEXT,
+            PRIMARY KEY (asset_id, start_date, end_date),
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS price_fingerprints (
+            asset_id INTEGER PRIMARY KEY,
+            last_date TEXT,
+            row_count INTEGER,
+            checksum INTEGER,
+            updated_at TEXT,
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ingest_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT,
+            started_at TEXT,
+            status TEXT,
+            error TEXT,
+            items INTEGER,
+            rows INTEGER,
+            requests INTEGER,
+            retries INTEGER,
+            throttled INTEGER,
+            request_seconds REAL,
+            wait_seconds REAL,
+            decode_seconds REAL,
+            transform_seconds REAL,
+            write_seconds REAL,
+            total_seconds REAL,
+            rows_per_second REAL,
+            latency_p50 REAL,
+            latency_p90 REAL,
+            latency_p99 REAL,
+            latency_max REAL,
+            latency_histogram TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS asset_liquidity (
+            asset_id INTEGER PRIMARY KEY,
+            last_date TEXT,
+            window INTEGER,
+            days INTEGER,
+            median_dollar_volume REAL,
+            avg_dollar_volume REAL,
+            avg_volume REAL,
+            avg_trade_count REAL,
+            liquidity_rank INTEGER,
+            updated_at TEXT,
+            FOREIGN KEY (asset_id) REFERENCES asset_metadata(asset_id)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_asset_liquidity_rank
+            ON asset_liquidity (liquidity_rank);
         """
     ],
 
@@ -220,6 +421,36 @@ DATABASES = {
             fetched_at TEXT,
             FOREIGN KEY (exog_id) REFERENCES exogenous_metadata(exog_id)
         );
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_exogenous_vals_exog_date
+            ON exogenous_vals (exog_id, date);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ingest_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT,
+            started_at TEXT,
+            status TEXT,
+            error TEXT,
+            items INTEGER,
+            rows INTEGER,
+            requests INTEGER,
+            retries INTEGER,
+            throttled INTEGER,
+            request_seconds REAL,
+            wait_seconds REAL,
+            decode_seconds REAL,
+            transform_seconds REAL,
+            write_seconds REAL,
+            total_seconds REAL,
+            rows_per_second REAL,
+            latency_p50 REAL,
+            latency_p90 REAL,
+            latency_p99 REAL,
+            latency_max REAL,
+            latency_histogram TEXT
+        );
         """
     ],
 
@@ -237,3 +468,11 @@ DATABASES = {
         """
     ]
 }
+
+# Columns added to existing tables after they were first created. `CREATE TABLE IF NOT
+# EXISTS` leaves older tables untouched, so `ensure_schema` adds these when missing.
+ADDED_COLUMNS = {
+    "assets.db": {
+        "asset_prices": [("trade_count", "INTEGER"), ("vwap", "REAL")],
+    },
+}
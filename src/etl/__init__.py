@@ -1,12 +1,30 @@
 # src/etl/__init__.py
 
 from .populate_prices import populate_prices
-from .populate_tickers import populate_tickers, recreate_database
+from .populate_tickers import populate_tickers, recreate_database, sync_universe
 from .update_prices import update_daily_prices
+from .backfill import run_backfill, backfill_status, reset_backfill
+from .gaps import detect_price_gaps, plan_gap_requests, repair_price_gaps
+from .ingest_exogenous import ingest_exogenous, seed_exogenous_metadata
+from .capture_open import capture_open_prices
+from .corporate_actions import ingest_corporate_actions, fetch_price_invalidations, clear_price_invalidations
 
 __all__ = [
     'populate_prices',
     'populate_tickers',
     'recreate_database',
+    'sync_universe',
     'update_daily_prices',
+    'run_backfill',
+    'backfill_status',
+    'reset_backfill',
+    'detect_price_gaps',
+    'plan_gap_requests',
+    'repair_price_gaps',
+    'ingest_exogenous',
+    'seed_exogenous_metadata',
+    'capture_open_prices',
+    'ingest_corporate_actions',
+    'fetch_price_invalidations',
+    'clear_price_invalidations',
 ]
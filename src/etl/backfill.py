@@ -0,0 +1,271 @@
+# src/etl/backfill.py
+
+"""
+Checkpointed, resumable price backfill.
+
+Per-ticker progress for a named job is kept in the `backfill_progress` table
+(status, last date written, rows written, attempt count, last error). Bars go
+to a `PriceWriter` thread while downloads continue, and each ticker's checkpoint
+is written by that thread in the same transaction as its rows, so a crash or a
+rate-limit storm never loses more than the tickers in flight. Re-running
+the job skips completed tickers, resumes partial ones from their last date and
+retries failed ones with exponential backoff until `max_attempts` is reached.
+
+Statuses: 'pending' (not started), 'running' (dispatched), 'done', 'empty'
+(no bars available), 'failed' (will be retried), 'abandoned' (out of attempts).
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from tqdm import tqdm
+
+from src.utils.db_utils import get_db_connection, fetch_active_tickers, ensure_schema
+from src.utils.alpaca_async import download_bars
+from src.utils.price_writer import PriceWriter
+from src.utils.ingest_telemetry import ingest_job, count
+
+FULL_HISTORY_JOB = 'full_history'
+RETRYABLE_STATUSES = ('pending', 'running', 'failed')
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _seed_progress(conn, job_name, tickers_dict):
+    now = _now()
+    conn.executemany("""
+        INSERT OR IGNORE INTO backfill_progress (job_name, symbol, asset_id, status, attempts, updated_at)
+        VALUES (?, ?, ?, 'pending', 0, ?)
+    """, [(job_name, symbol, asset_id, now) for symbol, asset_id in tickers_dict.items()])
+    conn.commit()
+
+
+def _eligible_tickers(conn, job_name, max_attempts):
+    rows = conn.execute(f"""
+        SELECT symbol, asset_id, last_date
+        FROM backfill_progress
+        WHERE job_name = ?
+        AND status IN ({', '.join('?' * len(RETRYABLE_STATUSES))})
+        AND attempts < ?
+        AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+        ORDER BY symbol
+    """, (job_name, *RETRYABLE_STATUSES, max_attempts, _now())).fetchall()
+    return {symbol: (asset_id, last_date) for symbol, asset_id, last_date in rows}
+
+
+def _next_retry_at(conn, job_name, max_attempts):
+    """Earliest scheduled retry among failed tickers that still have attempts left."""
+    row = conn.execute("""
+        SELECT MIN(next_attempt_at) FROM backfill_progress
+        WHERE job_name = ? AND status = 'failed' AND attempts < ?
+    """, (job_name, max_attempts)).fetchone()
+    return row[0]
+
+
+@ingest_job('run_backfill')
+def run_backfill(job_name=FULL_HISTORY_JOB, tickers=None, start_date='1900-01-01', end_date=None,
+                 feed='iex', max_attempts=5, retry_backoff=60, max_wait=900, chunk_size=500,
+                 **download_kwargs):
+    """
+    Run (or resume) a checkpointed daily-bar backfill.
+
+    Parameters
+    ----------
+    job_name : str, optional
+        Checkpoint namespace; re-running the same name resumes it (default: 'full_history').
+    tickers : list of str, optional
+        Symbols to backfill. Defaults to every active ticker in `asset_metadata`.
+    start_date : str, optional
+        First date requested for tickers with no progress (default: '1900-01-01').
+    end_date : str, optional
+        Last date requested ('YYYY-MM-DD'). Defaults to yesterday.
+    feed : str, optional
+        Alpaca data feed (default: 'iex').
+    max_attempts : int, optional
+        Attempts per ticker before it is marked 'abandoned' (default: 5).
+    retry_backoff : float, optional
+        Base retry delay in seconds for failed tickers, doubled per attempt (default: 60).
+    max_wait : float, optional
+        Longest the job will sleep waiting for scheduled retries before returning; the
+        remaining retries are picked up by the next run (default: 900).
+    chunk_size : int, optional
+        Tickers dispatched per download batch (default: 500).
+    **download_kwargs
+        Passed to `download_bars` (e.g. `max_concurrency`, `requests_per_minute`).
+
+    Returns
+    -------
+    pd.DataFrame
+        Final `backfill_status(job_name)`.
+    """
+    if end_date is None:
+        end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    conn = get_db_connection()
+    conn.execute("PRAGMA journal_mode=WAL")  # Let backfill_status read while the job writes
+    ensure_schema(conn)
+
+    tickers_dict = fetch_active_tickers()
+    if tickers is not None:
+        tickers_dict = {symbol: tickers_dict[symbol] for symbol in tickers if symbol in tickers_dict}
+    _seed_progress(conn, job_name, tickers_dict)
+    count(items=len(tickers_dict))
+
+    def checkpoint(symbol, df):
+        asset_id, last_date = eligible[symbol]
+        if last_date is not None and not df.empty:
+            df = df[df['date'] > last_date]
+        new_last = df['date'].max() if not df.empty else last_date
+        status = 'done' if new_last else 'empty'
+
+        def update_progress(write_conn, rows):
+            write_conn.execute("""
+                UPDATE backfill_progress
+                SET status = ?, last_date = ?, rows_written = rows_written + ?,
+                    last_error = NULL, next_attempt_at = NULL, updated_at = ?
+                WHERE job_name = ? AND symbol = ?
+            """, (status, new_last, rows, _now(), job_name, symbol))
+
+        writer.put(asset_id, df, symbol, on_write=update_progress)
+        progress.update(1)
+
+    def mark_running(write_conn, batch):
+        write_conn.executemany("""
+            UPDATE backfill_progress SET status = 'running', attempts = attempts + 1, updated_at = ?
+            WHERE job_name = ? AND symbol = ?
+        """, [(_now(), job_name, symbol) for symbol in batch])
+
+    with PriceWriter() as writer:
+        while True:
+            eligible = _eligible_tickers(conn, job_name, max_attempts)
+            if not eligible:
+                retry_at = _next_retry_at(conn, job_name, max_attempts)
+                if retry_at is None:
+                    break
+                wait = (datetime.strptime(retry_at, '%Y-%m-%d %H:%M:%S') - datetime.now()).total_seconds()
+                if wait > max_wait:
+                    print(f"Next retry scheduled at {retry_at}; re-run job '{job_name}' to continue.")
+                    break
+                time.sleep(max(wait, 0))
+                continue
+
+            progress = tqdm(total=len(eligible), desc=f"Backfill '{job_name}'")
+            symbols = sorted(eligible)
+            for i in range(0, len(symbols), chunk_size):
+                batch = symbols[i:i + chunk_size]
+                writer.submit(lambda write_conn, batch=batch: mark_running(write_conn, batch))
+
+                # Group by resume date so each download call shares one start date
+                by_start = {}
+                for symbol in batch:
+                    last_date = eligible[symbol][1]
+                    resume = (datetime.strptime(last_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') if last_date else start_date
+                    by_start.setdefault(resume, []).append(symbol)
+
+                for resume, group in by_start.items():
+                    if resume > end_date:
+                        for symbol in group:
+                            checkpoint(symbol, pd.DataFrame())
+                        continue
+                    summary = download_bars(group, resume, end_date, on_result=checkpoint, feed=feed, **download_kwargs)
+                    for symbol, error in summary['failed'].items():
+                        writer.submit(lambda write_conn, symbol=symbol, error=error: _record_failure(
+                            write_conn, job_name, symbol, error, max_attempts, retry_backoff))
+                        progress.update(1)
+            progress.close()
+
+            # Wait for the writer so the next round sees this round's checkpoints
+            writer.flush()
+            for symbol, error in writer.errors.items():
+                if symbol not in eligible:
+                    continue
+                writer.submit(lambda write_conn, symbol=symbol, error=error: _record_failure(
+                    write_conn, job_name, symbol, error, max_attempts, retry_backoff))
+            writer.errors.clear()
+            writer.flush()
+
+    metrics = writer.metrics()
+    print(f"Writer: {metrics['rows']} rows in {metrics['commits']} commits, "
+          f"max queue depth {metrics['max_queue_depth']}, {metrics['rows_per_second']:.0f} rows/s.")
+
+    status = backfill_status(job_name, conn=conn)
+    conn.close()
+    return status
+
+
+def _record_failure(conn, job_name, symbol, error, max_attempts, retry_backoff):
+    attempts = conn.execute(
+        "SELECT attempts FROM backfill_progress WHERE job_name = ? AND symbol = ?", (job_name, symbol)
+    ).fetchone()[0]
+    status = 'abandoned' if attempts >= max_attempts else 'failed'
+    next_attempt = datetime.now() + timedelta(seconds=retry_backoff * (2 ** (attempts - 1)))
+    conn.execute("""
+        UPDATE backfill_progress
+        SET status = ?, last_error = ?, next_attempt_at = ?, updated_at = ?
+        WHERE job_name = ? AND symbol = ?
+    """, (status, str(error)[:500], next_attempt.strftime('%Y-%m-%d %H:%M:%S'), _now(), job_name, symbol))
+
+
+def backfill_status(job_name=FULL_HISTORY_JOB, conn=None):
+    """
+    Summarize a backfill job's progress. Safe to call from another process while it runs.
+
+    Parameters
+    ----------
+    job_name : str, optional
+        Job to summarize (default: 'full_history').
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per status with 'tickers', 'rows_written' and 'max_attempts' columns.
+
+    Examples
+    --------
+    >>> backfill_status()
+                tickers  rows_written  max_attempts
+    status
+    done           5012       9812231             1
+    failed           14             0             2
+    pending        3101             0             0
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+
+    status = pd.read_sql_query("""
+        SELECT status, COUNT(*) AS tickers, SUM(rows_written) AS rows_written, MAX(attempts) AS max_attempts
+        FROM backfill_progress
+        WHERE job_name = ?
+        GROUP BY status
+    """, conn, params=(job_name,)).set_index('status')
+
+    if close_conn:
+        conn.close()
+    return status
+
+
+def reset_backfill(job_name=FULL_HISTORY_JOB, statuses=('failed', 'abandoned')):
+    """
+    Make tickers in the given statuses eligible again with a fresh attempt budget.
+
+    Returns
+    -------
+    int
+        Number of tickers reset.
+    """
+    conn = get_db_connection(print_statements=False)
+    cursor = conn.execute(f"""
+        UPDATE backfill_progress
+        SET status = 'pending', attempts = 0, next_attempt_at = NULL, updated_at = ?
+        WHERE job_name = ? AND status IN ({', '.join('?' * len(statuses))})
+    """, (_now(), job_name, *statuses))
+    conn.commit()
+    conn.close()
+    return cursor.rowcount
@@ -0,0 +1,217 @@
+# src/etl/capture_open.py
+
+"""
+Capture today's opening prints for the whole candidate universe.
+
+The open price is the exogenous input to every ARIMAX forecast, so this job is
+on the critical path each trading morning. `capture_open_prices`:
+
+1. resolves the session open from the trading calendar (`session_bounds`),
+   localized in America/New_York so it is right on both sides of a DST change
+   and respects holidays;
+2. optionally sleeps until the open;
+3. polls the multi-symbol `/v2/stocks/snapshots` endpoint in chunks, on a
+   small thread pool, asking only for symbols without an opening print yet.
+   A symbol's open is its session `dailyBar.o`. Until the daily bar appears,
+   the latest trade is used if it printed at or after the open;
+4. stops when every symbol is captured or `timeout` seconds after it started
+   polling, and stores the per-stage latency of the run in `open_capture_runs`.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from src.utils.alpaca_utils import get_alpaca_client
+from src.utils.db_utils import get_db_connection, ensure_schema, fetch_active_tickers
+from src.utils.market_calendar import EXCHANGE_TIMEZONE, session_bounds
+from src.utils.ingest_telemetry import ingest_job, api_call, count, observe, stage
+
+OPEN_COLUMNS = ['ticker', 'date', 'open', 'source', 'print_time']
+SNAPSHOT_CHUNK_SIZE = 1000
+
+
+def fetch_snapshots(alpaca_client, symbols, chunk_size=SNAPSHOT_CHUNK_SIZE, max_workers=4, feed=None):
+    """
+    Raw snapshots for many symbols, one `/v2/stocks/snapshots` request per chunk.
+
+    Returns
+    -------
+    dict
+        {symbol: snapshot dict}; symbols without data are left out.
+    """
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+    def fetch(chunk):
+        with api_call():
+            return alpaca_client.data_get('/stocks/snapshots', data={'symbols': ','.join(chunk)}, feed=feed,
+                                          api_version='v2') or {}
+
+    snapshots = {}
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(chunks)), 1)) as pool:
+        for payload in pool.map(fetch, chunks):
+            snapshots.update({symbol: snap for symbol, snap in payload.items() if snap})
+    return snapshots
+
+
+def opening_prints(snapshots, session_date, session_open):
+    """
+    Opening price per symbol from snapshots.
+
+    Parameters
+    ----------
+    snapshots : dict
+        {symbol: snapshot} as returned by `fetch_snapshots`.
+    session_date : str
+        Session date 'YYYY-MM-DD' (New York).
+    session_open : pd.Timestamp
+        Session open (tz-aware).
+
+    Returns
+    -------
+    pd.DataFrame
+        OPEN_COLUMNS; 'source' is 'daily_bar' or 'trade'.
+    """
+    if not snapshots:
+        return pd.DataFrame(columns=OPEN_COLUMNS)
+    rows = pd.DataFrame([
+        (symbol,
+         (snap.get('dailyBar') or {}).get('t'), (snap.get('dailyBar') or {}).get('o'),
+         (snap.get('latestTrade') or {}).get('t'), (snap.get('latestTrade') or {}).get('p'))
+        for symbol, snap in snapshots.items()
+    ], columns=['ticker', 'bar_time', 'bar_open', 'trade_time', 'trade_price'])
+
+    bar_time = pd.to_datetime(rows['bar_time'], utc=True, format='ISO8601')
+    trade_time = pd.to_datetime(rows['trade_time'], utc=True, format='ISO8601')
+    from_bar = (bar_time.dt.tz_convert(EXCHANGE_TIMEZONE).dt.strftime('%Y-%m-%d') == session_date) & rows['bar_open'].notna()
+    from_trade = ~from_bar & (trade_time >= session_open) & rows['trade_price'].notna()
+
+    prints = pd.DataFrame({
+        'ticker': rows['ticker'],
+        'date': session_date,
+        'open': rows['bar_open'].where(from_bar, rows['trade_price']).astype(float),
+        'source': 'daily_bar',
+        'print_time': trade_time.where(~from_bar, session_open),
+    })
+    prints.loc[from_trade, 'source'] = 'trade'
+    return prints[(from_bar | from_trade).to_numpy()].reset_index(drop=True)[OPEN_COLUMNS]
+
+
+@ingest_job('capture_open_prices')
+def capture_open_prices(tickers=None, alpaca_client=None, session_date=None, wait=True, timeout=60.0,
+                        poll_interval=1.0, chunk_size=SNAPSHOT_CHUNK_SIZE, max_workers=4, feed=None,
+                        conn=None):
+    """
+    Opening prints for `tickers`, captured as soon as they are published.
+
+    Parameters
+    ----------
+    tickers : list of str, optional
+        Symbols to capture (default: all active tickers).
+    alpaca_client : REST, optional
+        Initialized Alpaca REST client. Defaults to `get_alpaca_client()`.
+    session_date : str, optional
+        Session date 'YYYY-MM-DD' (default: today in New York).
+    wait : bool, optional
+        Sleep until the session open before polling (default: True).
+    timeout : float, optional
+        Seconds to keep polling for symbols without a print (default: 60).
+    poll_interval : float, optional
+        Seconds between polling rounds (default: 1).
+    chunk_size : int, optional
+        Symbols per snapshot request (default: 1000).
+    max_workers : int, optional
+        Concurrent snapshot requests (default: 4).
+    feed : str, optional
+        Data feed ('iex' or 'sip'). None uses the account default.
+    conn : sqlite3.Connection, optional
+        Connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    dict
+        'prices' (DataFrame of OPEN_COLUMNS), 'missing' (symbols without a print),
+        'session_open' (UTC timestamp, None if the market is closed) and 'latency'
+        (seconds per stage: 'calendar', 'wait', 'snapshots', 'total', and
+        'after_open', the time from the open to the end of the capture; plus
+        'rounds', the number of polling rounds).
+    """
+    started = time.perf_counter()
+    started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if alpaca_client is None:
+        alpaca_client = get_alpaca_client()
+    if tickers is None:
+        tickers = list(fetch_active_tickers())
+    if session_date is None:
+        session_date = pd.Timestamp.now(tz=EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')
+
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+    ensure_schema(conn)
+    count(items=len(tickers))
+
+    latency = {'calendar': 0.0, 'wait': 0.0, 'snapshots': 0.0, 'total': 0.0, 'after_open': None, 'rounds': 0}
+    result = {'prices': pd.DataFrame(columns=OPEN_COLUMNS), 'missing': list(tickers),
+              'session_open': None, 'latency': latency}
+
+    bounds = session_bounds(session_date, alpaca_client=alpaca_client, conn=conn)
+    latency['calendar'] = time.perf_counter() - started
+    if bounds is None:
+        print(f"Market closed on {session_date}; no open prices to capture.")
+    else:
+        session_open = result['session_open'] = bounds[0]
+        if wait:
+            delay = (session_open - pd.Timestamp.now(tz='UTC')).total_seconds()
+            if delay > 0:
+                time.sleep(delay)
+            latency['wait'] = max(delay, 0.0)
+            observe('wait', latency['wait'])
+
+        frames, missing = [], list(tickers)
+        deadline = time.perf_counter() + timeout
+        while missing:
+            fetch_start = time.perf_counter()
+            snapshots = fetch_snapshots(alpaca_client, missing, chunk_size, max_workers, feed)
+            latency['snapshots'] += time.perf_counter() - fetch_start
+            latency['rounds'] += 1
+            with stage('transform'):
+                prints = opening_prints(snapshots, session_date, session_open)
+            if not prints.empty:
+                frames.append(prints)
+                captured = set(prints['ticker'])
+                missing = [symbol for symbol in missing if symbol not in captured]
+            if not missing or time.perf_counter() + poll_interval > deadline:
+                break
+            with stage('wait'):
+                time.sleep(poll_interval)
+
+        if frames:
+            result['prices'] = pd.concat(frames, ignore_index=True)
+        result['missing'] = missing
+        latency['after_open'] = (pd.Timestamp.now(tz='UTC') - session_open).total_seconds()
+
+    latency['total'] = time.perf_counter() - started
+    count(rows=len(result['prices']))
+    conn.execute("""
+        INSERT INTO open_capture_runs (
+            session_date, started_at, tickers, captured, rounds,
+            calendar_seconds, wait_seconds, snapshot_seconds, total_seconds, after_open_seconds
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (session_date, started_at, len(tickers), len(result['prices']), latency['rounds'],
+          latency['calendar'], latency['wait'], latency['snapshots'], latency['total'], latency['after_open']))
+    conn.commit()
+    if close_conn:
+        conn.close()
+
+    print(f"Captured {len(result['prices'])}/{len(tickers)} open prices for {session_date} "
+          f"({latency['snapshots']:.2f} s in snapshots, {latency['total']:.2f} s total).")
+    return result
+
+
+if __name__ == "__main__":
+    capture_open_prices()
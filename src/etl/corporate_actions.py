@@ -0,0 +1,324 @@
+# src/etl/corporate_actions.py
+
+"""
+Incremental ingestion of dividends and corporate actions for the whole universe.
+
+Alpaca's `/v2/corporate_actions/announcements` endpoint takes no symbol list and
+returns every announcement in a date range (at most 90 days per request). One
+run of `ingest_corporate_actions`:
+
+1. resumes from the `until` of the last successful pull in
+   `corporate_action_pulls`, minus `overlap_days` so that recently revised
+   announcements are picked up again;
+2. requests the range in 90-day windows, filtered on declaration date, so an
+   announcement is seen when it is declared even if its ex-date is months away;
+3. keeps the announcements that touch an active ticker. Cash dividends go to
+   `asset_dividends`; splits, stock dividends, spin-offs and mergers go to
+   `corporate_actions`;
+4. upserts only rows that are new or whose values changed, in one transaction.
+   For each of them it flags `(asset_id, start_date, end_date)` in
+   `price_invalidations`. The range runs from the asset's first stored price to
+   the ex-date: every adjusted price before the ex-date moves, and the raw
+   return on the ex-date is the split or payout gap.
+
+Downstream caches read the open flags with `fetch_price_invalidations` and
+acknowledge them with `clear_price_invalidations`.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection, ensure_schema, fetch_active_tickers
+from src.utils.ingest_telemetry import ingest_job, api_call, count, stage
+
+CA_TYPES = ('dividend', 'split', 'spinoff', 'merger')
+MAX_WINDOW_DAYS = 90
+DEFAULT_START_DATE = '2015-01-01'
+DIVIDEND_COLUMNS = ['asset_id', 'symbol', 'ex_date', 'record_date', 'pay_date', 'amount', 'currency',
+                    'dividend_type', 'source']
+ACTION_COLUMNS = ['asset_id', 'symbol', 'action_type', 'action_description', 'action_date', 'ratio',
+                  'cash_value', 'notes']
+_DIVIDEND_KEY = ['asset_id', 'ex_date', 'dividend_type']
+_ACTION_KEY = ['asset_id', 'action_type', 'action_date']
+
+
+def _windows(since, until, days=MAX_WINDOW_DAYS):
+    start = datetime.strptime(since, '%Y-%m-%d')
+    end = datetime.strptime(until, '%Y-%m-%d')
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        yield start.strftime('%Y-%m-%d'), stop.strftime('%Y-%m-%d')
+        start = stop + timedelta(days=1)
+
+
+def fetch_corporate_announcements(alpaca_client, since, until, ca_types=CA_TYPES, date_type='declaration_date'):
+    """
+    Every announcement of `ca_types` whose `date_type` falls in [since, until].
+
+    Parameters
+    ----------
+    alpaca_client : REST
+        Alpaca client (trading API).
+    since, until : str
+        Inclusive date range ('YYYY-MM-DD'), split into 90-day requests.
+    ca_types : sequence of str, optional
+        Announcement types (default: dividend, split, spinoff, merger).
+    date_type : str, optional
+        Date the range filters on (default: 'declaration_date').
+
+    Returns
+    -------
+    tuple of (list of dict, int)
+        Announcements (unique by id) and the number of requests made.
+    """
+    announcements, requests = {}, 0
+    for window_start, window_end in _windows(since, until):
+        # alpaca_trade_api 3.x has no wrapper for this endpoint
+        with api_call():
+            found = alpaca_client.get('/corporate_actions/announcements', {
+                'ca_types': ','.join(ca_types), 'since': window_start, 'until': window_end, 'date_type': date_type,
+            })
+        requests += 1
+        for announcement in found or []:
+            announcements[announcement['id']] = announcement
+    return list(announcements.values()), requests
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def announcements_to_frames(announcements, tickers_dict):
+    """
+    Split announcements into `asset_dividends` and `corporate_actions` rows for the universe.
+
+    Parameters
+    ----------
+    announcements : list of dict
+        Announcements as returned by Alpaca.
+    tickers_dict : dict
+        {symbol: asset_id}; announcements touching no listed symbol are dropped.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame)
+        Dividend rows (`DIVIDEND_COLUMNS`) and action rows (`ACTION_COLUMNS`). Mergers and
+        spin-offs produce a row for both the initiating and the target symbol.
+    """
+    dividends, actions = [], []
+    for a in announcements:
+        if not a.get('ex_date'):
+            continue
+        symbols = {a.get('initiating_symbol'), a.get('target_symbol')} & tickers_dict.keys()
+        old_rate, new_rate = _number(a.get('old_rate')), _number(a.get('new_rate'))
+        ratio = new_rate / old_rate if old_rate and new_rate else None
+        for symbol in sorted(symbols):
+            asset_id = tickers_dict[symbol]
+            if a['ca_type'] == 'dividend' and a.get('ca_sub_type', 'cash') == 'cash':
+                dividends.append((asset_id, symbol, a['ex_date'], a.get('record_date'), a.get('payable_date'),
+                                  _number(a.get('cash')), 'USD', 'cash', 'alpaca'))
+            else:
+                actions.append((asset_id, symbol, a['ca_type'], a.get('ca_sub_type'), a['ex_date'], ratio,
+                                _number(a.get('cash')), a['id']))
+    return (pd.DataFrame(dividends, columns=DIVIDEND_COLUMNS).drop_duplicates(_DIVIDEND_KEY, keep='last'),
+            pd.DataFrame(actions, columns=ACTION_COLUMNS).drop_duplicates(_ACTION_KEY, keep='last'))
+
+
+def _changed_rows(conn, table, frame, key, date_column):
+    """Rows of `frame` that are missing from `table` or differ from the stored values."""
+    if frame.empty:
+        return frame
+    value_columns = [c for c in frame.columns if c not in key]
+    stored = pd.read_sql_query(f"SELECT {', '.join(frame.columns)} FROM {table} WHERE {date_column} >= ?",
+                               conn, params=(frame[date_column].min(),))
+    if stored.empty:
+        return frame
+    merged = frame.merge(stored, on=key, how='left', suffixes=('', '_stored'), indicator=True)
+    changed = merged['_merge'] == 'left_only'
+    for column in value_columns:
+        new, old = merged[column], merged[f'{column}_stored']
+        changed |= ~((new == old) | (new.isna() & old.isna()))
+    return frame[changed.to_numpy()]
+
+
+def _upsert(conn, table, frame, key, fetched_at):
+    columns = list(frame.columns) + ['fetched_at']
+    updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c not in key)
+    conn.executemany(f"""
+        INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+        ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}
+    """, [(*row, fetched_at) for row in frame.astype(object).where(frame.notna(), None).itertuples(index=False)])
+
+
+def _flag_invalidations(conn, events, flagged_at):
+    """Insert one flag per (asset_id, ex-date, reason) event; returns the number flagged."""
+    if events.empty:
+        return 0
+    first_dates = dict(conn.execute(f"""
+        SELECT asset_id, MIN(date) FROM asset_prices
+        WHERE asset_id IN ({', '.join('?' * events['asset_id'].nunique())}) GROUP BY asset_id
+    """, [int(a) for a in events['asset_id'].unique()]).fetchall())
+    rows = [(int(e.asset_id), min(first_dates.get(e.asset_id) or e.end_date, e.end_date), e.end_date,
+             e.reason, e.reference, flagged_at) for e in events.itertuples(index=False)]
+    conn.executemany("""
+        INSERT INTO price_invalidations (asset_id, start_date, end_date, reason, reference, flagged_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    return len(rows)
+
+
+def _last_pull(conn):
+    row = conn.execute("SELECT MAX(until) FROM corporate_action_pulls").fetchone()
+    return row[0] if row else None
+
+
+@ingest_job('ingest_corporate_actions')
+def ingest_corporate_actions(alpaca_client=None, tickers_dict=None, since=None, until=None, overlap_days=7,
+                             start_date=DEFAULT_START_DATE, conn=None):
+    """
+    Pull new dividend and corporate action announcements and flag the price ranges they affect.
+
+    Parameters
+    ----------
+    alpaca_client : REST, optional
+        Defaults to `get_alpaca_client()`.
+    tickers_dict : dict, optional
+        {symbol: asset_id} universe. Defaults to `fetch_active_tickers()`.
+    since : str, optional
+        First declaration date requested. Defaults to the last successful pull's `until`
+        minus `overlap_days`, or `start_date` on the first run.
+    until : str, optional
+        Last declaration date requested (default: today).
+    overlap_days : int, optional
+        Days re-read before the last pull to catch revisions (default: 7).
+    start_date : str, optional
+        Start of the first pull (default: '2015-01-01').
+    conn : sqlite3.Connection, optional
+        Connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    dict
+        'since', 'until', 'requests', 'announcements', 'dividends' and 'actions' (rows
+        inserted or updated), 'invalidations' (flags raised) and 'seconds'.
+    """
+    start_time = time.time()
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+    ensure_schema(conn)
+    if alpaca_client is None:
+        from src.utils.alpaca_utils import get_alpaca_client
+        alpaca_client = get_alpaca_client()
+    if tickers_dict is None:
+        tickers_dict = fetch_active_tickers()
+
+    until = until or datetime.now().strftime('%Y-%m-%d')
+    if since is None:
+        last_until = _last_pull(conn)
+        since = start_date if last_until is None else (
+            datetime.strptime(last_until, '%Y-%m-%d') - timedelta(days=overlap_days)).strftime('%Y-%m-%d')
+    summary = {'since': since, 'until': until, 'requests': 0, 'announcements': 0, 'dividends': 0,
+               'actions': 0, 'invalidations': 0, 'seconds': 0.0}
+    if since > until:
+        return summary
+
+    announcements, summary['requests'] = fetch_corporate_announcements(alpaca_client, since, until)
+    summary['announcements'] = len(announcements)
+    count(items=len(announcements))
+    with stage('transform'):
+        dividends, actions = announcements_to_frames(announcements, tickers_dict)
+        dividends = _changed_rows(conn, 'asset_dividends', dividends, _DIVIDEND_KEY, 'ex_date')
+        actions = _changed_rows(conn, 'corporate_actions', actions, _ACTION_KEY, 'action_date')
+
+    fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    events = pd.concat([
+        pd.DataFrame({'asset_id': dividends['asset_id'], 'end_date': dividends['ex_date'],
+                      'reason': 'dividend', 'reference': None}),
+        pd.DataFrame({'asset_id': actions['asset_id'], 'end_date': actions['action_date'],
+                      'reason': actions['action_type'], 'reference': actions['notes']}),
+    ], ignore_index=True)
+    with stage('write'), conn:
+        if not dividends.empty:
+            _upsert(conn, 'asset_dividends', dividends, _DIVIDEND_KEY, fetched_at)
+        if not actions.empty:
+            _upsert(conn, 'corporate_actions', actions, _ACTION_KEY, fetched_at)
+        summary['invalidations'] = _flag_invalidations(conn, events, fetched_at)
+        summary['dividends'], summary['actions'] = len(dividends), len(actions)
+        conn.execute("""
+            INSERT INTO corporate_action_pulls (since, until, requests, announcements, dividends, actions,
+                                                invalidations, pulled_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (since, until, summary['requests'], summary['announcements'], summary['dividends'],
+              summary['actions'], summary['invalidations'], fetched_at))
+    count(rows=summary['dividends'] + summary['actions'])
+
+    if close_conn:
+        conn.close()
+    summary['seconds'] = time.time() - start_time
+    print(f"Corporate actions {since} to {until}: {summary['announcements']} announcements in "
+          f"{summary['requests']} requests, {summary['dividends']} dividends and {summary['actions']} actions "
+          f"written, {summary['invalidations']} price ranges flagged in {summary['seconds']:.1f} s.")
+    return summary
+
+
+def fetch_price_invalidations(asset_ids=None, include_cleared=False, conn=None):
+    """
+    Flagged price ranges, oldest first.
+
+    Parameters
+    ----------
+    asset_ids : list of int, optional
+        Restrict to these assets.
+    include_cleared : bool, optional
+        Also return flags already cleared (default: False).
+    conn : sqlite3.Connection, optional
+        Connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        invalidation_id, asset_id, start_date, end_date, reason, reference, flagged_at, cleared_at.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+    ensure_schema(conn)
+    query = "SELECT * FROM price_invalidations WHERE 1 = 1"
+    params = []
+    if not include_cleared:
+        query += " AND cleared_at IS NULL"
+    if asset_ids is not None:
+        query += f" AND asset_id IN ({', '.join('?' * len(asset_ids))})"
+        params.extend(int(a) for a in asset_ids)
+    flags = pd.read_sql_query(query + " ORDER BY invalidation_id", conn, params=params)
+    if close_conn:
+        conn.close()
+    return flags
+
+
+def clear_price_invalidations(invalidation_ids, conn=None):
+    """Mark flags as handled; returns the number cleared."""
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+    cleared_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with conn:
+        cursor = conn.executemany(
+            "UPDATE price_invalidations SET cleared_at = ? WHERE invalidation_id = ? AND cleared_at IS NULL",
+            [(cleared_at, int(i)) for i in invalidation_ids])
+    if close_conn:
+        conn.close()
+    return cursor.rowcount
+
+
+if __name__ == "__main__":
+    ingest_corporate_actions()
@@ -0,0 +1,254 @@
+# src/etl/gaps.py
+
+"""
+Gap-aware price repair driven by the exchange trading calendar.
+
+`update_daily_prices` only appends after each ticker's MAX(date), so holes in
+the middle of a history (failed days, IEX feed gaps, halts) are never filled.
+This module compares every asset's stored dates with the trading calendar in
+one vectorized pass, merges consecutive missing sessions into ranges, groups
+assets that miss the same range and fetches each group with a single
+multi-symbol request. Only the missing sessions are downloaded.
+
+Ranges the API has no bars for (e.g. the stock was halted) are recorded in
+`unfillable_price_gaps` and treated as present on later runs, so they are not
+requested again.
+
+Functions
+---------
+detect_price_gaps(calendar_dates, prices, unfillable=None, bridge=0)
+    Missing-session ranges per asset (pure, no I/O).
+
+plan_gap_requests(gaps)
+    Group assets by identical range: one request per (start_date, end_date).
+
+repair_price_gaps(alpaca_client=None, start_date=None, end_date=None, bridge=0, feed=None)
+    Detect, fetch and write the missing sessions for every active ticker.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection, fetch_active_tickers, ensure_schema
+from src.utils.alpaca_utils import get_alpaca_client, fetch_alpaca_bars_batched
+from src.utils.market_calendar import load_trading_calendar
+from src.utils.price_store import insert_price_bars
+from src.utils.ingest_telemetry import ingest_job, count, stage
+
+GAP_COLUMNS = ['asset_id', 'start_date', 'end_date', 'sessions', 'is_tail']
+
+
+def _expand_ranges(asset_ids, start_pos, end_pos):
+    """Expand inclusive position ranges into one (asset_id, position) pair per session."""
+    lengths = np.maximum(end_pos - start_pos + 1, 0)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(asset_ids, lengths), np.repeat(start_pos, lengths) + offsets
+
+
+def detect_price_gaps(calendar_dates, prices, unfillable=None, bridge=0):
+    """
+    Find the trading sessions missing from each asset's stored history.
+
+    Only sessions after an asset's first stored date count as missing; a history
+    that starts before the calendar window is treated as present up to its start.
+    Missing sessions up to the last calendar date are reported as a tail gap.
+
+    Parameters
+    ----------
+    calendar_dates : array-like of str
+        Trading sessions ('YYYY-MM-DD'), sorted ascending.
+    prices : pd.DataFrame
+        Stored rows with 'asset_id' and 'date' columns. Non-session dates are ignored.
+    unfillable : pd.DataFrame, optional
+        Ranges with 'asset_id', 'start_date', 'end_date' known to have no bars;
+        their sessions are treated as present.
+    bridge : int, optional
+        Merge gaps of the same asset separated by at most this many stored sessions,
+        trading a few redundant rows for fewer requests (default: 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per gap with columns 'asset_id', 'start_date', 'end_date',
+        'sessions' (missing sessions in the range) and 'is_tail'.
+    """
+    calendar = np.asarray(calendar_dates, dtype=object)
+    n_sessions = len(calendar)
+    if n_sessions == 0 or prices.empty:
+        return pd.DataFrame(columns=GAP_COLUMNS)
+
+    dates = prices['date'].to_numpy(dtype=object)
+    asset_ids = prices['asset_id'].to_numpy(dtype=np.int64)
+    pos = np.searchsorted(calendar, dates)
+    in_window = pos < n_sessions
+    is_session = np.zeros(len(dates), dtype=bool)
+    is_session[in_window] = calendar[pos[in_window]] == dates[in_window]
+    before_window = dates < calendar[0]
+    # History older than the window anchors the asset just before the first session
+    pos = np.where(before_window, -1, pos)
+    keep = is_session | before_window
+    asset_ids, pos = asset_ids[keep], pos[keep]
+
+    if unfillable is not None and not unfillable.empty:
+        extra_ids, extra_pos = _expand_ranges(
+            unfillable['asset_id'].to_numpy(dtype=np.int64),
+            np.searchsorted(calendar, unfillable['start_date'].to_numpy(dtype=object), side='left'),
+            np.searchsorted(calendar, unfillable['end_date'].to_numpy(dtype=object), side='right') - 1,
+        )
+        asset_ids = np.concatenate([asset_ids, extra_ids])
+        pos = np.concatenate([pos, extra_pos])
+
+    if len(pos) == 0:
+        return pd.DataFrame(columns=GAP_COLUMNS)
+
+    # One sentinel per asset one past the last session turns the tail into an ordinary gap
+    assets = np.unique(asset_ids)
+    asset_ids = np.concatenate([asset_ids, assets])
+    pos = np.concatenate([pos, np.full(len(assets), n_sessions)])
+
+    order = np.lexsort((pos, asset_ids))
+    asset_ids, pos = asset_ids[order], pos[order]
+    same_asset = asset_ids[1:] == asset_ids[:-1]
+    step = np.diff(pos)
+    is_gap = same_asset & (step > 1)
+
+    gap_assets = asset_ids[1:][is_gap]
+    gap_start = pos[:-1][is_gap] + 1
+    gap_end = pos[1:][is_gap] - 1
+    gap_sessions = gap_end - gap_start + 1
+
+    if bridge > 0 and len(gap_assets) > 1:
+        separation = gap_start[1:] - gap_end[:-1] - 1
+        new_run = np.concatenate([[True], (gap_assets[1:] != gap_assets[:-1]) | (separation > bridge)])
+        run_id = np.cumsum(new_run) - 1
+        first = np.flatnonzero(new_run)
+        last = np.concatenate([first[1:], [len(run_id)]]) - 1
+        gap_assets, gap_start, gap_end = gap_assets[first], gap_start[first], gap_end[last]
+        gap_sessions = np.bincount(run_id, weights=gap_sessions).astype(np.int64)
+
+    return pd.DataFrame({
+        'asset_id': gap_assets,
+        'start_date': calendar[gap_start],
+        'end_date': calendar[gap_end],
+        'sessions': gap_sessions,
+        'is_tail': gap_end == n_sessions - 1,
+    }, columns=GAP_COLUMNS)
+
+
+def plan_gap_requests(gaps):
+    """
+    Group gaps into the minimal set of range requests.
+
+    Assets missing exactly the same range share one multi-symbol request.
+
+    Parameters
+    ----------
+    gaps : pd.DataFrame
+        Output of `detect_price_gaps`.
+
+    Returns
+    -------
+    list of tuple
+        (start_date, end_date, [asset_id, ...]) sorted by start date.
+    """
+    if gaps.empty:
+        return []
+    grouped = gaps.groupby(['start_date', 'end_date'], sort=True)['asset_id'].agg(list)
+    return [(start, end, asset_ids) for (start, end), asset_ids in grouped.items()]
+
+
+@ingest_job('repair_price_gaps')
+def repair_price_gaps(alpaca_client=None, start_date=None, end_date=None, bridge=0, feed=None,
+                      chunk_size=200):
+    """
+    Fill missing trading sessions for every active ticker.
+
+    Parameters
+    ----------
+    alpaca_client : REST, optional
+        Initialized Alpaca REST client. Defaults to `get_alpaca_client()`.
+    start_date : str, optional
+        Only repair sessions on or after this date. Defaults to the oldest stored date.
+    end_date : str, optional
+        Last session to check ('YYYY-MM-DD'). Defaults to yesterday.
+    bridge : int, optional
+        Passed to `detect_price_gaps` (default: 0).
+    feed : str, optional
+        Data feed ('iex' or 'sip'). None uses the account default.
+    chunk_size : int, optional
+        Symbols per multi-symbol request (default: 200).
+
+    Returns
+    -------
+    dict
+        'gaps', 'sessions_missing', 'requests', 'rows_written', 'unfillable'
+        (interior ranges the API had no bars for), 'changed' (set of symbols
+        that received new rows) and 'failed' (set of symbols whose request failed;
+        their gaps are left for the next run).
+    """
+    if alpaca_client is None:
+        alpaca_client = get_alpaca_client()
+    if end_date is None:
+        end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    conn = get_db_connection(print_statements=False)
+    ensure_schema(conn)
+    tickers_dict = fetch_active_tickers()
+    symbols_by_id = {asset_id: symbol for symbol, asset_id in tickers_dict.items()}
+
+    if start_date is None:
+        start_date = conn.execute("SELECT MIN(date) FROM asset_prices").fetchone()[0] or end_date
+    calendar = load_trading_calendar(start_date, end_date, alpaca_client=alpaca_client, conn=conn)
+    prices = pd.read_sql_query("SELECT asset_id, date FROM asset_prices WHERE date <= ?", conn, params=(end_date,))
+    prices = prices[prices['asset_id'].isin(symbols_by_id)]
+    unfillable = pd.read_sql_query("SELECT asset_id, start_date, end_date FROM unfillable_price_gaps", conn)
+
+    gaps = detect_price_gaps(calendar['date'], prices, unfillable=unfillable, bridge=bridge)
+    plan = plan_gap_requests(gaps)
+    count(items=len(gaps))
+    interior = set(gaps.loc[~gaps['is_tail'], ['asset_id', 'start_date', 'end_date']].itertuples(index=False, name=None))
+
+    summary = {'gaps': len(gaps), 'sessions_missing': int(gaps['sessions'].sum()) if len(gaps) else 0,
+               'requests': 0, 'rows_written': 0, 'unfillable': 0, 'changed': set(), 'failed': set()}
+    checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    for range_start, range_end, asset_ids in plan:
+        symbols = [symbols_by_id[asset_id] for asset_id in asset_ids]
+        failed = {}
+        frames = fetch_alpaca_bars_batched(alpaca_client, symbols, '1Day', range_start, range_end,
+                                           chunk_size=chunk_size, feed=feed, failed=failed)
+        summary['requests'] += -(-len(symbols) // chunk_size)
+        summary['failed'].update(failed)
+
+        for asset_id, symbol in zip(asset_ids, symbols):
+            if symbol in failed:
+                continue
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                if (asset_id, range_start, range_end) in interior:
+                    conn.execute("""
+                        INSERT OR IGNORE INTO unfillable_price_gaps (asset_id, start_date, end_date, checked_at)
+                        VALUES (?, ?, ?, ?)
+                    """, (asset_id, range_start, range_end, checked_at))
+                    summary['unfillable'] += 1
+                continue
+            rows = insert_price_bars(conn, asset_id, df)
+            if rows > 0:
+                summary['rows_written'] += rows
+                summary['changed'].add(symbol)
+        with stage('write'):
+            conn.commit()
+
+    conn.close()
+    print(f"Repaired {summary['sessions_missing']} missing sessions in {summary['gaps']} gaps "
+          f"with {summary['requests']} requests ({summary['rows_written']} rows written).")
+    return summary
+
+
+if __name__ == "__main__":
+    repair_price_gaps()
@@ -0,0 +1,247 @@
+# src/etl/ingest_exogenous.py
+
+"""
+Scheduled, incremental ingestion of exogenous series into `exogenous.db`.
+
+The catalog (`Sandbox/exogenous_data_list.py`) is seeded into
+`exogenous_metadata` once, and each run of `ingest_exogenous`:
+
+1. picks the in-use series that are due, based on their frequency and
+   `last_fetch` (daily series at most every 20 hours, weekly every 6 days, ...);
+2. requests only what is new for each series: from its last stored date
+   (inclusive, so revised last observations are refreshed) to `end_date`;
+3. fetches concurrently across sources on a thread pool, with each source
+   held to its own `requests_per_minute` (token bucket) and `max_concurrency`;
+4. writes every result from the calling thread with one `executemany` per
+   series, committing in batches.
+
+Series whose source has no adapter, or whose fetch fails, keep their old
+`last_fetch` and are picked up again by the next run.
+"""
+
+import runpy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.config import BASE_DIR
+from src.utils.db_utils import get_db_connection, ensure_schema
+from src.utils.exogenous_utils import EXOGENOUS_DB, upsert_exogenous_values
+from src.utils.exogenous_sources import default_sources, source_for, source_key
+from src.utils.rate_limit import TokenBucket
+from src.utils.ingest_telemetry import ingest_job, count, stage
+
+CATALOG_PATH = BASE_DIR / 'Sandbox' / 'exogenous_data_list.py'
+DEFAULT_START_DATE = '1990-01-01'
+REFRESH_INTERVALS = {
+    'daily': timedelta(hours=20),
+    'weekly': timedelta(days=6),
+    'monthly': timedelta(days=27),
+    'quarterly': timedelta(days=85),
+}
+
+
+def load_exogenous_catalog(path=CATALOG_PATH):
+    """Return the catalog list (`exog_symbols_data`) from the catalog module."""
+    return runpy.run_path(str(path))['exog_symbols_data']
+
+
+def parse_lag(value):
+    """
+    Publication lag in days. Ranges such as '14-28' use the upper bound, so an
+    observation is never used before it could have been published.
+    """
+    if value is None or value == '':
+        return 0.0
+    if isinstance(value, str):
+        return float(value.split('-')[-1])
+    return float(max(value, 0))
+
+
+def seed_exogenous_metadata(catalog=None, conn=None):
+    """
+    Insert catalog entries into `exogenous_metadata`, refreshing source, frequency and lag
+    of existing ones. Existing `in_use` flags and fetch history are kept.
+
+    Parameters
+    ----------
+    catalog : list of dict, optional
+        Entries in the `exog_symbols_data` format. Defaults to `load_exogenous_catalog()`.
+    conn : sqlite3.Connection, optional
+        Connection to 'exogenous.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    int
+        Number of catalog entries written.
+    """
+    if catalog is None:
+        catalog = load_exogenous_catalog()
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(EXOGENOUS_DB, print_statements=False)
+        close_conn = True
+    ensure_schema(conn, EXOGENOUS_DB)
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    rows = [(
+        entry['Symbol'],
+        entry.get('Title'),
+        entry.get('Explanation of what this'),
+        entry.get('Explanation of why it may be important'),
+        entry.get('Source'),
+        entry.get('Type'),
+        parse_lag(entry.get('Lag number')),
+        today,
+    ) for entry in catalog]
+    with conn:
+        conn.executemany("""
+            INSERT INTO exogenous_metadata (
+                exog_symbol, exog_title, explanation_description, explanation_importance,
+                source, frequency, lag, in_use, date_added
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT (exog_symbol) DO UPDATE SET
+                exog_title = excluded.exog_title,
+                source = excluded.source,
+                frequency = excluded.frequency,
+                lag = excluded.lag
+        """, rows)
+
+    if close_conn:
+        conn.close()
+    return len(rows)
+
+
+def _due_series(conn, exog_ids, force, now):
+    metadata = pd.read_sql_query("""
+        SELECT m.exog_id, m.exog_symbol, m.source, m.frequency, m.last_fetch, MAX(v.date) AS last_date
+        FROM exogenous_metadata m
+        LEFT JOIN exogenous_vals v ON v.exog_id = m.exog_id
+        WHERE m.in_use = 1
+        GROUP BY m.exog_id
+    """, conn)
+    if exog_ids is not None:
+        metadata = metadata[metadata['exog_id'].isin(exog_ids)]
+    if force:
+        return metadata
+
+    interval = metadata['frequency'].str.lower().map(REFRESH_INTERVALS).fillna(REFRESH_INTERVALS['daily'])
+    last_fetch = pd.to_datetime(metadata['last_fetch'])
+    due = last_fetch.isna() | (now - last_fetch >= interval)
+    return metadata[due.to_numpy()]
+
+
+@ingest_job('ingest_exogenous', db_name=EXOGENOUS_DB)
+def ingest_exogenous(sources=None, exog_ids=None, force=False, start_date=DEFAULT_START_DATE,
+                     end_date=None, commit_every=25, conn=None):
+    """
+    Fetch new observations for every due exogenous series and bulk-load them.
+
+    Parameters
+    ----------
+    sources : dict, optional
+        {source key: adapter}, keys as returned by `source_key` ('yfinance', 'fred',
+        'other'). Defaults to `default_sources()`.
+    exog_ids : list of int, optional
+        Restrict the run to these series.
+    force : bool, optional
+        Fetch every selected series regardless of its refresh interval (default: False).
+    start_date : str, optional
+        First date requested for series with no stored observations (default: '1990-01-01').
+    end_date : str, optional
+        Last date requested (default: today).
+    commit_every : int, optional
+        Series written per transaction (default: 25).
+    conn : sqlite3.Connection, optional
+        Connection to 'exogenous.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    dict
+        'due', 'fetched', 'rows', 'failed' ({symbol: error}), 'no_adapter' (list of
+        symbols) and 'seconds'.
+    """
+    if sources is None:
+        sources = default_sources()
+    now = datetime.now()
+    if end_date is None:
+        end_date = now.strftime('%Y-%m-%d')
+
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(EXOGENOUS_DB, print_statements=False)
+        close_conn = True
+    ensure_schema(conn, EXOGENOUS_DB)
+
+    due = _due_series(conn, exog_ids, force, now)
+    count(items=len(due))
+    summary = {'due': len(due), 'fetched': 0, 'rows': 0, 'failed': {}, 'no_adapter': [], 'seconds': 0.0}
+    start_time = time.time()
+
+    # Per-source pacing: a token bucket for the request rate, a semaphore for concurrency
+    limits = {
+        key: (TokenBucket.per_minute(adapter.requests_per_minute, burst=adapter.max_concurrency),
+              threading.Semaphore(adapter.max_concurrency))
+        for key, adapter in sources.items()
+    }
+
+    def fetch(adapter, key, symbol, fetch_start):
+        bucket, semaphore = limits[key]
+        with semaphore:
+            with stage('wait'):
+                bucket.acquire()
+            count(requests=1)
+            # Source adapters fetch and parse in one call; the whole call counts as the request
+            with stage('request'):
+                return adapter.fetch(symbol, fetch_start, end_date)
+
+    futures = {}
+    max_workers = max(sum(adapter.max_concurrency for adapter in sources.values()), 1)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='exogenous') as pool:
+        for row in due.itertuples(index=False):
+            adapter = source_for(row.source, sources)
+            if adapter is None:
+                summary['no_adapter'].append(row.exog_symbol)
+                continue
+            fetch_start = row.last_date or start_date
+            if fetch_start > end_date:
+                continue
+            future = pool.submit(fetch, adapter, source_key(row.source), row.exog_symbol, fetch_start)
+            futures[future] = row
+
+        pending_commit = 0
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                values = future.result()
+            except Exception as e:
+                summary['failed'][row.exog_symbol] = str(e)
+                continue
+            fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            summary['rows'] += upsert_exogenous_values(conn, row.exog_id, values, fetched_at=fetched_at)
+            conn.execute("UPDATE exogenous_metadata SET last_fetch = ? WHERE exog_id = ?", (fetched_at, row.exog_id))
+            summary['fetched'] += 1
+            pending_commit += 1
+            if pending_commit >= commit_every:
+                with stage('write'):
+                    conn.commit()
+                pending_commit = 0
+        with stage('write'):
+            conn.commit()
+
+    if close_conn:
+        conn.close()
+    summary['seconds'] = time.time() - start_time
+    print(f"Exogenous ingest: {summary['fetched']}/{summary['due']} series, {summary['rows']} rows, "
+          f"{len(summary['failed'])} failed, {len(summary['no_adapter'])} without adapter "
+          f"in {summary['seconds']:.1f} s.")
+    return summary
+
+
+if __name__ == "__main__":
+    seed_exogenous_metadata()
+    ingest_exogenous()
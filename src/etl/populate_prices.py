@@ -1,25 +1,26 @@
 # src/etl/populate_prices.py
-import sqlite3
 from datetime import datetime, timedelta
-from src.utils.db_utils import fetch_active_tickers
-from src.utils.alpaca_utils import get_alpaca_client, populate_alpaca_full_history
+from src.etl.backfill import run_backfill, FULL_HISTORY_JOB
+from src.utils.ingest_telemetry import ingest_job
 from src.config import DB_DIR
 
 DB_PATH = DB_DIR / 'assets.db'
 
 
 
-def populate_prices():
-    # Get tickers and Alpaca client
-    tickers_dict = fetch_active_tickers()
-    tickers = list(tickers_dict.keys())
-    alpaca_client = get_alpaca_client()
+@ingest_job('populate_prices')
+def populate_prices(**download_kwargs):
+    """
+    Backfill the full price history of every active ticker.
 
+    Progress is checkpointed per ticker in `backfill_progress`, so an interrupted run
+    resumes where it stopped when called again. Use `backfill_status()` to watch it.
+    """
     # Set end date to yesterday
     end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
 
-    # Populate price history, inserting as fetched
-    populate_alpaca_full_history(alpaca_client=alpaca_client, tickers=tickers, end_date=end_date)
+    # Populate price history, checkpointing each ticker as it is written
+    return run_backfill(job_name=FULL_HISTORY_JOB, end_date=end_date, **download_kwargs)
 
 if __name__ == "__main__":
-    populate_prices()
\ No newline at end of file
+    print(populate_prices())
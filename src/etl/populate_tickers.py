@@ -1,10 +1,12 @@
 # src/etl/populate_tickers.py
 import sqlite3
 from datetime import datetime
-from pathlib import Path
 
-from src.utils.alpaca_utils import get_alpaca_client, fetch_alpaca_stock_tickers
-from src.utils.db_utils import get_db_connection
+import pandas as pd
+
+from src.utils.alpaca_utils import get_alpaca_client
+from src.utils.db_utils import get_db_connection, ensure_schema
+from src.utils.ingest_telemetry import ingest_job, api_call, count, stage
 from src.config import DB_DIR
 
 # Explicitly define your absolute DB_DIR path
@@ -13,7 +15,17 @@ DB_DIR.mkdir(exist_ok=True)
 
 DB_PATH = DB_DIR / 'assets.db'
 
+UNIVERSE_EXCHANGES = ('NASDAQ', 'NYSE', 'AMEX')
+METADATA_COLUMNS = ['symbol', 'name', 'exchange', 'asset_type']
+MAX_DELIST_FRACTION = 0.1  # a sync delisting more of the active universe than this is refused
+
 def recreate_database():
+    """
+    Delete assets.db and recreate an empty `asset_metadata` table.
+
+    Destructive: this wipes all price history. Use `sync_universe` to refresh the
+    ticker universe in place.
+    """
     if DB_PATH.exists():
         DB_PATH.unlink()
 
@@ -35,35 +47,121 @@ def recreate_database():
     conn.commit()
     conn.close()
 
-def populate_tickers():
-    alpaca_client = get_alpaca_client()
-    assets = alpaca_client.list_assets()  # Correct method for alpaca-trade-api
+def _eligible_assets(assets, exchanges):
+    """Tradable, alphabetic symbols listed on `exchanges`, as a DataFrame of METADATA_COLUMNS."""
+    rows = [
+        (asset.symbol, asset.name, asset.exchange, getattr(asset, 'class'))
+        for asset in assets
+        if asset.exchange in exchanges and asset.tradable and asset.status == 'active' and asset.symbol.isalpha()
+    ]
+    return pd.DataFrame(rows, columns=METADATA_COLUMNS).drop_duplicates('symbol').set_index('symbol')
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    date_now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    for asset in assets:
-        if asset.exchange in ['NASDAQ', 'NYSE', 'AMEX'] and asset.tradable and asset.symbol.isalpha():
-            query_string = """
-                INSERT OR IGNORE INTO asset_metadata (
-                    symbol, name, exchange, asset_type, is_active, date_added, fetched_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(query_string, (
-                asset.symbol,
-                asset.name,
-                asset.exchange,
-                getattr(asset, 'class'),  # Fixed: Use getattr() to access 'class' safely
-                1 if asset.status == 'active' else 0,
-                date_now.split()[0],
-                date_now
-            ))
+@ingest_job('sync_universe')
+def sync_universe(alpaca_client=None, exchanges=UNIVERSE_EXCHANGES, conn=None,
+                  max_delist_fraction=MAX_DELIST_FRACTION, force=False):
+    """
+    Bring `asset_metadata` in line with Alpaca's asset list without touching price history.
 
-    conn.commit()
-    conn.close()
+    The current asset list is diffed against the table in memory and the result is
+    applied in one transaction:
+
+    - new symbols are inserted (is_active=1, date_added=today);
+    - inactive symbols that are listed again are reactivated (date_removed cleared);
+    - name, exchange or asset class changes are updated in place;
+    - active symbols that are no longer listed, tradable or on `exchanges` are
+      delisted (is_active=0, date_removed=today).
+
+    A truncated or empty asset list would delist most of the universe, so the sync
+    is refused when Alpaca lists no eligible assets or when more than
+    `max_delist_fraction` of the active symbols would be delisted, unless `force`.
+
+    Args:
+        alpaca_client (REST, optional): Initialized Alpaca REST client. Defaults to `get_alpaca_client()`.
+        exchanges (tuple): Exchanges that make up the universe (default: NASDAQ, NYSE, AMEX).
+        conn (sqlite3.Connection, optional): Connection to 'assets.db'. If None, one is opened and closed.
+        max_delist_fraction (float): Largest share of active symbols one sync may delist (default: 0.1).
+        force (bool): Apply the diff even if it fails the checks above (default: False).
+
+    Returns:
+        dict: Sorted symbol lists under 'added', 'reactivated', 'updated' and 'delisted'.
+        Downstream jobs only need to backfill 'added' and 'reactivated'.
+
+    Raises:
+        RuntimeError: If the asset list looks incomplete and `force` is False. Nothing is written.
+    """
+    if alpaca_client is None:
+        alpaca_client = get_alpaca_client()
+    with api_call():
+        assets = alpaca_client.list_assets()
+    with stage('transform'):
+        listed = _eligible_assets(assets, exchanges)
+    count(items=len(listed))
+    if listed.empty and not force:
+        raise RuntimeError(f"Alpaca listed no eligible assets on {', '.join(exchanges)}; "
+                           "universe left unchanged (pass force=True to apply).")
+
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(print_statements=False)
+        close_conn = True
+    ensure_schema(conn)
+
+    stored = pd.read_sql_query(
+        "SELECT symbol, name, exchange, asset_type, is_active FROM asset_metadata", conn
+    ).set_index('symbol')
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    today = now.split()[0]
+
+    added = listed.index.difference(stored.index)
+    known = listed.index.intersection(stored.index)
+    inactive = stored.index[stored['is_active'].fillna(0) == 0]
+    reactivated = known.intersection(inactive)
+    current = listed.loc[known, ['name', 'exchange', 'asset_type']]
+    previous = stored.loc[known, ['name', 'exchange', 'asset_type']]
+    changed = (current.fillna('') != previous.fillna('')).any(axis=1)
+    updated = known[changed.to_numpy()]
+    active = stored.index[stored['is_active'].fillna(0) == 1]
+    delisted = active.difference(listed.index)
+    if len(delisted) > max_delist_fraction * len(active) and not force:
+        if close_conn:
+            conn.close()
+        raise RuntimeError(f"Sync would delist {len(delisted)} of {len(active)} active symbols; "
+                           "universe left unchanged (pass force=True to apply).")
+
+    with stage('write'), conn:
+        conn.executemany("""
+            INSERT INTO asset_metadata (symbol, name, exchange, asset_type, is_active, date_added, fetched_at)
+            VALUES (?, ?, ?, ?, 1, ?, ?)
+        """, [(symbol, *listed.loc[symbol], today, now) for symbol in added])
+        conn.executemany("""
+            UPDATE asset_metadata SET name = ?, exchange = ?, asset_type = ?, fetched_at = ?
+            WHERE symbol = ?
+        """, [(*listed.loc[symbol], now, symbol) for symbol in updated])
+        conn.executemany("""
+            UPDATE asset_metadata SET is_active = 1, date_removed = NULL, fetched_at = ?
+            WHERE symbol = ?
+        """, [(now, symbol) for symbol in reactivated])
+        conn.executemany("""
+            UPDATE asset_metadata SET is_active = 0, date_removed = ?, fetched_at = ?
+            WHERE symbol = ?
+        """, [(today, now, symbol) for symbol in delisted])
+
+    if close_conn:
+        conn.close()
+
+    changes = {
+        'added': sorted(added),
+        'reactivated': sorted(reactivated),
+        'updated': sorted(updated),
+        'delisted': sorted(delisted),
+    }
+    print(", ".join(f"{len(symbols)} {kind}" for kind, symbols in changes.items()))
+    return changes
+
+def populate_tickers():
+    """Sync the ticker universe (see `sync_universe`) and return the change set."""
+    return sync_universe()
 
 if __name__ == "__main__":
-    recreate_database()
-    populate_tickers()
\ No newline at end of file
+    populate_tickers()
@@ -1,31 +1,146 @@
 # src/etl/update_prices.py
+
+"""
+Daily incremental price update, planned as a handful of grouped requests.
+
+Every active ticker's last stored date is read in one query. Tickers that are
+missing the same range (normally all of them, from the day after the last
+update to yesterday) share one multi-symbol request per `chunk_size`
+symbols, so a routine update of a few thousand tickers takes a few requests.
+Tickers whose ranges start within `bridge_days` of each other are merged into
+the earliest range. Their few redundant rows are dropped on insert, because
+`insert_price_bars` skips dates already stored.
+
+Each chunk's bars are handed to a `PriceWriter` thread, which writes them
+while the next chunk downloads and batches the commits. A failed request only
+loses its own chunk: the other tickers are still written, and the failed ones,
+having no new rows, are requested again by the next run.
+When rows were written, `asset_liquidity` is refreshed so universe screens by
+dollar volume see the new day.
+"""
+
 from datetime import datetime, timedelta
-from src.utils.db_utils import fetch_active_tickers, get_latest_price_date, get_db_connection
-from src.utils.alpaca_utils import get_alpaca_client, fetch_alpaca_historical_data
+
+import pandas as pd
+
+from src.utils.db_utils import fetch_active_tickers, fetch_latest_price_dates, get_db_connection, ensure_schema
+from src.utils.alpaca_utils import get_alpaca_client, fetch_alpaca_bars_batched
+from src.utils.price_writer import PriceWriter
+from src.utils.liquidity import update_liquidity
+from src.utils.ingest_telemetry import ingest_job, count
 from src.config import DB_DIR
 
 DB_PATH = DB_DIR / 'assets.db'
+DEFAULT_START_DATE = '2002-01-01'
+
+
+def plan_update_requests(latest_dates, end_date, start_date=DEFAULT_START_DATE, bridge_days=0):
+    """
+    Group tickers by the range they are missing.
+
+    Parameters
+    ----------
+    latest_dates : dict
+        {symbol: last stored date ('YYYY-MM-DD') or None for tickers with no prices}.
+    end_date : str
+        Last date to fetch.
+    start_date : str, optional
+        First date fetched for tickers with no prices (default: '2002-01-01').
+    bridge_days : int, optional
+        Merge a range into the previous one when it starts at most this many calendar
+        days later (default: 0, only identical ranges are merged).
 
-def update_daily_prices():
-    alpaca = get_alpaca_client()
+    Returns
+    -------
+    list of tuple
+        (start_date, end_date, [symbol, ...]) sorted by start date. Tickers already
+        up to `end_date` are left out.
+    """
+    starts = pd.Series({
+        symbol: (pd.Timestamp(last) + pd.Timedelta(days=1)).strftime('%Y-%m-%d') if last else start_date
+        for symbol, last in latest_dates.items()
+    }, dtype=object)
+    starts = starts[starts <= end_date]
+    if starts.empty:
+        return []
+
+    grouped = starts.groupby(starts, sort=True).groups
+    plan = []
+    for range_start, symbols in grouped.items():
+        if plan and bridge_days and (pd.Timestamp(range_start) - pd.Timestamp(plan[-1][0])).days <= bridge_days:
+            plan[-1][2].extend(sorted(symbols))
+        else:
+            plan.append((range_start, end_date, sorted(symbols)))
+    return plan
+
+
+@ingest_job('update_daily_prices')
+def update_daily_prices(alpaca_client=None, end_date=None, start_date=DEFAULT_START_DATE, bridge_days=7,
+                        chunk_size=200, feed=None, failed=None):
+    """
+    Append any missing daily bars for every active ticker.
+
+    Parameters
+    ----------
+    alpaca_client : REST, optional
+        Defaults to `get_alpaca_client()`.
+    end_date : str, optional
+        Last date to fetch (default: yesterday).
+    start_date : str, optional
+        First date fetched for tickers with no stored prices (default: '2002-01-01').
+    bridge_days : int, optional
+        Passed to `plan_update_requests` (default: 7).
+    chunk_size : int, optional
+        Symbols per multi-symbol request (default: 200).
+    feed : str, optional
+        Data feed ('iex' or 'sip'). None uses the account default.
+    failed : dict, optional
+        Filled with {symbol: error message} for tickers whose request or write failed.
+        Nothing is written for them, so the next run retries their range.
+
+    Returns
+    -------
+    set
+        Symbols whose price fingerprint changed (at least one new row was written).
+        Cached smoothing, stationarity, changepoint and ARIMAX results for all other
+        tickers are still valid.
+    """
+    if alpaca_client is None:
+        alpaca_client = get_alpaca_client()
+    if end_date is None:
+        end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
     tickers_dict = fetch_active_tickers()
-    end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    for symbol, asset_id in tickers_dict.items():
-        latest_date = get_latest_price_date(symbol)
-        start_date = (datetime.strptime(latest_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') if latest_date else '2002-01-01'
-        if start_date >= end_date:
-            continue
-        df = fetch_alpaca_historical_data(alpaca, [symbol], start_date, end_date)
-        for _, row in df.iterrows():
-            cursor.execute("""
-                INSERT OR IGNORE INTO asset_prices (asset_id, date, open, high, low, close, fetched_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (asset_id, row['date'], row['open'], row['high'], row['low'], row['close'], datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-        conn.commit()
+    count(items=len(tickers_dict))
+
+    conn = get_db_connection(print_statements=False)
+    ensure_schema(conn)
+    last_by_id = fetch_latest_price_dates(conn)
+    plan = plan_update_requests({symbol: last_by_id.get(asset_id) for symbol, asset_id in tickers_dict.items()},
+                                end_date, start_date=start_date, bridge_days=bridge_days)
+
+    failed = {} if failed is None else failed
+    requests = 0
+    with PriceWriter() as writer:
+        for range_start, range_end, symbols in plan:
+            for i in range(0, len(symbols), chunk_size):
+                frames = fetch_alpaca_bars_batched(alpaca_client, symbols[i:i + chunk_size], '1Day',
+                                                   range_start, range_end, chunk_size=chunk_size,
+                                                   feed=feed, failed=failed)
+                requests += 1
+                for symbol, df in frames.items():
+                    writer.put(tickers_dict[symbol], df, symbol)
+    failed.update(writer.errors)
+    changed, rows_written = writer.changed, writer.metrics()['rows']
+    if rows_written:
+        update_liquidity(conn=conn)
     conn.close()
 
+    print(f"Wrote {rows_written} rows for {len(changed)} tickers from {len(plan)} ranges "
+          f"in {requests} requests.")
+    if failed:
+        print(f"Requests failed for {len(failed)} tickers, retried on the next run: {', '.join(sorted(failed))}")
+    return changed
+
+
 if __name__ == "__main__":
     update_daily_prices()
@@ -1,12 +1,11 @@
 #src/etl/utils.py
 
 import sys
-import time
-from datetime import datetime, timedelta
 import pandas as pd
-from tqdm import tqdm
 from alpaca_trade_api.rest import REST
 import logging
+from src.utils import alpaca_utils
+from src.utils.request_policy import install_request_policy
 
 # Configure logging
 # logging.basicConfig(
@@ -27,7 +26,7 @@ def connect_to_alpaca(api_key, secret_key, base_url):
         REST: Alpaca REST client instance if successful, None if failed.
     """
     try:
-        alpaca = REST(api_key, secret_key, base_url=base_url)
+        alpaca = install_request_policy(REST(api_key, secret_key, base_url=base_url))
         #logging.info("Connected to Alpaca successfully!")
         #print("Connected to Alpaca successfully!")
         return alpaca
@@ -67,62 +66,26 @@ def fetch_alpaca_stock_tickers(alpaca_client, exchanges=['NASDAQ', 'NYSE', 'AMEX
         #print(f"Error fetching tickers: {e}")
         return []
 
-def fetch_alpaca_historical_data(alpaca_client, tickers, start_date, end_date, years_back=5):
+def fetch_alpaca_historical_data(alpaca_client, tickers, start_date, end_date, years_back=None):
     """
-    Fetch historical OHLC data from Alpaca for a list of tickers.
+    Fetch historical daily bars (OHLC, volume, trade count and VWAP) from Alpaca for a list of tickers.
     
     Args:
         alpaca_client (REST): Initialized Alpaca REST client.
         tickers (list): List of stock tickers to fetch.
         start_date (str): Start date in 'YYYY-MM-DD' format.
         end_date (str): End date in 'YYYY-MM-DD' format.
-        years_back (int): Number of years for threshold (default: 5).
+        years_back (int, optional): Minimum years of bars a ticker needs to be kept
+            (default: None, no threshold).
     
     Returns:
-        pd.DataFrame: Combined OHLC data for all tickers.
-    """
-    alpaca_df = pd.DataFrame()
-    start_time = time.time()
-    missing_data_count = 0
-    not_enough_time_count = 0
-    processed_ticker_count = 0
-    trading_days_back = years_back * 252  # Approx trading days/year
-
-    for ticker in tqdm(tickers, desc="Alpaca Download Progress"):
-        try:
-            processed_ticker_count += 1
-            bars = alpaca_client.get_bars(ticker, "1Day", start_date, end_date).df
-            
-            if not bars.empty:
-                df = bars[['open', 'high', 'low', 'close']].reset_index()
-                if len(df) < trading_days_back:
-                    missing_data_count += 1
-                    not_enough_time_count += 1
-                    continue
-                
-                df['ticker'] = ticker
-                df['date'] = df['timestamp'].dt.strftime("%Y-%m-%d")
-                df = df[['ticker', 'date', 'open', 'high', 'low', 'close']]
-                alpaca_df = pd.concat([alpaca_df, df])
-            else:
-                missing_data_count += 1
-                #logging.warning(f"No data for {ticker}")
-                #print(f"No data for {ticker}")
-            
-            time.sleep(1)  # Avoid rate limiting
-        except Exception as e:
-            #logging.error(f"Error for {ticker}: {e}")
-            #print(f"Error for {ticker}: {e}")
-            time.sleep(1)
+        pd.DataFrame: Combined bars for all tickers.
 
-    total_seconds = time.time() - start_time
-    seconds_per_ticker = round(total_seconds / len(tickers), 2)
-    #logging.info(f"Fetched {len(alpaca_df)} rows in {total_seconds:.2f} seconds.")
-    ##print(f"\nFetched {len(alpaca_df)} rows of stock data in {total_seconds:.2f} seconds.")
-    ##print(f"Processed {processed_ticker_count} tickers, missing {missing_data_count} tickers, "
-    #      f"{not_enough_time_count} tickers did not have enough time.")
-    ##print(f"Processing time per ticker: {seconds_per_ticker:.2f} seconds.")
-    return alpaca_df
+    Delegates to `src.utils.alpaca_utils.fetch_alpaca_historical_data`, which batches
+    symbols and is paced by the shared request policy rather than fixed sleeps.
+    """
+    return alpaca_utils.fetch_alpaca_historical_data(alpaca_client, tickers, start_date, end_date,
+                                                     years_back=years_back, cache=False)
 
 def fetch_alpaca_yesterday_ohlc(alpaca_client, tickers):
     """
@@ -134,75 +97,31 @@ def fetch_alpaca_yesterday_ohlc(alpaca_client, tickers):
     
     Returns:
         pd.DataFrame: OHLC data for yesterday.
-    """
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    start_time = time.time()
-    daily_df = pd.DataFrame()
-
-    for ticker in tqdm(tickers, desc="Fetching Yesterday's OHLC"):
-        try:
-            bars = alpaca_client.get_bars(ticker, "1Day", yesterday, yesterday).df
-            if not bars.empty:
-                bars.reset_index(inplace=True)
-                ohlc = bars[['timestamp', 'open', 'high', 'low', 'close']]
-                ohlc['ticker'] = ticker
-                ohlc['date'] = ohlc['timestamp'].dt.strftime("%Y-%m-%d")
-                daily_df = pd.concat([daily_df, ohlc[['ticker', 'date', 'open', 'high', 'low', 'close']]])
-            time.sleep(1)
-        except Exception as e:
-            #logging.error(f"Error fetching {ticker}: {e}")
-            ##print(f"Error fetching {ticker}: {e}")
-            time.sleep(1)
 
-    fetch_time = time.time() - start_time
-    seconds_per_ticker = round(fetch_time / len(tickers), 2)
-    #logging.info(f"Fetched OHLC for {yesterday} in {fetch_time:.2f} seconds.")
-    ##print(f"\nFetched OHLC data for yesterday ({yesterday}) in {fetch_time:.2f} seconds.")
-    ##print(f"Average processing time per ticker: {seconds_per_ticker:.2f} seconds.")
-    return daily_df
+    Delegates to `src.utils.alpaca_utils.fetch_alpaca_yesterday_ohlc` (one batched,
+    policy-paced request per 200 symbols instead of one sleeping request per ticker).
+    """
+    return alpaca_utils.fetch_alpaca_yesterday_ohlc(alpaca_client, tickers)
 
 def fetch_alpaca_open_prices(alpaca_client, tickers):
     """
-    Fetch today's opening prices at market open (9:30 AM EST/EDT) for a list of tickers.
-    
+    Fetch today's opening prices for a list of tickers.
+
+    Delegates to `src.etl.capture_open.capture_open_prices`, which reads batched
+    snapshots and takes the session open from the trading calendar (correct in
+    both EST and EDT).
+
     Args:
         alpaca_client (REST): Initialized Alpaca REST client.
         tickers (list): List of stock tickers to fetch.
-    
+
     Returns:
-        pd.DataFrame: Opening prices at market open.
+        pd.DataFrame: Opening prices with 'ticker', 'date' and 'open'.
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    market_open = f"{today}T09:30:00-05:00"
-    market_open_dt = pd.Timestamp(market_open)
-    start_time = time.time()
-    open_prices_df = pd.DataFrame()
-
-    for ticker in tqdm(tickers, desc="Fetching Today's Open Prices"):
-        try:
-            bars = alpaca_client.get_bars(
-                ticker, "1Min", market_open_dt.isoformat(), 
-                (market_open_dt + timedelta(minutes=1)).isoformat()
-            ).df
-            if not bars.empty:
-                bars.reset_index(inplace=True)
-                open_price = bars.iloc[0]['open']
-                open_prices_df = pd.concat([
-                    open_prices_df,
-                    pd.DataFrame({'ticker': [ticker], 'date': [today], 'open': [open_price]})
-                ])
-            time.sleep(1)
-        except Exception as e:
-            #logging.error(f"Error fetching {ticker}: {e}")
-            ##print(f"Error fetching {ticker}: {e}")
-            time.sleep(1)
+    from src.etl.capture_open import capture_open_prices
 
-    fetch_time = time.time() - start_time
-    seconds_per_ticker = round(fetch_time / len(tickers), 2)
-    #logging.info(f"Fetched open prices for {today} in {fetch_time:.2f} seconds.")
-    ##print(f"\nFetched today's open prices ({today}) in {fetch_time:.2f} seconds.")
-    ##print(f"Average processing time per ticker: {seconds_per_ticker:.2f} seconds.")
-    return open_prices_df
+    result = capture_open_prices(tickers, alpaca_client, wait=False, timeout=0)
+    return result['prices'][['ticker', 'date', 'open']]
 
 def fetch_alpaca_latest_bars(alpaca_client, tickers):
     """
@@ -9,6 +9,14 @@ from .smoothers import (
     lowess_ci_pi, 
     exp_smooth_ci_pi,
     sma_smoother,
+    lowess_equal_spacing,
+    )
+
+from .panel_smoothers import (
+    ema_panel,
+    sma_panel,
+    lowess_panel,
+    smooth_panel,
     )
 
 from .transformations import (
@@ -37,6 +45,11 @@ __all__ = [
     'lowess_ci_pi',
     'exp_smooth_ci_pi',
     'sma_smoother',
+    'lowess_equal_spacing',
+    'ema_panel',
+    'sma_panel',
+    'lowess_panel',
+    'smooth_panel',
     'check_positive',
     'log_transform',
     'difference',
@@ -0,0 +1,233 @@
+# src/statistics/panel_smoothers.py
+
+"""
+Batched smoothers for a whole panel of series at once.
+
+`src.statistics.smoothers` smooths one pandas Series per call. The functions here
+take a 2D (time x series) array or DataFrame, e.g. the output of
+`fetch_price_panel`, and smooth every column in one vectorized pass:
+
+- `ema_panel`: the exponential smoother as a first-order recursive filter
+  (`scipy.signal.lfilter`) along the time axis, initialized per column exactly
+  like `SimpleExpSmoothing(initialization_method="estimated")` with a fixed alpha.
+- `sma_panel`: centered simple moving average from cumulative sums.
+- `lowess_panel`: LOWESS with the settings of `smooth_lowess`, every column in
+  the same cached banded-kernel products (`lowess_equal_spacing`).
+
+Each column gives the same values as the single-series function. Leading NaNs
+(tickers with a shorter history) are supported by `ema_panel` and `sma_panel`:
+each column starts at its first valid observation and is NaN before it.
+
+Functions
+---------
+ema_panel(panel, window_length=30)
+    Exponential smoothing of every column (fitted values of `exponential_smoother`).
+
+sma_panel(panel, window_length=30)
+    Centered moving average of every column (as `sma_smoother`).
+
+lowess_panel(panel, window_length=30, iterations=2)
+    LOWESS of every column (as `smooth_lowess`).
+
+smooth_panel(panel, method='lowess', window_length=30, iterations=2)
+    Dispatch to one of the above by name.
+
+Usage Examples
+--------------
+>>> panel = fetch_price_panel(tickers, 150)
+>>> smoothed = smooth_panel(panel, method='ema', window_length=30)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from src.statistics.smoothers import lowess_equal_spacing
+
+PANEL_METHODS = ('lowess', 'ema', 'sma')
+HEURISTIC_MIN_OBS = 10  # statsmodels' "estimated" initialization regresses on the first 10 values
+
+
+def _as_array(panel):
+    """Panel values as a float64 2D array (a 1D input becomes one column)."""
+    values = np.asarray(panel, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 2D (time x series) panel, got {values.ndim} dimensions.")
+    return values
+
+
+def _like_input(panel, values):
+    """Wrap `values` in the type and labels of `panel`."""
+    if isinstance(panel, pd.DataFrame):
+        return pd.DataFrame(values, index=panel.index, columns=panel.columns)
+    if isinstance(panel, pd.Series):
+        return pd.Series(values[:, 0], index=panel.index, name=panel.name)
+    return values[:, 0] if np.ndim(panel) == 1 else values
+
+
+def _first_valid(values):
+    """Row of the first non-NaN value per column (len(values) for all-NaN columns)."""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+
+
+def initial_levels(values, start=None):
+    """
+    Initial level per column, as statsmodels' "estimated" initialization computes it.
+
+    Columns with at least 10 observations from `start` use the intercept of a linear
+    fit to their first 10 values (the heuristic of Hyndman & Athanasopoulos, section
+    2.6). Shorter columns use their first value.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D (time x series) array.
+    start : np.ndarray, optional
+        First row of each column (default: the first valid row).
+
+    Returns
+    -------
+    np.ndarray
+        One level per column.
+    """
+    n, k = values.shape
+    start = _first_valid(values) if start is None else start
+    columns = np.arange(k)
+    levels = np.full(k, np.nan)
+    simple = start < n
+    levels[simple] = values[start[simple], columns[simple]]
+
+    heuristic = start + HEURISTIC_MIN_OBS <= n
+    if heuristic.any():
+        # Intercept of y ~ 1 + t over t = 1..10, i.e. the first row of pinv([1, t]) applied to each column
+        t = np.arange(HEURISTIC_MIN_OBS) + 1.0
+        weights = np.linalg.pinv(np.c_[np.ones(HEURISTIC_MIN_OBS), t])[0]
+        rows = start[heuristic][None, :] + np.arange(HEURISTIC_MIN_OBS)[:, None]
+        levels[heuristic] = weights @ values[rows, columns[heuristic]]
+    return levels
+
+
+def ema_panel(panel, window_length=30):
+    """
+    Exponentially smooth every column of a panel.
+
+    The fitted values follow `f[t] = alpha * y[t-1] + (1 - alpha) * f[t-1]` with
+    `alpha = 2 / (window_length + 1)` and `f[start]` the column's initial level, the
+    same recursion `exponential_smoother` fits through `SimpleExpSmoothing`.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame or np.ndarray
+        2D (time x series) values. A Series or 1D array is treated as one column.
+    window_length : int, optional
+        Window length used to set the smoothing factor alpha, by default 30.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Fitted values, same shape and labels as `panel`; NaN before each column's
+        first valid value.
+    """
+    values = _as_array(panel)
+    alpha = 2 / (window_length + 1)
+    start = _first_valid(values)
+    levels = initial_levels(values, start)
+
+    # Before its start a column is held at its initial level, which the recursion leaves unchanged
+    before_start = np.arange(len(values))[:, None] < start[None, :]
+    filled = np.where(before_start, levels[None, :], values)
+    fitted, _ = lfilter([0.0, alpha], [1.0, alpha - 1.0], filled, axis=0, zi=levels[None, :])
+    fitted[before_start] = np.nan
+    return _like_input(panel, fitted)
+
+
+def sma_panel(panel, window_length=30):
+    """
+    Centered simple moving average of every column of a panel.
+
+    Matches `y.rolling(window_length, min_periods=1, center=True).mean()`: the
+    window at row t spans rows `t - window_length // 2` to
+    `t + (window_length - 1) // 2`, truncated at the ends, and NaNs are skipped.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame or np.ndarray
+        2D (time x series) values. A Series or 1D array is treated as one column.
+    window_length : int, optional
+        Window size, by default 30.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Moving averages, same shape and labels as `panel`.
+    """
+    values = _as_array(panel)
+    n = len(values)
+    valid = ~np.isnan(values)
+    sums = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(valid, axis=0)])
+
+    rows = np.arange(n)
+    lower = np.clip(rows - window_length // 2, 0, n)
+    upper = np.clip(rows + (window_length - 1) // 2 + 1, 0, n)
+    window_counts = counts[upper] - counts[lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(window_counts > 0, (sums[upper] - sums[lower]) / window_counts, np.nan)
+    return _like_input(panel, means)
+
+
+def lowess_panel(panel, window_length=30, iterations=2):
+    """
+    LOWESS of every column of a panel, with the settings of `smooth_lowess`.
+
+    Missing values are replaced by 0 first, as `smooth_lowess` does.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame or np.ndarray
+        2D (time x series) values. A Series or 1D array is treated as one column.
+    window_length : int, optional
+        Window size for smoothing, by default 30.
+    iterations : int, optional
+        Robustifying iterations, by default 2.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Smoothed values, same shape and labels as `panel`.
+    """
+    values = np.nan_to_num(_as_array(panel), nan=0.0)
+    frac = min(max(window_length / len(values), 0.01), 1)
+    return _like_input(panel, lowess_equal_spacing(values, frac, iterations))
+
+
+def smooth_panel(panel, method='lowess', window_length=30, iterations=2):
+    """
+    Smooth every column of a panel with one of the standard smoothers.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame or np.ndarray
+        2D (time x series) values.
+    method : {'lowess', 'ema', 'sma'}, optional
+        Smoother to apply, by default 'lowess'.
+    window_length : int, optional
+        Window size, by default 30.
+    iterations : int, optional
+        LOWESS robustifying iterations, by default 2.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Smoothed values, same shape and labels as `panel`.
+    """
+    if method == 'lowess':
+        return lowess_panel(panel, window_length=window_length, iterations=iterations)
+    if method == 'ema':
+        return ema_panel(panel, window_length=window_length)
+    if method == 'sma':
+        return sma_panel(panel, window_length=window_length)
+    raise ValueError(f"Unknown smoothing method '{method}'; expected one of {PANEL_METHODS}.")
@@ -8,8 +8,18 @@ including LOWESS (Locally Weighted Scatterplot Smoothing), exponential smoothing
 Each method includes functions for calculating smoothed values along with their respective confidence
 and prediction intervals.
 
+Every LOWESS here runs on the equally spaced grid x = 0, 1, ..., n-1, so the tricube
+weights and the first-pass local-linear hat matrix depend only on n and the
+neighborhood size. `lowess_equal_spacing` caches them per (n, neighbors) as sparse
+banded matrices and smooths by matrix products, with the robustifying iterations
+vectorized over the whole series (and over every column of a panel). It reproduces
+`sm.nonparametric.lowess` to floating-point tolerance.
+
 Functions
 ---------
+lowess_equal_spacing(values, frac, iterations=2)
+    LOWESS of one series or of every column of a panel on x = arange(n).
+
 smooth_lowess(y_series, window_length=30, iterations=2)
     Apply LOWESS smoothing to the input series.
 
@@ -32,6 +42,7 @@ Dependencies
 ------------
 - numpy
 - pandas
+- scipy
 - statsmodels
 
 Usage Examples
@@ -39,11 +50,124 @@ Usage Examples
 Calculate LOWESS smoothed data:
 """
 
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import statsmodels.api as sm
 from statsmodels.tsa.holtwinters import SimpleExpSmoothing
 
+MIN_WEIGHT = 1e-12  # statsmodels: weights at or below this do not count towards a valid local fit
+# Median absolute residual (relative to the data) below which robust weights hinge on
+# which residuals are exactly zero, i.e. on rounding; such columns are left to statsmodels
+DEGENERATE_RESIDUAL = 1e-9
+
+
+def lowess_neighbors(n, frac):
+    """Points in each local regression, as `sm.nonparametric.lowess` computes it."""
+    return min(max(int(frac * n + 1e-10), 2), n)
+
+
+@lru_cache(maxsize=64)
+def _lowess_kernels(n, k):
+    """
+    Sparse banded kernels of equal-spacing LOWESS with `k` neighbors.
+
+    Returns (W, WD, WD2, P, valid): tricube weights W[i, j], W * (j - i) and
+    W * (j - i)**2 for the weighted moments of the robust passes, the first-pass hat
+    matrix P (fit = P @ y) and a 0/1 matrix of the weights above `MIN_WEIGHT`.
+    """
+    # Neighborhood of k consecutive points, slid right until x_i is not past its center
+    rows = np.arange(n)
+    left = np.clip(np.ceil(rows - k / 2).astype(int), 0, n - k)
+    offsets = left[:, None] + np.arange(k)[None, :]
+    distance = offsets - rows[:, None]
+    radius = np.maximum(rows - left, left + k - 1 - rows)[:, None]
+    weights = (1 - (np.abs(distance) / radius) ** 3) ** 3
+
+    # First pass: normalized weights and the local-linear projection
+    normalized = weights / weights.sum(axis=1, keepdims=True)
+    mean = (normalized * distance).sum(axis=1, keepdims=True)
+    variance = np.fmax((normalized * (distance - mean) ** 2).sum(axis=1, keepdims=True), MIN_WEIGHT)
+    projection = normalized * (1.0 - mean * (distance - mean) / variance)
+    # Fewer than two positive weights: statsmodels keeps the observation itself
+    degenerate = (weights > MIN_WEIGHT).sum(axis=1) < 2
+    projection[degenerate] = (offsets[degenerate] == rows[degenerate, None])
+
+    def banded(values):
+        return sp.csr_matrix((values.ravel(), offsets.ravel(), np.arange(0, n * k + 1, k)), shape=(n, n))
+
+    return (banded(weights), banded(weights * distance), banded(weights * distance ** 2),
+            banded(projection), banded((weights > MIN_WEIGHT).astype(np.float64)))
+
+
+def _robust_weights(values, fitted):
+    """
+    Bisquare weights of the residuals, scaled by 6 median absolute residuals per column.
+
+    Also returns a mask of the columns whose median residual is numerically zero.
+    """
+    residuals = np.abs(values - fitted)
+    median = np.median(residuals, axis=0, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scaled = np.where(median == 0, (residuals > 0).astype(np.float64), residuals / (6.0 * median))
+    degenerate = median[0] <= DEGENERATE_RESIDUAL * np.abs(values).max(axis=0)
+    return (1 - np.minimum(scaled, 1.0) ** 2) ** 2, degenerate
+
+
+def lowess_equal_spacing(values, frac, iterations=2):
+    """
+    LOWESS on the equally spaced grid x = arange(n) with cached banded kernels.
+
+    Equivalent to `sm.nonparametric.lowess(y, np.arange(n), frac=frac, it=iterations)[:, 1]`
+    for every column, within floating-point tolerance. Columns whose median absolute
+    residual is numerically zero (flat or step-like stretches) make the robust weights
+    depend on rounding, so they, and series shorter than 3 points, are passed to
+    statsmodels instead.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1D series or 2D (time x series) panel without missing values.
+    frac : float
+        Fraction of the points used in each local regression.
+    iterations : int, optional
+        Robustifying iterations, by default 2.
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed values, same shape as `values`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    panel = values if values.ndim == 2 else values[:, None]
+    n = len(panel)
+    fallback = np.full(panel.shape[1], n < 3)
+    fitted = panel.copy()
+
+    if n >= 3:
+        weights, weights_d, weights_d2, projection, positive = _lowess_kernels(n, lowess_neighbors(n, frac))
+        fitted = projection @ panel
+        for _ in range(iterations):
+            robust, degenerate = _robust_weights(panel, fitted)
+            fallback |= degenerate
+            # Weighted moments of d = x_j - x_i and y over each neighborhood
+            total = weights @ robust
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_d = (weights_d @ robust) / total
+                mean_y = (weights @ (robust * panel)) / total
+                variance = np.fmax((weights_d2 @ robust) / total - mean_d ** 2, MIN_WEIGHT)
+                covariance = (weights_d @ (robust * panel)) / total - mean_d * mean_y
+            fitted = mean_y - mean_d * covariance / variance
+            too_few = (positive @ (robust > 0)) < 2
+            fitted[too_few] = panel[too_few]
+
+    x = np.arange(n)
+    for j in np.flatnonzero(fallback):
+        fitted[:, j] = sm.nonparametric.lowess(panel[:, j], x, frac=frac, it=iterations)[:, 1]
+    return fitted if values.ndim == 2 else fitted[:, 0]
+
 
 def smooth_lowess(y_series, window_length=30, iterations=2):
     """
@@ -64,10 +188,8 @@ def smooth_lowess(y_series, window_length=30, iterations=2):
         Smoothed data.
     """
     y_series = y_series.fillna(0)
-    x_series = np.arange(len(y_series))
-    frac = min(max(window_length / len(x_series), 0.01), 1)
-    smooth = sm.nonparametric.lowess(y_series, x_series, frac=frac, it=iterations)
-    return smooth[:, 1]
+    frac = min(max(window_length / len(y_series), 0.01), 1)
+    return lowess_equal_spacing(y_series.to_numpy(dtype=np.float64), frac, iterations)
 
 
 def exponential_smoother(y_series, window_length=30):
@@ -138,9 +260,13 @@ def lowess_ci_pi(y_series, window_length=30, iterations=2, num_bootstrap=500, ci
     # Fit the LOWESS smoother
     x_series = np.arange(len(y_series))
     frac = min(max(window_length / len(x_series), 0.01), 1)
-    fitted_lowess_smoother = sm.nonparametric.lowess(
-        y_series, x_series, frac=frac, it=iterations
-    )[:, 1]
+    y_values = np.asarray(y_series, dtype=np.float64)
+    if np.isfinite(y_values).all():
+        fitted_lowess_smoother = lowess_equal_spacing(y_values, frac, iterations)
+    else:
+        fitted_lowess_smoother = sm.nonparametric.lowess(
+            y_series, x_series, frac=frac, it=iterations
+        )[:, 1]
 
     # Calculate residuals and standard deviation
     residuals = y_series - fitted_lowess_smoother
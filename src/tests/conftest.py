@@ -0,0 +1,27 @@
+# src/tests/conftest.py
+
+import sqlite3
+import pytest
+from src.db_schema import DATABASES
+
+
+def schema_conn(db_name):
+    """In-memory database with every table of `db_name` from `DATABASES`."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    for schema in DATABASES[db_name]:
+        conn.execute(schema)
+    return conn
+
+
+@pytest.fixture
+def assets_conn():
+    conn = schema_conn("assets.db")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def exogenous_conn():
+    conn = schema_conn("exogenous.db")
+    yield conn
+    conn.close()
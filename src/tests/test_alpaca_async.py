@@ -0,0 +1,123 @@
+# src/tests/test_alpaca_async.py
+
+import asyncio
+import time
+import pandas as pd
+from aiohttp import web
+from src.utils.alpaca_async import download_bars_async
+from src.utils.rate_limit import TokenBucket
+
+
+def make_bars(symbol, n):
+    dates = pd.bdate_range("2024-01-02", periods=n)
+    return [
+        {"t": d.strftime("%Y-%m-%dT05:00:00Z"), "o": 10.0 + i, "h": 11.0 + i, "l": 9.0 + i,
+         "c": 10.5 + i, "v": 1000 + i, "n": 10, "vw": 10.2 + i}
+        for i, d in enumerate(dates)
+    ]
+
+
+class FakeAlpaca:
+    """Local stand-in for the Alpaca data API bars endpoint with pagination and fault injection."""
+
+    def __init__(self, bars_per_symbol=5, page_size=2, fail_first=(), missing=()):
+        self.bars_per_symbol = bars_per_symbol
+        self.page_size = page_size
+        self.fail_first = set(fail_first)
+        self.missing = set(missing)
+        self.requests = []
+
+    async def bars(self, request):
+        symbol = request.match_info["symbol"]
+        self.requests.append((time.monotonic(), symbol, dict(request.query)))
+        if request.headers.get("APCA-API-KEY-ID") != "key":
+            return web.json_response({"message": "forbidden"}, status=403)
+        if symbol in self.fail_first:
+            self.fail_first.discard(symbol)
+            return web.json_response({"message": "too many requests"}, status=429)
+        if symbol in self.missing:
+            return web.json_response({"bars": None, "symbol": symbol, "next_page_token": None})
+
+        bars = make_bars(symbol, self.bars_per_symbol)
+        offset = int(request.query.get("page_token", 0))
+        page = bars[offset:offset + self.page_size]
+        next_token = str(offset + self.page_size) if offset + self.page_size < len(bars) else None
+        return web.json_response({"bars": page, "symbol": symbol, "next_page_token": next_token})
+
+
+async def run_download(fake, tickers, key_id="key", **kwargs):
+    app = web.Application()
+    app.router.add_get("/v2/stocks/{symbol}/bars", fake.bars)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    results = {}
+    try:
+        summary = await download_bars_async(
+            tickers, "2024-01-01", "2024-02-01",
+            on_result=lambda symbol, frame: results.__setitem__(symbol, frame),
+            key_id=key_id, secret_key="secret", data_url=f"http://127.0.0.1:{port}",
+            retry_wait=0.01, **kwargs,
+        )
+    finally:
+        await runner.cleanup()
+    return summary, results
+
+
+# Test that every ticker is streamed to the callback with all pages joined.
+def test_download_streams_all_pages():
+    fake = FakeAlpaca(bars_per_symbol=5, page_size=2, missing=["EMPTY"])
+    tickers = ["AAA", "BBB", "CCC", "EMPTY"]
+    summary, results = asyncio.run(run_download(fake, tickers, requests_per_minute=60000))
+
+    assert set(results) == set(tickers)
+    assert summary["completed"] == 4 and summary["empty"] == 1 and not summary["failed"]
+    assert len(results["AAA"]) == 5, "Pagination did not collect every page."
+    assert list(results["AAA"]["date"][:2]) == ["2024-01-02", "2024-01-03"]
+    assert summary["rows"] == 15
+
+
+# Test that a 429 is retried and a non-retryable error is reported per ticker.
+def test_download_retries_and_failures():
+    fake = FakeAlpaca(fail_first=["AAA"])
+    summary, results = asyncio.run(run_download(fake, ["AAA", "BBB"], requests_per_minute=60000))
+    assert "AAA" in results and summary["retries"] == 1
+
+    failed, results = asyncio.run(run_download(fake, ["AAA"], key_id="wrong"))
+    assert "AAA" in failed["failed"] and not results
+    assert failed["retries"] == 0, "Authentication errors must not be retried."
+
+
+# Test that the shared token bucket caps the request rate.
+def test_download_respects_token_bucket():
+    fake = FakeAlpaca(bars_per_symbol=1, page_size=1)
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    summary, _ = asyncio.run(run_download(fake, [f"T{i}" for i in range(11)], bucket=bucket, max_concurrency=11))
+    elapsed = time.monotonic() - start
+
+    assert summary["completed"] == 11
+    assert elapsed >= 0.45, f"11 requests at 20/s finished too fast ({elapsed:.2f}s)."
+
+
+
+# Test that asking for more tokens than the bucket can hold fails instead of waiting forever.
+def test_token_bucket_rejects_oversized_requests():
+    bucket = TokenBucket(rate=10, capacity=2)
+    bucket.acquire(2)
+    for acquire in (lambda: bucket.acquire(3), lambda: asyncio.run(bucket.acquire_async(3))):
+        try:
+            acquire()
+            assert False, "Requests above capacity must raise."
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_download_streams_all_pages()
+    test_download_retries_and_failures()
+    test_download_respects_token_bucket()
+    test_token_bucket_rejects_oversized_requests()
+    print("✅ All async downloader tests passed successfully!")
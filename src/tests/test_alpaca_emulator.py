@@ -0,0 +1,86 @@
+# src/tests/test_alpaca_emulator.py
+
+import asyncio
+import requests
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.alpaca_utils import fetch_alpaca_stock_tickers, fetch_alpaca_bars_batched, fetch_alpaca_latest_bars
+from src.utils.alpaca_async import download_bars
+
+AUTH = {"APCA-API-KEY-ID": "key", "APCA-API-SECRET-KEY": "secret"}
+
+
+# Test the SDK-facing asset, bar and latest-bar endpoints, including pagination.
+def test_emulator_serves_sdk_calls():
+    with AlpacaEmulator(n_symbols=5, start_date="2024-01-01", end_date="2024-03-29") as emulator:
+        client = emulator.client()
+        assert fetch_alpaca_stock_tickers(client) == emulator.symbols
+
+        bars = client.get_bars("AAA", "1Day", "2024-01-01", "2024-01-31", limit=None)
+        assert len(bars) == 23 and bars[0].t.strftime("%Y-%m-%d") == "2024-01-01"  # weekdays, no holiday calendar
+
+        frames = fetch_alpaca_bars_batched(client, emulator.symbols, "1Min", "2024-03-28", "2024-03-29", chunk_size=2)
+        assert set(frames) == set(emulator.symbols)
+        assert all(len(frame) == 780 for frame in frames.values()), "Multi-symbol pages must be reassembled."
+        daily = emulator.daily_bars("AAA").set_index("date")
+        minutes = frames["AAA"][frames["AAA"]["date"] == "2024-03-28"]
+        assert minutes["high"].max() <= daily.loc["2024-03-28", "high"]
+        assert minutes["close"].iloc[-1] == daily.loc["2024-03-28", "close"]
+
+        latest = fetch_alpaca_latest_bars(client, emulator.symbols[:2])
+        assert list(latest["ticker"]) == emulator.symbols[:2]
+
+
+# Test the async downloader against the emulator with latency.
+def test_emulator_with_async_downloader():
+    with AlpacaEmulator(n_symbols=20, start_date="2024-01-01", end_date="2024-06-28", latency=0.01) as emulator:
+        summary = download_bars(emulator.symbols, "2024-01-01", "2024-06-28", key_id="key", secret_key="secret",
+                                requests_per_minute=60000, max_concurrency=10)
+    assert summary["completed"] == 20 and not summary["failed"]
+    assert summary["rows"] == 20 * 130
+
+
+# Test the synchronous downloader also works inside a running event loop (as in Jupyter).
+def test_download_bars_inside_running_loop():
+    async def notebook_cell(emulator):
+        return download_bars(emulator.symbols, "2024-01-01", "2024-01-31", key_id="key", secret_key="secret",
+                             requests_per_minute=60000)
+
+    with AlpacaEmulator(n_symbols=3, start_date="2024-01-01", end_date="2024-01-31") as emulator:
+        summary = asyncio.run(notebook_cell(emulator))
+    assert summary["completed"] == 3 and not summary["failed"]
+
+
+# Test submitting, listing and cancelling orders.
+def test_emulator_orders():
+    with AlpacaEmulator(n_symbols=3) as emulator:
+        client = emulator.client()
+        filled = client.submit_order("AAA", qty=10, side="buy", type="market", time_in_force="day")
+        assert filled.status == "filled" and float(filled.filled_avg_price) > 0
+
+        resting = client.submit_order("AAB", qty=5, side="sell", type="limit", time_in_force="gtc", limit_price=1000)
+        assert [o.id for o in client.list_orders(status="open")] == [resting.id]
+        client.cancel_order(resting.id)
+        assert client.get_order(resting.id).status == "canceled"
+        assert client.list_orders(status="open") == []
+
+
+# Test rate limiting, authentication and injected errors.
+def test_emulator_faults():
+    with AlpacaEmulator(n_symbols=2, rate_limit=(3, 60)) as emulator:
+        url = f"{emulator.url}/v2/assets"
+        assert requests.get(url, headers={**AUTH, "APCA-API-SECRET-KEY": "wrong"}).status_code == 403
+
+        emulator.fail_next(1, status=503, path="/v2/assets")
+        statuses = [requests.get(url, headers=AUTH) for _ in range(4)]
+        assert [r.status_code for r in statuses] == [503, 200, 200, 429]
+        assert statuses[2].headers["X-RateLimit-Remaining"] == "0"
+        assert emulator.stats["throttled"] == 1 and emulator.stats["errors_injected"] == 1
+
+
+if __name__ == "__main__":
+    test_emulator_serves_sdk_calls()
+    test_emulator_with_async_downloader()
+    test_download_bars_inside_running_loop()
+    test_emulator_orders()
+    test_emulator_faults()
+    print("✅ All Alpaca emulator tests passed successfully!")
@@ -0,0 +1,219 @@
+# src/tests/test_alpaca_stream.py
+
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from aiohttp import web
+import src.utils.alpaca_stream as alpaca_stream
+from src.utils.alpaca_stream import BarStream, RollingBars, DailyBarAggregator
+
+RECORDED_BARS = [
+    [{"T": "b", "S": "AAA", "t": "2024-01-02T14:30:00Z", "o": 10.0, "h": 10.5, "l": 9.9, "c": 10.2, "v": 1200, "n": 12, "vw": 10.1},
+     {"T": "b", "S": "BBB", "t": "2024-01-02T14:30:00Z", "o": 50.0, "h": 50.2, "l": 49.8, "c": 50.1, "v": 300, "n": 4, "vw": 50.0}],
+    [{"T": "b", "S": "AAA", "t": "2024-01-02T14:31:00Z", "o": 10.2, "h": 10.4, "l": 10.1, "c": 10.3, "v": 800, "n": 9, "vw": 10.25}],
+    [{"T": "u", "S": "AAA", "t": "2024-01-02T14:31:00Z", "o": 10.2, "h": 10.6, "l": 10.1, "c": 10.5, "v": 900, "n": 10, "vw": 10.3}],
+    [{"T": "b", "S": "ZZZ", "t": "2024-01-02T14:31:00Z", "o": 1.0, "h": 1.0, "l": 1.0, "c": 1.0, "v": 1, "n": 1, "vw": 1.0}],
+]
+
+
+class FakeStream:
+    """Local stand-in for the Alpaca market data websocket that replays recorded bars, then hangs up."""
+
+    def __init__(self, messages, secret="secret", drops=0):
+        self.messages = messages
+        self.secret = secret
+        self.drops = drops
+        self.connections = 0
+        self.subscriptions = []
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        await ws.send_str(json.dumps([{"T": "success", "msg": "connected"}]))
+        auth = json.loads((await ws.receive()).data)
+        if auth.get("secret") != self.secret:
+            await ws.send_str(json.dumps([{"T": "error", "code": 402, "msg": "auth failed"}]))
+            await ws.close()
+            return ws
+        await ws.send_str(json.dumps([{"T": "success", "msg": "authenticated"}]))
+        subscribe = json.loads((await ws.receive()).data)
+        self.subscriptions.append(subscribe["bars"])
+        await ws.send_str(json.dumps([{"T": "subscription", "bars": subscribe["bars"]}]))
+
+        # Drop the first connection(s) halfway through to exercise reconnects
+        messages = self.messages[:1] if self.connections <= self.drops else self.messages
+        for message in messages:
+            await ws.send_str(json.dumps(message))
+        await ws.close()
+        return ws
+
+
+async def run_stream(fake, conn, **kwargs):
+    app = web.Application()
+    app.router.add_get("/v2/iex", fake.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    stream = BarStream(["AAA", "BBB"], key_id="key", url=f"ws://127.0.0.1:{port}/v2/iex", conn=conn,
+                       asset_ids={"AAA": 1, "BBB": 2}, reconnect_wait=0.01, **kwargs)
+    try:
+        stats = await stream.run(duration=5)
+    finally:
+        await runner.cleanup()
+    return stream, stats
+
+
+# Test that replayed bars reach the rolling state and are persisted in batches.
+def test_stream_persists_bars_in_batches(assets_conn):
+    fake = FakeStream(RECORDED_BARS)
+    stream, stats = asyncio.run(run_stream(fake, assets_conn, secret_key="secret", flush_rows=2, max_reconnects=0))
+
+    assert fake.subscriptions == [["AAA", "BBB"]]
+    assert stats["bars"] == 5 and stats["flushes"] >= 2
+    rows = assets_conn.execute("SELECT asset_id, timestamp, close, volume FROM asset_prices_intraday ORDER BY asset_id, timestamp").fetchall()
+    assert rows == [(1, "2024-01-02T14:30:00Z", 10.2, 1200), (1, "2024-01-02T14:31:00Z", 10.5, 900),
+                    (2, "2024-01-02T14:30:00Z", 50.1, 300)], "Corrections must replace bars; unknown symbols stay in memory."
+
+    assert stream.bars.latest("AAA")["close"] == 10.5
+    assert len(stream.bars.frame("AAA")) == 2
+    assert stream.bars.latest("ZZZ")["close"] == 1.0
+
+
+# Test that a dropped connection is re-established and the session resumes.
+def test_stream_reconnects(assets_conn):
+    fake = FakeStream(RECORDED_BARS, drops=1)
+    _, stats = asyncio.run(run_stream(fake, assets_conn, secret_key="secret", max_reconnects=1))
+    assert fake.connections == 2 and stats["reconnects"] == 1
+    assert assets_conn.execute("SELECT COUNT(*) FROM asset_prices_intraday").fetchone()[0] == 3
+
+
+# Test that an authentication failure surfaces as an error instead of a reconnect loop.
+def test_stream_auth_failure(assets_conn):
+    fake = FakeStream(RECORDED_BARS)
+    try:
+        asyncio.run(run_stream(fake, assets_conn, secret_key="wrong"))
+    except Exception as e:
+        assert "auth failed" in str(e)
+    else:
+        raise AssertionError("Authentication failure was not raised.")
+    assert fake.connections == 1
+
+
+# Test that the ring buffer keeps only the latest window, oldest first.
+def test_rolling_bars_window():
+    bars = RollingBars(["AAA"], window=3)
+    for minute in range(5):
+        bars.update("AAA", np.datetime64(f"2024-01-02T14:3{minute}:00", "s"), [minute] * 7)
+    frame = bars.frame("AAA")
+    assert list(frame["close"]) == [2, 3, 4]
+    assert str(frame.index[0]) == "2024-01-02 14:32:00+00:00"
+
+
+# Test the daily bar matches an aggregate of the minute bars, with corrections replacing minutes.
+def test_daily_aggregator_matches_minute_bars():
+    session = (pd.Timestamp("2024-01-02 14:30", tz="UTC"), pd.Timestamp("2024-01-02 21:00", tz="UTC"))
+    daily = DailyBarAggregator(["AAA"], session)
+    rng = np.random.default_rng(0)
+    times = np.datetime64("2024-01-02T14:30:00", "s") + np.arange(390) * np.timedelta64(60, "s")
+    bars = rng.uniform(10, 11, (390, 7))
+    bars[:, 4], bars[:, 5] = rng.integers(100, 1000, 390), rng.integers(1, 20, 390)
+    for t, values in zip(times, bars):
+        daily.update("AAA", t, values)
+    # A correction of the latest minute, one of an earlier minute, and a pre-market bar
+    bars[-1, [1, 3, 4]] = 10.2, 10.1, 50
+    daily.update("AAA", times[-1], bars[-1])
+    previous, bars[100, 4] = bars[100].copy(), 5000
+    daily.update("AAA", times[100], bars[100], previous=previous)
+    assert not daily.update("AAA", np.datetime64("2024-01-02T13:00:00", "s"), [99.0] * 7)
+
+    bar = daily.finalize().iloc[0]
+    assert bar["date"] == "2024-01-02" and bar["minutes"] == 390
+    assert bar["open"] == bars[0, 0] and bar["close"] == bars[-1, 3]
+    assert bar["high"] == bars[:, 1].max() and bar["low"] == bars[:, 2].min()
+    assert bar["volume"] == bars[:, 4].sum() and bar["trade_count"] == bars[:, 5].sum()
+    assert np.isclose(bar["vwap"], (bars[:, 4] * bars[:, 6]).sum() / bars[:, 4].sum())
+    assert not daily.update("AAA", times[0], bars[0]), "Bars after finalize must be ignored."
+
+
+# Test bars are complete only from the opening minute and without a gap in coverage.
+def test_daily_aggregator_coverage():
+    session = (pd.Timestamp("2024-01-02 14:30", tz="UTC"), pd.Timestamp("2024-01-02 21:00", tz="UTC"))
+    daily = DailyBarAggregator(["AAA", "BBB"], session)
+    daily.update("AAA", np.datetime64("2024-01-02T14:30:00", "s"), [10.0] * 7)
+    daily.update("BBB", np.datetime64("2024-01-02T14:35:00", "s"), [20.0] * 7)
+    daily.mark_gap(pd.Timestamp("2024-01-02 14:00", tz="UTC"), pd.Timestamp("2024-01-02 14:29", tz="UTC"))
+    assert daily.frame().set_index("symbol")["complete"].to_dict() == {"AAA": True, "BBB": False}
+
+    daily.mark_gap(pd.Timestamp("2024-01-02 18:00", tz="UTC"), pd.Timestamp("2024-01-02 18:01", tz="UTC"))
+    assert not daily.frame()["complete"].any()
+    daily.reset((pd.Timestamp("2024-01-03 14:30", tz="UTC"), pd.Timestamp("2024-01-03 21:00", tz="UTC")))
+    daily.update("AAA", np.datetime64("2024-01-03T14:30:00", "s"), [11.0] * 7)
+    assert daily.date == "2024-01-03" and daily.frame()["complete"].all()
+
+
+SESSION = (pd.Timestamp("2024-01-02 14:30", tz="UTC"), pd.Timestamp("2024-01-02 21:00", tz="UTC"))
+
+
+# Test a stream connected through the session writes the daily bars after the close and rolls over.
+def test_stream_writes_daily_bars_after_close(assets_conn, monkeypatch):
+    clock = {"now": pd.Timestamp("2024-01-02 14:00", tz="UTC")}
+    monkeypatch.setattr(alpaca_stream, "_utcnow", lambda: clock["now"])
+
+    def after_last_bar(symbol, bar):
+        if symbol == "ZZZ":
+            clock["now"] = pd.Timestamp("2024-01-02 21:05", tz="UTC")
+
+    fake = FakeStream(RECORDED_BARS)
+    stream, stats = asyncio.run(run_stream(fake, assets_conn, secret_key="secret", max_reconnects=0, feed="sip",
+                                           aggregate_daily=True, session=SESSION, close_grace=0,
+                                           on_bar=after_last_bar))
+
+    assert stats["daily_rows_written"] == 2 and stats["daily_incomplete"] == 0
+    rows = assets_conn.execute("SELECT asset_id, date, open, high, low, close, volume FROM asset_prices ORDER BY asset_id").fetchall()
+    assert rows == [(1, "2024-01-02", 10.0, 10.6, 9.9, 10.5, 2100), (2, "2024-01-02", 50.0, 50.2, 49.8, 50.1, 300)]
+    assert stream.daily.date == "2024-01-03" and not stream.daily.finalized
+
+
+# Test symbols without full coverage are left to the REST update, and IEX is refused for daily bars.
+def test_stream_skips_incomplete_daily_bars(assets_conn, monkeypatch):
+    clock = {"now": pd.Timestamp("2024-01-02 14:45", tz="UTC")}
+    monkeypatch.setattr(alpaca_stream, "_utcnow", lambda: clock["now"])
+    fake = FakeStream(RECORDED_BARS)
+    stream, _ = asyncio.run(run_stream(fake, assets_conn, secret_key="secret", max_reconnects=0, feed="sip",
+                                       aggregate_daily=True, session=SESSION, close_grace=0))
+    clock["now"] = pd.Timestamp("2024-01-02 21:05", tz="UTC")
+    stream.flush()
+
+    assert stream.stats["daily_rows_written"] == 0 and stream.stats["daily_incomplete"] == 2
+    assert assets_conn.execute("SELECT COUNT(*) FROM asset_prices").fetchone()[0] == 0
+    with pytest.raises(ValueError):
+        BarStream(["AAA"], key_id="key", secret_key="secret", url="ws://127.0.0.1:1/v2/iex", aggregate_daily=True)
+
+
+
+# Test the blocking entry point also works inside a running event loop (as in Jupyter).
+def test_stream_minute_bars_inside_running_loop(monkeypatch):
+    class StubStream:
+        def __init__(self, symbols, **kwargs):
+            self.symbols = symbols
+
+        async def run(self, duration=None):
+            await asyncio.sleep(0)
+            return {"bars": len(self.symbols)}
+
+    monkeypatch.setattr(alpaca_stream, "BarStream", StubStream)
+
+    async def notebook_cell():
+        return alpaca_stream.stream_minute_bars(["AAA", "BBB"], duration=1)
+
+    assert asyncio.run(notebook_cell()) == {"bars": 2}
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All streaming tests passed successfully!")
@@ -0,0 +1,82 @@
+# src/tests/test_alpaca_utils.py
+
+import pandas as pd
+import requests
+from src.utils.alpaca_utils import (
+    fetch_alpaca_bars_batched,
+    fetch_alpaca_yesterday_ohlc,
+)
+
+
+class FakeDataClient:
+    """Minimal stand-in for REST.data_get serving the multi-symbol bars endpoint in small pages."""
+
+    def __init__(self, bars_per_symbol=3, page_size=4, fail_symbol=None):
+        self.bars_per_symbol = bars_per_symbol
+        self.page_size = page_size
+        self.fail_symbol = fail_symbol
+        self.calls = []
+
+    def data_get(self, path, data=None, feed=None, api_version="v1"):
+        self.calls.append((path, dict(data)))
+        symbols = data["symbols"].split(",")
+        # Fail the chunk holding `fail_symbol` after its first page
+        if self.fail_symbol in symbols and data.get("page_token"):
+            raise requests.ConnectionError("connection reset")
+        rows = [
+            (symbol, {"t": f"2024-01-0{i + 2}T05:00:00Z", "o": 1.0 + i, "h": 2.0 + i, "l": 0.5 + i,
+                      "c": 1.5 + i, "v": 100, "n": 5, "vw": 1.2 + i})
+            for symbol in symbols if symbol != "NONE"
+            for i in range(self.bars_per_symbol)
+        ]
+        offset = int(data.get("page_token") or 0)
+        page = rows[offset:offset + self.page_size]
+        grouped = {}
+        for symbol, bar in page:
+            grouped.setdefault(symbol, []).append(bar)
+        next_token = str(offset + self.page_size) if offset + self.page_size < len(rows) else None
+        return {"bars": grouped, "next_page_token": next_token}
+
+
+# Test chunking, pagination across symbol boundaries and per-symbol splitting.
+def test_fetch_alpaca_bars_batched():
+    client = FakeDataClient(bars_per_symbol=3, page_size=4)
+    frames = fetch_alpaca_bars_batched(client, ["AAA", "BBB", "CCC", "NONE"], "1Day",
+                                       "2024-01-01", "2024-01-10", chunk_size=2)
+
+    assert set(frames) == {"AAA", "BBB", "CCC"}
+    assert all(len(frame) == 3 for frame in frames.values()), "Bars split across pages were lost."
+    assert list(frames["BBB"]["date"]) == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    # Chunk 1 (AAA, BBB): 6 bars over 2 pages; chunk 2 (CCC, NONE): 3 bars in 1 page
+    assert len(client.calls) == 3
+    assert client.calls[1][1]["page_token"] == "4"
+
+
+# Test a failing chunk is dropped whole and reported while the other chunks return their bars.
+def test_fetch_alpaca_bars_batched_chunk_failure():
+    client = FakeDataClient(bars_per_symbol=3, page_size=4, fail_symbol="CCC")
+    failed = {}
+    frames = fetch_alpaca_bars_batched(client, ["AAA", "BBB", "CCC", "DDD", "EEE"], "1Day",
+                                       "2024-01-01", "2024-01-10", chunk_size=2, failed=failed)
+
+    assert set(frames) == {"AAA", "BBB", "EEE"}, "Pages of the failed chunk must not be returned."
+    assert set(failed) == {"CCC", "DDD"} and "connection reset" in failed["CCC"]
+
+
+# Test the yesterday OHLC fetch uses one request for the whole universe.
+def test_fetch_alpaca_yesterday_ohlc_batched():
+    client = FakeDataClient(bars_per_symbol=1, page_size=1000)
+    tickers = [f"T{i}" for i in range(150)]
+    df = fetch_alpaca_yesterday_ohlc(client, tickers)
+
+    assert len(client.calls) == 1
+    assert len(df) == 150
+    assert list(df.columns) == ["ticker", "date", "open", "high", "low", "close"]
+    assert isinstance(df, pd.DataFrame)
+
+
+if __name__ == "__main__":
+    test_fetch_alpaca_bars_batched()
+    test_fetch_alpaca_bars_batched_chunk_failure()
+    test_fetch_alpaca_yesterday_ohlc_batched()
+    print("✅ All Alpaca utility tests passed successfully!")
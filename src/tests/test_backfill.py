@@ -0,0 +1,105 @@
+# src/tests/test_backfill.py
+
+import sqlite3
+import pandas as pd
+import src.etl.backfill as backfill
+import src.utils.db_utils as db_utils
+import src.utils.price_writer as price_writer
+from src.db_schema import DATABASES
+
+
+def setup_db(tmp_path, monkeypatch, symbols):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    conn = sqlite3.connect(tmp_path / "assets.db")
+    for schema in DATABASES["assets.db"]:
+        conn.execute(schema)
+    conn.executemany("INSERT INTO asset_metadata (symbol, is_active) VALUES (?, 1)", [(s,) for s in symbols])
+    conn.commit()
+    conn.close()
+
+
+def fake_downloader(fail_once=(), calls=None):
+    """Stand-in for download_bars: two bars per symbol, optional one-off failures."""
+    pending_failures = set(fail_once)
+
+    def download(tickers, start_date, end_date, on_result=None, **kwargs):
+        if calls is not None:
+            calls.append((list(tickers), start_date))
+        failed = {}
+        for symbol in tickers:
+            if symbol in pending_failures:
+                pending_failures.discard(symbol)
+                failed[symbol] = "HTTP 429"
+                continue
+            dates = [d for d in ["2024-01-02", "2024-01-03"] if start_date <= d <= end_date]
+            on_result(symbol, pd.DataFrame({"date": dates, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0}))
+        return {"failed": failed}
+
+    return download
+
+
+# Test that failed tickers are retried with backoff and completed tickers are not refetched.
+def test_backfill_retries_and_resumes(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, ["AAA", "BBB", "CCC"])
+    calls = []
+    monkeypatch.setattr(backfill, "download_bars", fake_downloader(fail_once=["BBB"], calls=calls))
+
+    status = backfill.run_backfill(end_date="2024-01-03", retry_backoff=0.01, max_wait=1)
+    assert status.loc["done", "tickers"] == 3
+    assert status.loc["done", "rows_written"] == 6
+    assert calls[-1][0] == ["BBB"], "Only the failed ticker should be retried."
+
+    # A second run has nothing left to do
+    calls.clear()
+    backfill.run_backfill(end_date="2024-01-03")
+    assert calls == []
+
+
+# Test that a crashed run resumes from the last checkpointed date.
+def test_backfill_resumes_from_checkpoint(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, ["AAA"])
+    conn = sqlite3.connect(tmp_path / "assets.db")
+    conn.execute("""
+        INSERT INTO backfill_progress (job_name, symbol, asset_id, status, last_date, attempts)
+        VALUES ('full_history', 'AAA', 1, 'running', '2024-01-02', 1)
+    """)
+    conn.commit()
+    conn.close()
+
+    calls = []
+    monkeypatch.setattr(backfill, "download_bars", fake_downloader(calls=calls))
+    status = backfill.run_backfill(end_date="2024-01-03")
+
+    assert calls == [(["AAA"], "2024-01-03")]
+    assert status.loc["done", "rows_written"] == 1
+
+
+# Test that a ticker whose write fails is recorded as failed and retried.
+def test_backfill_records_write_failures(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, ["AAA", "BBB"])
+    real_insert = price_writer.insert_price_bars
+    failures = {2}
+
+    def flaky_insert(conn, asset_id, frame, *args, **kwargs):
+        if asset_id in failures:
+            failures.discard(asset_id)
+            raise sqlite3.OperationalError("disk I/O error")
+        return real_insert(conn, asset_id, frame, *args, **kwargs)
+
+    monkeypatch.setattr(price_writer, "insert_price_bars", flaky_insert)
+    monkeypatch.setattr(backfill, "download_bars", fake_downloader())
+    status = backfill.run_backfill(end_date="2024-01-03", retry_backoff=0.01, max_wait=1)
+
+    assert status.loc["done", "tickers"] == 2 and status.loc["done", "rows_written"] == 4
+    conn = sqlite3.connect(tmp_path / "assets.db")
+    assert conn.execute("SELECT attempts FROM backfill_progress WHERE symbol = 'BBB'").fetchone()[0] == 2
+    conn.close()
+
+
+# Test that tickers out of attempts are abandoned instead of retried forever.
+def test_backfill_abandons_after_max_attempts(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, ["AAA"])
+    monkeypatch.setattr(backfill, "download_bars", fake_downloader(fail_once=["AAA"]))
+    status = backfill.run_backfill(end_date="2024-01-03", max_attempts=1)
+    assert list(status.index) == ["abandoned"]
+
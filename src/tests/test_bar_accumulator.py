@@ -0,0 +1,52 @@
+# src/tests/test_bar_accumulator.py
+
+import numpy as np
+import pandas as pd
+from src.utils.bar_accumulator import BarAccumulator, OHLC_RESULT_COLUMNS, BAR_RESULT_COLUMNS
+
+
+# Test that frames, raw bars and single rows combine into one result in order.
+def test_accumulator_mixed_inputs():
+    acc = BarAccumulator(OHLC_RESULT_COLUMNS)
+    acc.add_frame("AAA", pd.DataFrame({
+        "date": ["2024-01-02", "2024-01-03"], "open": [1.0, 2.0], "high": [1.5, 2.5],
+        "low": [0.5, 1.5], "close": [1.2, 2.2], "extra": [0, 0],
+    }))
+    acc.add_bars("BBB", [{"t": "2024-01-02T05:00:00Z", "o": 5.0, "h": 6.0, "l": 4.0, "c": 5.5}])
+    acc.add_row("CCC", date="2024-01-02", open=9.0)
+    df = acc.to_frame()
+
+    assert list(df.columns) == OHLC_RESULT_COLUMNS
+    assert len(acc) == len(df) == 4
+    assert list(df["ticker"]) == ["AAA", "AAA", "BBB", "CCC"]
+    assert df.loc[2, "date"] == "2024-01-02" and df.loc[2, "close"] == 5.5
+    assert np.isnan(df.loc[3, "close"]), "Missing columns must be NaN."
+    assert df["open"].dtype == np.float64
+
+
+# Test single rows interleaved with frames and raw bars keep their insertion order.
+def test_accumulator_interleaved_rows():
+    acc = BarAccumulator(OHLC_RESULT_COLUMNS)
+    acc.add_row("AAA", date="2024-01-02", close=1.0)
+    acc.add_frame("BBB", pd.DataFrame({"date": ["2024-01-02"], "close": [2.0]}))
+    acc.add_row("CCC", date="2024-01-02", close=3.0)
+    acc.add_row("DDD", date="2024-01-02", close=4.0)
+    acc.add_bars("EEE", [{"t": "2024-01-02T05:00:00Z", "c": 5.0}])
+    acc.add_row("FFF", date="2024-01-02", close=6.0)
+    df = acc.to_frame()
+
+    assert list(df["ticker"]) == ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+    assert list(df["close"]) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+# Test the empty result keeps the shared column layout.
+def test_accumulator_empty():
+    df = BarAccumulator(BAR_RESULT_COLUMNS).to_frame()
+    assert df.empty and list(df.columns) == BAR_RESULT_COLUMNS
+
+
+if __name__ == "__main__":
+    test_accumulator_mixed_inputs()
+    test_accumulator_interleaved_rows()
+    test_accumulator_empty()
+    print("✅ All bar accumulator tests passed successfully!")
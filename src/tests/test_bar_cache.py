@@ -0,0 +1,64 @@
+# src/tests/test_bar_cache.py
+
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.alpaca_utils import fetch_alpaca_bars_batched
+from src.utils.bar_cache import BarCache, is_closed_range
+
+
+# Test that a repeated closed-range fetch is served entirely from disk.
+def test_repeat_fetch_costs_no_requests(tmp_path):
+    cache = BarCache(tmp_path)
+    with AlpacaEmulator(n_symbols=6, start_date="2024-01-01", end_date="2024-03-29") as emulator:
+        client = emulator.client()
+        first = fetch_alpaca_bars_batched(client, emulator.symbols + ["NONE"], "1Day", "2024-01-01", "2024-02-29",
+                                          chunk_size=4, cache=cache)
+        requests_after_first = emulator.stats["requests"]
+
+        second = fetch_alpaca_bars_batched(client, emulator.symbols + ["NONE"], "1Day", "2024-01-01", "2024-02-29",
+                                           chunk_size=4, cache=BarCache(tmp_path))
+        assert emulator.stats["requests"] == requests_after_first, "Cached ranges must not hit the API."
+
+        # A different feed is a different key
+        fetch_alpaca_bars_batched(client, emulator.symbols[:1], "1Day", "2024-01-01", "2024-02-29", feed="sip", cache=cache)
+        assert emulator.stats["requests"] == requests_after_first + 1
+
+    assert set(first) == set(second) == set(emulator.symbols)
+    for symbol in emulator.symbols:
+        assert first[symbol].equals(second[symbol])
+    assert cache.get("NONE", "1Day", "2024-01-01", "2024-02-29") == [], "Empty responses are cached too."
+
+
+# Test that ranges ending today or later are never stored.
+def test_open_ranges_are_not_cached(tmp_path):
+    cache = BarCache(tmp_path)
+    assert is_closed_range("2024-01-31", today="2024-02-01")
+    assert not is_closed_range("2024-02-01", today="2024-02-01")
+    assert not cache.put("AAA", [{"t": "x"}], "1Day", "2024-01-01", "2999-01-01")
+    assert cache.get("AAA", "1Day", "2024-01-01", "2999-01-01") is None
+
+
+# Test that identical responses share a blob and the least recently used entries are evicted.
+def test_dedup_and_eviction(tmp_path):
+    cache = BarCache(tmp_path, max_bytes=10 ** 9)
+    bars = [{"t": f"2024-01-{d:02d}T05:00:00Z", "o": d, "h": d, "l": d, "c": d} for d in range(2, 30)]
+    cache.put_many({"AAA": bars, "BBB": bars, "CCC": []}, "1Day", "2024-01-01", "2024-01-31")
+    assert cache.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 2
+
+    blob_size = cache.size_bytes()
+    cache.max_bytes = blob_size + 1
+    cache.get("AAA", "1Day", "2024-01-01", "2024-01-31")
+    other = [dict(bar, c=bar["c"] + 1) for bar in bars]
+    cache.put("DDD", other, "1Day", "2024-01-01", "2024-01-31")
+
+    assert cache.size_bytes() <= cache.max_bytes
+    assert cache.get("DDD", "1Day", "2024-01-01", "2024-01-31") == other
+    assert cache.stats["evicted"] > 0
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_repeat_fetch_costs_no_requests, test_open_ranges_are_not_cached, test_dedup_and_eviction):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All bar cache tests passed successfully!")
@@ -0,0 +1,63 @@
+# src/tests/test_corporate_actions.py
+
+import pandas as pd
+import pytest
+from src.etl.corporate_actions import ingest_corporate_actions, fetch_price_invalidations, clear_price_invalidations
+from src.utils.alpaca_emulator import AlpacaEmulator
+
+
+@pytest.fixture
+def conn(assets_conn):
+    assets_conn.executemany("INSERT INTO asset_prices (asset_id, date, close) VALUES (?, ?, ?)",
+                            [(1, "2023-01-03", 10.0), (1, "2024-03-01", 11.0), (2, "2023-06-01", 20.0)])
+    return assets_conn
+
+
+# Test a first pull spans 90-day windows, routes dividends and splits, and flags price ranges per asset.
+def test_initial_ingest_and_invalidation(conn):
+    with AlpacaEmulator(symbols=["AAA", "BBB", "ZZZ"], start_date="2024-01-01", end_date="2024-06-28") as emulator:
+        emulator.add_announcement("dividend", "AAA", "2024-02-15", declaration_date="2024-02-01", cash=0.25)
+        emulator.add_announcement("split", "BBB", "2024-05-10", declaration_date="2024-04-20", old_rate=1, new_rate=4)
+        emulator.add_announcement("split", "ZZZ", "2024-05-10", declaration_date="2024-04-20", old_rate=1, new_rate=2)
+        summary = ingest_corporate_actions(emulator.client(), {"AAA": 1, "BBB": 2}, since="2024-01-01",
+                                           until="2024-06-28", conn=conn)
+
+    assert summary["requests"] == 2 and summary["announcements"] == 3
+    assert summary["dividends"] == 1 and summary["actions"] == 1 and summary["invalidations"] == 2
+
+    dividend = pd.read_sql_query("SELECT * FROM asset_dividends", conn).iloc[0]
+    assert dividend["asset_id"] == 1 and dividend["ex_date"] == "2024-02-15" and dividend["amount"] == 0.25
+    split = pd.read_sql_query("SELECT * FROM corporate_actions", conn).iloc[0]
+    assert split["asset_id"] == 2 and split["action_type"] == "split" and split["ratio"] == 4.0
+
+    flags = fetch_price_invalidations(conn=conn).set_index("asset_id")
+    assert flags.loc[1, "start_date"] == "2023-01-03" and flags.loc[1, "end_date"] == "2024-02-15"
+    assert flags.loc[2, "start_date"] == "2023-06-01" and flags.loc[2, "reason"] == "split"
+
+
+# Test later runs resume from the last pull, write only revised rows and flag only those.
+def test_incremental_ingest_only_flags_changes(conn):
+    with AlpacaEmulator(symbols=["AAA", "BBB"], start_date="2024-01-01", end_date="2024-06-28") as emulator:
+        client = emulator.client()
+        first = emulator.add_announcement("dividend", "AAA", "2024-06-28", declaration_date="2024-06-18", cash=0.25)
+        ingest_corporate_actions(client, {"AAA": 1, "BBB": 2}, since="2024-06-01", until="2024-06-20", conn=conn)
+        clear_price_invalidations(fetch_price_invalidations(conn=conn)["invalidation_id"], conn=conn)
+
+        first["cash"] = "0.30"
+        emulator.add_announcement("dividend", "BBB", "2024-07-10", declaration_date="2024-06-25", cash=1.0)
+        revised = ingest_corporate_actions(client, {"AAA": 1, "BBB": 2}, until="2024-06-28", conn=conn)
+        unchanged = ingest_corporate_actions(client, {"AAA": 1, "BBB": 2}, until="2024-06-28", conn=conn)
+
+    assert revised["since"] == "2024-06-13" and revised["announcements"] == 2
+    assert revised["dividends"] == 2 and revised["invalidations"] == 2
+    assert unchanged["since"] == "2024-06-21" and unchanged["announcements"] == 1
+    assert unchanged["dividends"] == 0 and unchanged["invalidations"] == 0
+    amounts = dict(conn.execute("SELECT asset_id, amount FROM asset_dividends").fetchall())
+    assert amounts == {1: 0.30, 2: 1.0}
+    assert len(fetch_price_invalidations(conn=conn)) == 2
+    assert len(fetch_price_invalidations(include_cleared=True, conn=conn)) == 3
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All corporate action tests passed successfully!")
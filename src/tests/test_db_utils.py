@@ -0,0 +1,68 @@
+# src/tests/test_db_utils.py
+
+import pandas as pd
+import pytest
+from src.utils.db_utils import fetch_price_range, fetch_price_panel, ensure_schema
+from src.utils.price_store import insert_price_bars
+
+
+@pytest.fixture
+def conn(assets_conn):
+    assets_conn.execute("INSERT INTO asset_metadata (symbol, is_active) VALUES ('AAA', 1), ('BBB', 1)")
+    return assets_conn
+
+
+def make_bars(dates, prices):
+    return pd.DataFrame(
+        {"date": dates, "open": prices, "high": prices, "low": prices, "close": prices}
+    )
+
+
+def populate(conn):
+    insert_price_bars(conn, 1, make_bars(["2024-01-02", "2024-01-03"], [1.0, 2.0]), "2024-01-03 18:00:00")
+    insert_price_bars(conn, 1, make_bars(["2024-01-04"], [3.0]), "2024-01-04 18:00:00")
+    insert_price_bars(conn, 2, make_bars(["2024-01-03", "2024-01-04"], [5.0, 6.0]), "2024-01-04 18:00:00")
+
+
+# Test that as-of reads hide rows fetched after the as-of timestamp.
+def test_fetch_price_range_as_of(conn):
+    populate(conn)
+
+    latest = fetch_price_range("AAA", 10, conn=conn)
+    assert len(latest) == 3
+
+    replay = fetch_price_range("AAA", 10, conn=conn, as_of="2024-01-04 08:00:00")
+    assert list(replay["close"]) == [1.0, 2.0], "as_of read leaked later data."
+
+    replay_calendar = fetch_price_range("AAA", 30, conn=conn, calendar_days=True, as_of="2024-01-04 08:00:00")
+    assert replay_calendar["date"].max() == pd.Timestamp("2024-01-03")
+
+
+# Test the panel loader window, alignment and as-of mode.
+def test_fetch_price_panel(conn):
+    populate(conn)
+
+    panel = fetch_price_panel(["AAA", "BBB"], 2, conn=conn)
+    assert list(panel.columns) == ["AAA", "BBB"]
+    assert list(panel.index) == [pd.Timestamp("2024-01-03"), pd.Timestamp("2024-01-04")]
+    assert panel.loc["2024-01-04", "BBB"] == 6.0
+
+    replay = fetch_price_panel(["AAA", "BBB"], 5, conn=conn, as_of="2024-01-04 08:00:00")
+    assert list(replay.columns) == ["AAA"], "BBB was not fetched yet at the as-of time."
+    assert replay.index.max() == pd.Timestamp("2024-01-03")
+
+
+
+# Test that migrating an older database drops the superseded (asset_id, date) index.
+def test_ensure_schema_drops_old_price_index(conn):
+    conn.execute("CREATE INDEX idx_asset_prices_asset_date ON asset_prices (asset_id, date)")
+    ensure_schema(conn)
+
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(asset_prices)")}
+    assert "idx_asset_prices_asset_date" not in indexes
+    assert "idx_asset_prices_asset_date_fetched" in indexes
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All database utility tests passed successfully!")
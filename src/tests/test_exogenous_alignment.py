@@ -0,0 +1,96 @@
+# src/tests/test_exogenous_alignment.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.exogenous_utils import asof_align, upsert_exogenous_values
+from src.utils.exogenous_alignment import ExogenousAligner
+
+
+@pytest.fixture
+def conn(exogenous_conn):
+    exogenous_conn.execute("""
+        INSERT INTO exogenous_metadata (exog_symbol, frequency, lag, in_use)
+        VALUES ('DAILY', 'Daily', 0, 1), ('MONTHLY', 'Monthly', 30, 1), ('WEEKLY', 'Weekly', 3, 1)
+    """)
+    rng = np.random.default_rng(0)
+    daily = pd.bdate_range("2023-01-02", "2024-03-29")
+    monthly = pd.date_range("2022-12-01", "2024-03-01", freq="MS")
+    weekly = pd.date_range("2023-01-06", "2024-03-29", freq="W-FRI")
+    for exog_id, dates in ((1, daily), (2, monthly), (3, weekly)):
+        upsert_exogenous_values(exogenous_conn, exog_id, pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"), "close": rng.normal(100, 5, len(dates)),
+        }))
+    return exogenous_conn
+
+
+def reference(conn, trading):
+    values = pd.read_sql_query("SELECT exog_id, date, close FROM exogenous_vals ORDER BY exog_id, date", conn)
+    columns = []
+    for exog_id, lag in ((1, 0), (2, 30), (3, 3)):
+        series = values[values["exog_id"] == exog_id]
+        columns.append(asof_align(trading, pd.to_datetime(series["date"]), series["close"].to_numpy(), lag))
+    return np.column_stack(columns)
+
+
+# Test the vectorized forward fill matches per-series as-of alignment, in float32.
+def test_ffill_matches_asof_align(conn):
+    trading = pd.bdate_range("2023-01-02", "2024-03-29")
+    aligned = ExogenousAligner().align(trading, conn=conn)
+
+    assert list(aligned.columns) == ["DAILY", "MONTHLY", "WEEKLY"]
+    assert (aligned.dtypes == np.float32).all()
+    expected = reference(conn, trading).astype(np.float32)
+    assert np.array_equal(aligned.to_numpy(), expected, equal_nan=True)
+
+
+# Test only new dates and changed series are recomputed.
+def test_incremental_refresh(conn):
+    aligner = ExogenousAligner()
+    aligner.align(pd.bdate_range("2023-01-02", "2024-02-29"), conn=conn)
+    assert aligner.stats["series_recomputed"] == 3
+
+    # Same request again: nothing to compute
+    rows_before = aligner.stats["rows_computed"]
+    aligner.align(pd.bdate_range("2023-06-01", "2024-02-29"), conn=conn)
+    assert aligner.stats["rows_computed"] == rows_before
+    assert aligner.stats["series_recomputed"] == 3
+
+    # Calendar grows: only the new dates are computed
+    trading = pd.bdate_range("2023-01-02", "2024-03-29")
+    aligner.align(trading, conn=conn)
+    assert aligner.stats["rows_computed"] == rows_before + len(pd.bdate_range("2024-03-01", "2024-03-29"))
+    assert aligner.stats["series_recomputed"] == 3
+
+    # A revision of one series recomputes only that series
+    upsert_exogenous_values(conn, 3, pd.DataFrame({"date": ["2024-03-22"], "close": [500.0]}))
+    aligned = aligner.align(trading, conn=conn)
+    assert aligner.stats["series_recomputed"] == 4
+    assert aligned.loc["2024-03-27", "WEEKLY"] == 500.0
+    assert np.array_equal(aligned.to_numpy(), reference(conn, trading).astype(np.float32), equal_nan=True)
+
+
+# Test ids missing from the metadata are named in a ValueError and leave the cache untouched.
+def test_align_unknown_ids(conn):
+    aligner = ExogenousAligner()
+    trading = pd.bdate_range("2024-01-02", "2024-01-31")
+    with pytest.raises(ValueError, match=r"\[4\]"):
+        aligner.align(trading, exog_ids=[1, 4], conn=conn)
+    assert len(aligner.calendar) == 0 and len(aligner.exog_ids) == 0
+    assert list(aligner.align(trading, exog_ids=[1], conn=conn).columns) == ["DAILY"]
+
+
+# Test linear interpolation between observations of a series.
+def test_linear_interpolation(exogenous_conn):
+    exogenous_conn.execute("INSERT INTO exogenous_metadata (exog_symbol, lag, in_use) VALUES ('M', 0, 1)")
+    upsert_exogenous_values(exogenous_conn, 1, pd.DataFrame({"date": ["2024-01-01", "2024-01-11"], "close": [0.0, 10.0]}))
+
+    trading = pd.to_datetime(["2023-12-29", "2024-01-01", "2024-01-04", "2024-01-11", "2024-01-15"])
+    aligned = ExogenousAligner(method="linear").align(trading, conn=exogenous_conn)["M"].to_numpy()
+    assert np.isnan(aligned[0])
+    assert np.allclose(aligned[1:], [0.0, 3.0, 10.0, 10.0])
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All exogenous alignment tests passed successfully!")
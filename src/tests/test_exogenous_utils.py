@@ -0,0 +1,93 @@
+# src/tests/test_exogenous_utils.py
+
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+from src.db_schema import DATABASES
+from src.utils.exogenous_utils import (
+    asof_align,
+    upsert_exogenous_values,
+    exogenous_asof_matrix,
+)
+
+
+@pytest.fixture
+def conn(exogenous_conn):
+    exogenous_conn.execute("""
+        INSERT INTO exogenous_metadata (exog_symbol, frequency, lag, in_use)
+        VALUES ('DAILY', 'Daily', 0, 1), ('MONTHLY', 'Monthly', 30, 1), ('UNUSED', 'Daily', 0, 0)
+    """)
+    return exogenous_conn
+
+
+# Test as-of alignment carries values forward and respects the lag.
+def test_asof_align_lag_and_carry_forward():
+    trading = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-08", "2024-01-09"])
+    obs = pd.to_datetime(["2024-01-01", "2024-01-03"])
+
+    no_lag = asof_align(trading, obs, [1.0, 2.0])
+    assert np.array_equal(no_lag, [1.0, 2.0, 2.0, 2.0])
+
+    lagged = asof_align(trading, obs, [1.0, 2.0], lag_days=7)
+    assert np.isnan(lagged[:2]).all(), "Values used before they were published."
+    assert np.array_equal(lagged[2:], [1.0, 1.0])
+
+
+# Test the matrix builder selects in-use series and caches per calendar window.
+def test_exogenous_asof_matrix(conn):
+    upsert_exogenous_values(conn, 1, pd.DataFrame({"date": ["2024-01-02", "2024-01-03"], "close": [10.0, 11.0]}))
+    upsert_exogenous_values(conn, 2, pd.DataFrame({"date": ["2023-12-01"], "close": [3.5]}))
+    trading = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+
+    matrix = exogenous_asof_matrix(trading, conn=conn)
+    assert list(matrix.columns) == ["DAILY", "MONTHLY"]
+    assert list(matrix["DAILY"]) == [10.0, 11.0, 11.0]
+    assert list(matrix["MONTHLY"]) == [3.5, 3.5, 3.5]
+
+    # Upserting the same key replaces the value and invalidates the cache
+    upsert_exogenous_values(conn, 1, pd.DataFrame({"date": ["2024-01-03"], "close": [12.0]}))
+    assert conn.execute("SELECT COUNT(*) FROM exogenous_vals WHERE exog_id = 1").fetchone()[0] == 2
+    assert list(exogenous_asof_matrix(trading, conn=conn)["DAILY"]) == [10.0, 12.0, 12.0]
+
+
+# Test calendars that share their endpoints and length do not share a cache entry.
+def test_exogenous_asof_matrix_cache_uses_full_calendar(conn):
+    upsert_exogenous_values(conn, 1, pd.DataFrame({"date": ["2024-01-02", "2024-01-04"], "close": [10.0, 11.0]}))
+    first = exogenous_asof_matrix(pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-06"]), conn=conn)
+    second = exogenous_asof_matrix(pd.to_datetime(["2024-01-02", "2024-01-05", "2024-01-06"]), conn=conn)
+
+    assert list(first["DAILY"]) == [10.0, 10.0, 11.0]
+    assert list(second.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-05", "2024-01-06"]
+    assert list(second["DAILY"]) == [10.0, 11.0, 11.0]
+
+
+# Test databases with the same contents do not share cache entries.
+def test_exogenous_asof_matrix_cache_per_database(conn, tmp_path):
+    other = sqlite3.connect(tmp_path / "exogenous.db")
+    for schema in DATABASES["exogenous.db"]:
+        other.execute(schema)
+    other.execute("INSERT INTO exogenous_metadata (exog_symbol, frequency, lag, in_use) VALUES ('DAILY', 'Daily', 0, 1)")
+    for db, value in ((conn, 10.0), (other, 20.0)):
+        db.execute(
+            "INSERT INTO exogenous_vals (exog_id, date, close, fetched_at) VALUES (1, '2024-01-02', ?, '2024-01-02 18:00:00')",
+            (value,),
+        )
+    trading = pd.to_datetime(["2024-01-02"])
+
+    assert list(exogenous_asof_matrix(trading, exog_ids=[1], conn=conn)["DAILY"]) == [10.0]
+    assert list(exogenous_asof_matrix(trading, exog_ids=[1], conn=other)["DAILY"]) == [20.0]
+    other.close()
+
+
+# Test ids missing from the metadata are named in a ValueError.
+def test_exogenous_asof_matrix_unknown_ids(conn):
+    trading = pd.to_datetime(["2024-01-02", "2024-01-03"])
+    assert list(exogenous_asof_matrix(trading, exog_ids=[3], conn=conn).columns) == ["UNUSED"]
+    with pytest.raises(ValueError, match=r"\[7, 9\]"):
+        exogenous_asof_matrix(trading, exog_ids=[1, 9, 7], conn=conn)
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All exogenous utility tests passed successfully!")
@@ -0,0 +1,57 @@
+# src/tests/test_gaps.py
+
+import pandas as pd
+from src.etl.gaps import detect_price_gaps, plan_gap_requests
+
+CALENDAR = ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-08", "2024-01-09", "2024-01-10"]
+
+
+def prices(rows):
+    return pd.DataFrame(rows, columns=["asset_id", "date"])
+
+
+# Test that interior holes and the tail are found, and history before the first stored date is not.
+def test_detect_interior_and_tail_gaps():
+    df = prices([(1, "2024-01-02"), (1, "2024-01-03"), (1, "2024-01-08"), (1, "2024-01-10"),
+                 (2, "2024-01-04"), (2, "2024-01-05")])
+    gaps = detect_price_gaps(CALENDAR, df)
+
+    assert list(gaps.itertuples(index=False, name=None)) == [
+        (1, "2024-01-04", "2024-01-05", 2, False),
+        (1, "2024-01-09", "2024-01-09", 1, False),
+        (2, "2024-01-08", "2024-01-10", 3, True),
+    ]
+
+
+# Test that history older than the calendar window anchors the asset at the window start.
+def test_detect_gap_at_window_start():
+    gaps = detect_price_gaps(CALENDAR, prices([(1, "2023-12-29"), (1, "2024-01-04"), (1, "2024-01-10")]))
+    assert list(gaps["start_date"]) == ["2024-01-02", "2024-01-05"]
+    assert list(gaps["end_date"]) == ["2024-01-03", "2024-01-09"]
+
+
+# Test that known unfillable ranges are skipped and nearby gaps are bridged.
+def test_unfillable_and_bridge():
+    df = prices([(1, "2024-01-02"), (1, "2024-01-04"), (1, "2024-01-08"), (1, "2024-01-10")])
+    unfillable = pd.DataFrame({"asset_id": [1], "start_date": ["2024-01-03"], "end_date": ["2024-01-03"]})
+
+    gaps = detect_price_gaps(CALENDAR, df, unfillable=unfillable)
+    assert list(gaps["start_date"]) == ["2024-01-05", "2024-01-09"]
+
+    bridged = detect_price_gaps(CALENDAR, df, unfillable=unfillable, bridge=1)
+    assert list(bridged.itertuples(index=False, name=None)) == [(1, "2024-01-05", "2024-01-09", 2, False)]
+
+
+# Test that assets missing the same range share one request.
+def test_plan_groups_identical_ranges():
+    df = prices([(1, "2024-01-02"), (2, "2024-01-02"), (3, "2024-01-09")])
+    plan = plan_gap_requests(detect_price_gaps(CALENDAR, df))
+    assert plan == [("2024-01-03", "2024-01-10", [1, 2]), ("2024-01-10", "2024-01-10", [3])]
+
+
+if __name__ == "__main__":
+    test_detect_interior_and_tail_gaps()
+    test_detect_gap_at_window_start()
+    test_unfillable_and_bridge()
+    test_plan_groups_identical_ranges()
+    print("✅ All gap detection tests passed successfully!")
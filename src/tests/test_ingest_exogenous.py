@@ -0,0 +1,155 @@
+# src/tests/test_ingest_exogenous.py
+
+import asyncio
+import json
+import threading
+import pandas as pd
+import pytest
+from aiohttp import web
+from src.etl.ingest_exogenous import ingest_exogenous, seed_exogenous_metadata, parse_lag
+from src.utils.exogenous_sources import ExogenousSource, FredSource, YahooSource, CsvDropSource
+
+CATALOG = [
+    {"Symbol": "CL=F", "Title": "WTI Crude Oil", "Type": "Daily", "Lag number": 0, "Source": "YFinance"},
+    {"Symbol": "ICSA", "Title": "Initial Claims", "Type": "Weekly", "Lag number": 7, "Source": "FRED"},
+    {"Symbol": "HMI", "Title": "NAHB Index", "Type": "Monthly", "Lag number": "14-28", "Source": "Other (NAHB ~external fetch)"},
+    {"Symbol": "NOPE", "Title": "No adapter", "Type": "Daily", "Lag number": 0, "Source": "Bloomberg"},
+]
+
+
+class FileBackedSources:
+    """Local stand-ins for the FRED and Yahoo APIs that serve observations from files in a folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.requests = []
+
+    async def fred(self, request):
+        self.requests.append(("fred", dict(request.query)))
+        data = json.loads((self.folder / "fred" / f"{request.query['series_id']}.json").read_text())
+        start, end = request.query["observation_start"], request.query["observation_end"]
+        return web.json_response({"observations": [o for o in data if start <= o["date"] <= end]})
+
+    async def yahoo(self, request):
+        self.requests.append(("yahoo", dict(request.query)))
+        rows = pd.read_csv(self.folder / "yahoo" / f"{request.match_info['symbol']}.csv")
+        stamps = (pd.to_datetime(rows["date"]).dt.tz_localize("America/New_York") - pd.Timestamp(0, tz="UTC")) // pd.Timedelta("1s")
+        keep = (stamps >= int(request.query["period1"])) & (stamps < int(request.query["period2"]))
+        rows, stamps = rows[keep], stamps[keep]
+        return web.json_response({"chart": {"error": None, "result": [{
+            "meta": {"exchangeTimezoneName": "America/New_York"},
+            "timestamp": stamps.tolist(),
+            "indicators": {"quote": [{c: rows[c].tolist() for c in ("open", "high", "low", "close")}],
+                           "adjclose": [{"adjclose": rows["close"].tolist()}]},
+        }]}})
+
+    def __enter__(self):
+        started = threading.Event()
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            app = web.Application()
+            app.router.add_get("/fred/series/observations", self.fred)
+            app.router.add_get("/v8/finance/chart/{symbol}", self.yahoo)
+            self.runner = web.AppRunner(app)
+            self.loop.run_until_complete(self.runner.setup())
+            site = web.TCPSite(self.runner, "127.0.0.1", 0)
+            self.loop.run_until_complete(site.start())
+            self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.runner.cleanup())
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def write_fixtures(folder):
+    (folder / "fred").mkdir()
+    (folder / "yahoo").mkdir()
+    (folder / "drop").mkdir()
+    (folder / "fred" / "ICSA.json").write_text(json.dumps([
+        {"date": "2024-01-06", "value": "202000"}, {"date": "2024-01-13", "value": "."},
+        {"date": "2024-01-20", "value": "214000"},
+    ]))
+    pd.DataFrame({"date": ["2024-01-02", "2024-01-03", "2024-01-04"], "open": [70.0, 71.0, 72.0],
+                  "high": [72.0, 73.0, 74.0], "low": [69.0, 70.0, 71.0], "close": [71.0, 72.0, 73.0]}
+                 ).to_csv(folder / "yahoo" / "CL=F.csv", index=False)
+    pd.DataFrame({"date": ["2023-12-15", "2024-01-15"], "value": [37, 44]}).to_csv(folder / "drop" / "HMI.csv", index=False)
+
+
+@pytest.fixture
+def conn(exogenous_conn):
+    seed_exogenous_metadata(CATALOG, conn=exogenous_conn)
+    return exogenous_conn
+
+
+# Test that every adapter is fetched and loaded, and a second run only fetches what is due.
+def test_ingest_all_sources_incrementally(conn, tmp_path):
+    write_fixtures(tmp_path)
+    with FileBackedSources(tmp_path) as server:
+        sources = {"yfinance": YahooSource(base_url=server.url), "fred": FredSource(api_key="k", base_url=f"{server.url}/fred"),
+                   "other": CsvDropSource(tmp_path / "drop")}
+        summary = ingest_exogenous(sources, start_date="2023-01-01", end_date="2024-01-31", conn=conn)
+        assert summary["fetched"] == 3 and not summary["failed"] and summary["no_adapter"] == ["NOPE"]
+        assert summary["rows"] == 3 + 2 + 2, "FRED '.' placeholders must be dropped."
+
+        values = pd.read_sql_query("""
+            SELECT m.exog_symbol, v.date, v.open, v.close FROM exogenous_vals v
+            JOIN exogenous_metadata m USING (exog_id) ORDER BY m.exog_symbol, v.date
+        """, conn)
+        assert values[values["exog_symbol"] == "CL=F"]["open"].tolist() == [70.0, 71.0, 72.0]
+        assert values[values["exog_symbol"] == "ICSA"]["close"].tolist() == [202000.0, 214000.0]
+
+        # Nothing is due right after a run
+        server.requests.clear()
+        assert ingest_exogenous(sources, end_date="2024-01-31", conn=conn)["due"] == 1  # only NOPE, never fetched
+        assert server.requests == []
+
+        # Forced runs resume from the last stored date instead of refetching history
+        ingest_exogenous(sources, force=True, end_date="2024-01-31", conn=conn)
+        fred_query = [q for name, q in server.requests if name == "fred"][0]
+        assert fred_query["observation_start"] == "2024-01-20"
+
+
+# Test that per-source failures are reported without stopping the other sources.
+def test_ingest_reports_failures(conn, tmp_path):
+    write_fixtures(tmp_path)
+    sources = {"fred": FredSource(api_key=None), "other": CsvDropSource(tmp_path / "missing")}
+    sources["fred"].api_key = None
+    summary = ingest_exogenous(sources, end_date="2024-01-31", conn=conn)
+    assert set(summary["failed"]) == {"ICSA", "HMI"}
+    assert conn.execute("SELECT COUNT(*) FROM exogenous_metadata WHERE last_fetch IS NOT NULL").fetchone()[0] == 0
+
+
+# Test lag parsing of catalog entries, including ranges.
+def test_parse_lag():
+    assert parse_lag(0) == 0 and parse_lag(7) == 7
+    assert parse_lag("14-28") == 28 and parse_lag(None) == 0
+
+
+
+# Test adapters must implement fetch to be instantiated.
+def test_source_requires_fetch():
+    class NoFetch(ExogenousSource):
+        name = "nofetch"
+
+    class Constant(ExogenousSource):
+        def fetch(self, symbol, start_date, end_date):
+            return pd.DataFrame({"date": [start_date], "close": [1.0]})
+
+    for abstract in (ExogenousSource, NoFetch):
+        with pytest.raises(TypeError):
+            abstract()
+    assert Constant().fetch("X", "2024-01-02", "2024-01-02")["close"].tolist() == [1.0]
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All exogenous ingestion tests passed successfully!")
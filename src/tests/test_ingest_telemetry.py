@@ -0,0 +1,105 @@
+# src/tests/test_ingest_telemetry.py
+
+import json
+import sqlite3
+import threading
+import pytest
+import src.utils.db_utils as db_utils
+from src.db_schema import DATABASES
+from src.etl.update_prices import update_daily_prices
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.ingest_telemetry import IngestRun, ingest_job, fetch_ingest_runs, observe, count, stage
+from src.utils.request_policy import RequestPolicy, install_request_policy
+
+
+# Test stage totals, latency percentiles and the histogram of one run.
+def test_run_summary():
+    run = IngestRun("job")
+    for latency in [0.01, 0.02, 0.2, 0.3, 4.0]:
+        run.observe("request", latency)
+    run.observe("write", 0.5)
+    run.count(rows=100, retries=2)
+    run.finish()
+    summary = run.summary()
+
+    assert summary["request_seconds"] == pytest.approx(4.53) and summary["write_seconds"] == 0.5
+    assert summary["latency_p50"] == pytest.approx(0.2) and summary["latency_max"] == 4.0
+    assert json.loads(summary["latency_histogram"]) == {"<=0.05": 2, "<=0.1": 0, "<=0.25": 1, "<=0.5": 1, "<=1": 0,
+                                                        "<=2.5": 0, "<=5": 1, "<=10": 0, ">10": 0}
+    assert "100 rows" in run.report() and "2 retries" in run.report()
+
+
+# Test nested jobs report to the outer run, and failures are stored with their error.
+def test_nested_and_failed_runs(assets_conn):
+    @ingest_job("inner")
+    def inner(conn=None):
+        with stage("transform"):
+            count(rows=5)
+
+    @ingest_job("outer")
+    def outer(conn=None):
+        inner(conn=conn)
+        observe("request", 0.1)
+
+    @ingest_job("broken")
+    def broken(conn=None):
+        raise ValueError("bad payload")
+
+    outer(conn=assets_conn)
+    with pytest.raises(ValueError):
+        broken(assets_conn)
+    runs = fetch_ingest_runs(conn=assets_conn).set_index("job")
+
+    assert list(runs.index) == ["broken", "outer"]
+    assert runs.loc["outer", "rows"] == 5 and runs.loc["outer", "requests"] == 0
+    assert runs.loc["outer", "latency_p50"] == pytest.approx(0.1)
+    assert runs.loc["broken", "status"] == "failed" and runs.loc["broken", "error"] == "ValueError: bad payload"
+
+
+# Test a job started on another thread records its own run instead of joining the running one.
+def test_concurrent_jobs_on_other_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    started = threading.Event()
+
+    @ingest_job("worker")
+    def worker():
+        count(rows=3)
+        started.set()
+
+    @ingest_job("main")
+    def main():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        started.wait(5)
+        thread.join()
+        count(rows=5)
+
+    main()
+    runs = fetch_ingest_runs().set_index("job")
+    assert runs.loc["main", "rows"] == 5 and runs.loc["worker", "rows"] == 3
+
+
+# Test a real update records requests, retries, stage timings and rows/sec in ingest_runs.
+def test_update_daily_prices_records_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    conn = sqlite3.connect(tmp_path / "assets.db")
+    for schema in DATABASES["assets.db"]:
+        conn.execute(schema)
+    conn.executemany("INSERT INTO asset_metadata (symbol, is_active) VALUES (?, 1)", [("AAA",), ("AAB",), ("AAC",)])
+    conn.commit()
+
+    with AlpacaEmulator(n_symbols=3, start_date="2024-01-01", end_date="2024-03-29") as emulator:
+        client = install_request_policy(emulator.client(), RequestPolicy(backoff_base=0.01, seed=0))
+        emulator.fail_next(1, status=503, path="bars")
+        update_daily_prices(client, end_date="2024-03-29", start_date="2024-01-01")
+
+    run = fetch_ingest_runs(job="update_daily_prices", conn=conn).iloc[0]
+    assert run["status"] == "ok" and run["items"] == 3 and run["rows"] == 3 * 65
+    assert run["requests"] == 2 and run["retries"] == 1
+    assert run["request_seconds"] > 0 and run["write_seconds"] > 0 and run["transform_seconds"] > 0
+    assert run["rows_per_second"] > 0 and run["latency_max"] >= run["latency_p50"] > 0
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All ingest telemetry tests passed successfully!")
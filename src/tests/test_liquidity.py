@@ -0,0 +1,70 @@
+# src/tests/test_liquidity.py
+
+import sqlite3
+import pandas as pd
+import pytest
+import src.utils.db_utils as db_utils
+from src.utils.db_utils import ensure_schema, fetch_active_tickers
+from src.utils.liquidity import update_liquidity, fetch_liquidity
+from src.utils.price_store import insert_price_bars
+
+
+def make_bars(dates, price, volume, trade_count=10):
+    return pd.DataFrame({"date": dates, "open": price, "high": price * 1.01, "low": price * 0.99, "close": price,
+                         "volume": volume, "trade_count": trade_count, "vwap": price * 1.001})
+
+
+# Test volume, trade count and VWAP are persisted, and old databases gain the columns.
+def test_price_bars_keep_volume_fields():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE asset_prices (price_id INTEGER PRIMARY KEY AUTOINCREMENT, asset_id INTEGER, "
+                 "date TEXT, open REAL, high REAL, low REAL, close REAL, adjusted_close REAL, volume INTEGER, "
+                 "fetched_at TEXT)")
+    ensure_schema(conn)
+    insert_price_bars(conn, 1, make_bars(["2024-01-02"], 10.0, 5000, trade_count=42))
+
+    volume, trade_count, vwap = conn.execute("SELECT volume, trade_count, vwap FROM asset_prices").fetchone()
+    assert (volume, trade_count) == (5000, 42) and vwap == pytest.approx(10.01)
+
+
+# Test ranking by median dollar volume, and that short histories stay unranked.
+def test_update_liquidity_ranks_by_dollar_volume(assets_conn):
+    assets_conn.executemany("INSERT INTO asset_metadata (asset_id, symbol, is_active) VALUES (?, ?, 1)",
+                            [(1, "BIG"), (2, "MID"), (3, "NEW"), (4, "TINY")])
+    dates = pd.bdate_range("2024-01-01", periods=30).strftime("%Y-%m-%d")
+    insert_price_bars(assets_conn, 1, make_bars(dates, 100.0, 1_000_000))
+    insert_price_bars(assets_conn, 2, make_bars(dates, 20.0, 50_000))
+    insert_price_bars(assets_conn, 3, make_bars(dates[-3:], 500.0, 1_000_000))
+    insert_price_bars(assets_conn, 4, make_bars(dates, 1.0, 100))
+
+    liquidity = update_liquidity(window=20, conn=assets_conn).set_index("asset_id")
+    assert liquidity.loc[1, "days"] == 20 and liquidity.loc[3, "days"] == 3
+    assert liquidity["liquidity_rank"].fillna(0).to_dict() == {1: 1, 2: 2, 3: 0, 4: 3}
+    assert liquidity.loc[2, "median_dollar_volume"] == pytest.approx(50_000 * 20.0 * 1.001)
+
+    top = fetch_liquidity(top_n=2, conn=assets_conn)
+    assert list(top["symbol"]) == ["BIG", "MID"]
+    assert list(fetch_liquidity(min_dollar_volume=1_000_000, conn=assets_conn)["symbol"]) == ["BIG", "MID"]
+
+
+# Test the screening filters of fetch_active_tickers cut the universe to liquid names.
+def test_fetch_active_tickers_liquidity_screen(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    conn = sqlite3.connect(tmp_path / "assets.db")
+    ensure_schema(conn)
+    conn.executemany("INSERT INTO asset_metadata (asset_id, symbol, is_active) VALUES (?, ?, 1)",
+                     [(1, "BIG"), (2, "MID"), (3, "TINY")])
+    dates = pd.bdate_range("2024-01-01", periods=20).strftime("%Y-%m-%d")
+    for asset_id, volume in [(1, 1_000_000), (2, 50_000), (3, 100)]:
+        insert_price_bars(conn, asset_id, make_bars(dates, 10.0, volume))
+    update_liquidity(conn=conn)
+    conn.commit()
+
+    assert fetch_active_tickers() == {"BIG": 1, "MID": 2, "TINY": 3}
+    assert fetch_active_tickers(max_liquidity_rank=2) == {"BIG": 1, "MID": 2}
+    assert fetch_active_tickers(min_dollar_volume=1e6) == {"BIG": 1}
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All liquidity tests passed successfully!")
@@ -0,0 +1,53 @@
+# src/tests/test_panel_smoothers.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.statistics.smoothers import smooth_lowess, exponential_smoother, sma_smoother
+from src.statistics.panel_smoothers import ema_panel, sma_panel, lowess_panel, smooth_panel
+
+
+def make_panel(n, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(50 + rng.normal(size=(n, k)).cumsum(axis=0), columns=[f"T{j}" for j in range(k)])
+
+
+# Test every panel smoother reproduces the single-series smoother column by column.
+@pytest.mark.parametrize("n", [3, 9, 10, 150])
+def test_panel_matches_single_series(n):
+    panel = make_panel(n)
+    ema, sma, lowess = ema_panel(panel), sma_panel(panel), lowess_panel(panel)
+    for ticker in panel:
+        assert np.allclose(ema[ticker], exponential_smoother(panel[ticker])[0], rtol=0, atol=1e-10)
+        assert np.allclose(sma[ticker], sma_smoother(panel[ticker]), rtol=0, atol=1e-10)
+        assert np.allclose(lowess[ticker], smooth_lowess(panel[ticker]), rtol=0, atol=1e-10)
+    assert np.allclose(sma_panel(panel, 4), panel.apply(sma_smoother, window_length=4))
+
+
+# Test columns with a shorter history start at their first value and are NaN before it.
+def test_panel_leading_nans():
+    panel = make_panel(80, k=2)
+    panel.iloc[:20, 1] = np.nan
+    ema = ema_panel(panel)
+    assert ema["T1"].isna().sum() == 20
+    assert np.allclose(ema["T1"].iloc[20:], exponential_smoother(panel["T1"].iloc[20:])[0])
+    assert np.allclose(sma_panel(panel), panel.rolling(30, min_periods=1, center=True).mean(), equal_nan=True)
+
+
+# Test arrays keep their type and shape, and unknown methods are rejected.
+def test_smooth_panel_arrays():
+    values = make_panel(60).to_numpy()
+    for method in ("lowess", "ema", "sma"):
+        smoothed = smooth_panel(values, method=method)
+        assert isinstance(smoothed, np.ndarray) and smoothed.shape == values.shape
+    assert smooth_panel(values[:, 0], method="ema").shape == (60,)
+    with pytest.raises(ValueError):
+        smooth_panel(values, method="kalman")
+
+
+if __name__ == "__main__":
+    for n in [3, 9, 10, 150]:
+        test_panel_matches_single_series(n)
+    test_panel_leading_nans()
+    test_smooth_panel_arrays()
+    print("✅ All panel smoother tests passed successfully!")
@@ -0,0 +1,59 @@
+# src/tests/test_populate_tickers.py
+
+import pytest
+from src.etl.populate_tickers import sync_universe
+from src.utils.alpaca_emulator import AlpacaEmulator
+
+
+# Test that a sync inserts, updates, delists and reactivates without touching prices.
+def test_sync_universe_applies_diff(assets_conn):
+    with AlpacaEmulator(symbols=["AAA", "BBB", "CCC"]) as emulator:
+        client = emulator.client()
+        first = sync_universe(client, conn=assets_conn)
+        assert first["added"] == ["AAA", "BBB", "CCC"]
+
+        assets_conn.execute("INSERT INTO asset_prices (asset_id, date, close) VALUES (1, '2024-01-02', 10.0)")
+        emulator.assets["BBB"]["status"] = "inactive"
+        emulator.assets["CCC"]["name"] = "CCC Renamed Inc"
+        second = sync_universe(client, conn=assets_conn, max_delist_fraction=0.5)
+        assert second == {"added": [], "reactivated": [], "updated": ["CCC"], "delisted": ["BBB"]}
+
+        emulator.assets["BBB"]["status"] = "active"
+        third = sync_universe(client, conn=assets_conn)
+        assert third["reactivated"] == ["BBB"] and third["delisted"] == []
+
+    rows = dict(assets_conn.execute("SELECT symbol, is_active FROM asset_metadata").fetchall())
+    assert rows == {"AAA": 1, "BBB": 1, "CCC": 1}
+    assert assets_conn.execute("SELECT name FROM asset_metadata WHERE symbol = 'CCC'").fetchone()[0] == "CCC Renamed Inc"
+    assert assets_conn.execute("SELECT COUNT(*) FROM asset_prices").fetchone()[0] == 1, "Price history must survive a sync."
+
+
+# Test that a delisting records the removal date.
+def test_sync_universe_sets_date_removed(assets_conn):
+    with AlpacaEmulator(symbols=["AAA", "BBB"]) as emulator:
+        sync_universe(emulator.client(), conn=assets_conn)
+        del emulator.assets["AAA"]
+        sync_universe(emulator.client(), conn=assets_conn, force=True)
+    is_active, date_removed = assets_conn.execute("SELECT is_active, date_removed FROM asset_metadata WHERE symbol = 'AAA'").fetchone()
+    assert is_active == 0 and date_removed is not None
+
+
+# Test an empty or mass-delisting asset list is refused unless forced.
+def test_sync_universe_guards_against_mass_delisting(assets_conn):
+    with AlpacaEmulator(symbols=[f"A{chr(65 + i)}" for i in range(20)]) as emulator:
+        sync_universe(emulator.client(), conn=assets_conn)
+        for symbol in ["AA", "AB", "AC"]:
+            del emulator.assets[symbol]
+        with pytest.raises(RuntimeError, match="delist 3 of 20"):
+            sync_universe(emulator.client(), conn=assets_conn)
+        assert assets_conn.execute("SELECT COUNT(*) FROM asset_metadata WHERE is_active = 1").fetchone()[0] == 20
+
+        emulator.assets.clear()
+        with pytest.raises(RuntimeError, match="no eligible assets"):
+            sync_universe(emulator.client(), conn=assets_conn)
+        assert sync_universe(emulator.client(), conn=assets_conn, force=True)["delisted"] == [f"A{chr(65 + i)}" for i in range(20)]
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All universe sync tests passed successfully!")
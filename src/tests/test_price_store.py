@@ -0,0 +1,65 @@
+# src/tests/test_price_store.py
+
+import pandas as pd
+import pytest
+from src.utils.price_store import (
+    insert_price_bars,
+    get_price_fingerprint,
+    rebuild_price_fingerprints,
+)
+
+
+def make_bars(dates, start_price=100.0):
+    n = len(dates)
+    prices = [start_price + i for i in range(n)]
+    return pd.DataFrame({
+        "date": dates,
+        "open": prices,
+        "high": [p + 1 for p in prices],
+        "low": [p - 1 for p in prices],
+        "close": prices,
+    })
+
+
+# Test that inserting new rows changes the fingerprint and re-inserting does not.
+def test_insert_updates_fingerprint_only_on_change(assets_conn):
+    bars = make_bars(["2024-01-02", "2024-01-03", "2024-01-04"])
+
+    assert insert_price_bars(assets_conn, 1, bars) == 3
+    first = get_price_fingerprint(1, conn=assets_conn)
+    assert first.row_count == 3 and first.last_date == "2024-01-04"
+
+    assert insert_price_bars(assets_conn, 1, bars) == 0, "Duplicate dates should be skipped."
+    assert get_price_fingerprint(1, conn=assets_conn) == first
+
+    assert insert_price_bars(assets_conn, 1, make_bars(["2024-01-05"], 200.0)) == 1
+    second = get_price_fingerprint(1, conn=assets_conn)
+    assert second != first and second.row_count == 4
+
+
+# Test that the incrementally maintained checksum matches a full recomputation.
+def test_incremental_checksum_matches_rebuild(assets_conn):
+    insert_price_bars(assets_conn, 7, make_bars(["2024-01-02", "2024-01-03"]))
+    insert_price_bars(assets_conn, 7, make_bars(["2024-01-04", "2024-01-05"], 150.0))
+    incremental = get_price_fingerprint(7, conn=assets_conn)
+
+    assert rebuild_price_fingerprints(assets_conn) == 1
+    assert get_price_fingerprint(7, conn=assets_conn) == incremental
+
+
+# Test windowed fingerprints only react to rows inside the window.
+def test_window_fingerprint(assets_conn):
+    insert_price_bars(assets_conn, 3, make_bars(["2024-01-02", "2024-01-03", "2024-01-04"]))
+    window_fp = get_price_fingerprint(3, window=2, conn=assets_conn)
+    assert window_fp.row_count == 2 and window_fp.window == 2
+
+    assets_conn.execute("UPDATE asset_prices SET close = 1.0 WHERE date = '2024-01-02'")
+    assert get_price_fingerprint(3, window=2, conn=assets_conn) == window_fp
+
+    assets_conn.execute("UPDATE asset_prices SET close = 1.0 WHERE date = '2024-01-04'")
+    assert get_price_fingerprint(3, window=2, conn=assets_conn) != window_fp
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All price store tests passed successfully!")
@@ -0,0 +1,70 @@
+# src/tests/test_price_validation.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.price_store import insert_price_bars
+from src.utils.price_validation import validate_price_bars, fetch_quality_scores
+
+
+def make_bars(n, start="2024-01-02", price=100.0):
+    dates = pd.bdate_range(start, periods=n).strftime("%Y-%m-%d")
+    close = price + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        "date": dates, "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000,
+    })
+
+
+# Test each check flags the expected rows and leaves clean rows alone.
+def test_validate_price_bars_checks():
+    bars = make_bars(10)
+    bars.loc[1, "high"] = bars.loc[1, "low"] - 5            # high < low
+    bars.loc[3, ["open", "low"]] = [0.0, 0.0]               # non-positive
+    bars.loc[6, ["open", "high", "low", "close"]] *= 50     # one-bar spike
+    bars = pd.concat([bars, bars.iloc[[8]].assign(close=108.5, high=109.5)], ignore_index=True)  # duplicate date
+
+    clean, rejected = validate_price_bars(bars)
+    reasons = dict(zip(rejected["date"], rejected["reasons"]))
+    assert reasons == {
+        bars.loc[1, "date"]: "ohlc",
+        bars.loc[3, "date"]: "nonpositive",
+        bars.loc[6, "date"]: "outlier",
+        bars.loc[8, "date"]: "duplicate",
+    }
+    assert clean["date"].is_unique and len(clean) == 7
+    assert clean.set_index("date").loc[bars.loc[8, "date"], "close"] == 108.5, "Last duplicate should be kept."
+
+
+# Test a persistent level shift is not treated as a spike.
+def test_level_shift_is_kept():
+    bars = make_bars(10)
+    bars.loc[5:, ["open", "high", "low", "close"]] *= 20
+    clean, rejected = validate_price_bars(bars)
+    assert rejected.empty and len(clean) == 10
+
+
+# Test stored rows are used as context for spikes at the edge of a batch.
+def test_insert_quarantines_and_scores(assets_conn):
+    history = make_bars(10)
+    assert insert_price_bars(assets_conn, 1, history) == 10
+
+    batch = make_bars(4, start="2024-01-16", price=110.0)
+    batch.loc[0, ["open", "high", "low", "close"]] *= 50
+    batch.loc[2, "high"] = 1.0
+    assert insert_price_bars(assets_conn, 1, batch) == 2
+
+    quarantined = pd.read_sql_query("SELECT date, reasons FROM price_quarantine ORDER BY date", assets_conn)
+    assert quarantined["reasons"].tolist() == ["outlier", "ohlc"]
+    stored = pd.read_sql_query("SELECT COUNT(*) AS n FROM asset_prices", assets_conn)["n"].iloc[0]
+    assert stored == 12
+
+    scores = fetch_quality_scores(conn=assets_conn)
+    assert scores.loc[1, "rows_checked"] == 14 and scores.loc[1, "rows_quarantined"] == 2
+    assert np.isclose(scores.loc[1, "score"], 1 - 2 / 14)
+    assert scores.loc[1, "outlier_issues"] == 1 and scores.loc[1, "ohlc_issues"] == 1
+    assert fetch_quality_scores(min_score=0.9, conn=assets_conn).empty
+
+
+if __name__ == "__main__":
+    if pytest.main([__file__]) == 0:
+        print("✅ All price validation tests passed successfully!")
@@ -0,0 +1,85 @@
+# src/tests/test_price_writer.py
+
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.utils.price_writer import PriceWriter
+
+
+def make_bars(n, price=100.0):
+    dates = pd.bdate_range("2024-01-02", periods=n).strftime("%Y-%m-%d")
+    close = [price + i for i in range(n)]
+    return pd.DataFrame({"date": dates, "open": close, "high": [c + 1 for c in close],
+                         "low": [c - 1 for c in close], "close": close, "volume": 1000})
+
+
+# Test concurrent producers feed one writer that batches commits and reports metrics.
+def test_concurrent_producers_single_writer():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "assets.db")
+        with PriceWriter(db_path, queue_size=4, commit_rows=500, commit_interval=60) as writer:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda asset_id: writer.put(asset_id, make_bars(100), f"T{asset_id}"), range(1, 41)))
+        metrics = writer.metrics()
+
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute("SELECT COUNT(*), COUNT(DISTINCT asset_id) FROM asset_prices").fetchone()
+        conn.close()
+
+    assert stored == (4000, 40)
+    assert metrics["items"] == 40 and metrics["rows"] == 4000
+    assert metrics["commits"] == 8, "Commits should be batched by row count."
+    assert metrics["max_queue_depth"] <= 4 and metrics["queue_depth"] == 0
+    assert len(writer.changed) == 40 and not writer.errors
+
+
+# Test rows pending below both thresholds are committed when the writer closes.
+def test_close_flushes_pending_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "assets.db")
+        writer = PriceWriter(db_path, commit_rows=10**6, commit_interval=3600)
+        writer.put(1, make_bars(5), "AAA")
+        writer.put(2, make_bars(5), "BBB")
+        writer.close()
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM asset_prices").fetchone()[0] == 10
+        conn.close()
+    assert writer.metrics()["commits"] == 1
+
+    try:
+        writer.put(3, make_bars(1), "CCC")
+        assert False, "A closed writer must refuse new work."
+    except RuntimeError:
+        pass
+
+
+# Test callbacks share the rows' transaction and flush commits without closing.
+def test_on_write_and_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "assets.db")
+        writer = PriceWriter(db_path, commit_rows=10**6, commit_interval=3600)
+        writer.submit(lambda conn: conn.execute("INSERT INTO asset_metadata (symbol, is_active) VALUES ('AAA', 1)"))
+        written = []
+        writer.put(1, make_bars(3), "AAA", on_write=lambda conn, rows: written.append(rows))
+        writer.put(2, make_bars(0), "BBB", on_write=lambda conn, rows: written.append(rows))
+        writer.put(3, make_bars(2), "CCC", on_write=lambda conn, rows: 1 / 0)
+        writer.flush()
+
+        reader = sqlite3.connect(db_path)
+        assert reader.execute("SELECT COUNT(*) FROM asset_metadata").fetchone()[0] == 1
+        assert reader.execute("SELECT COUNT(*) FROM asset_prices WHERE asset_id = 1").fetchone()[0] == 3
+        reader.close()
+        assert written == [3, 0], "Empty frames still reach their callback."
+        assert list(writer.errors) == ["CCC"]
+        assert writer.metrics()["commits"] == 1
+        writer.close()
+
+
+if __name__ == "__main__":
+    test_concurrent_producers_single_writer()
+    test_close_flushes_pending_rows()
+    test_on_write_and_flush()
+    print("✅ All price writer tests passed successfully!")
@@ -0,0 +1,87 @@
+# src/tests/test_request_policy.py
+
+import time
+import pytest
+from alpaca_trade_api.rest import APIError
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.alpaca_utils import fetch_alpaca_bars_batched, fetch_alpaca_latest_bars
+from src.utils.request_policy import RequestPolicy, CircuitOpenError, install_request_policy, endpoint_label
+
+
+def make_client(emulator, **kwargs):
+    policy = RequestPolicy(requests_per_minute=6000, backoff_base=0.01, backoff_cap=0.05, seed=0, **kwargs)
+    return install_request_policy(emulator.client(), policy), policy
+
+
+# Test symbols and ids are normalized out of endpoint labels.
+def test_endpoint_label():
+    assert endpoint_label("get", "http://x/v2/stocks/AAPL/bars?limit=5") == "GET /v2/stocks/{symbol}/bars"
+    assert endpoint_label("DELETE", "http://x/v2/orders/61e69015-8549-4bfd-b9c3-01e75843f47d") == "DELETE /v2/orders/{id}"
+
+
+# Test transient 503s are retried with backoff and counted, and the call still succeeds.
+def test_retries_transient_errors():
+    with AlpacaEmulator(n_symbols=3) as emulator:
+        client, policy = make_client(emulator)
+        emulator.fail_next(2, status=503, path="account")
+        assert client.get_account() is not None
+        sent = emulator.stats["requests"]
+
+    stats = policy.stats()["GET /v2/account"]
+    assert sent == 3 and client._retry == 0
+    assert stats["requests"] == 3 and stats["retries"] == 2
+    assert stats["failures"] == 2 and stats["successes"] == 1 and policy.state == "closed"
+
+
+# Test an outage opens the circuit, calls then fail fast without reaching the server, and a trial closes it.
+def test_circuit_breaker_opens_and_recovers():
+    with AlpacaEmulator(n_symbols=3) as emulator:
+        client, policy = make_client(emulator, max_retries=1, failure_threshold=3, cooldown=0.3)
+        emulator.fail_next(3, status=500)
+        with pytest.raises(APIError):
+            client.get_account()
+        with pytest.raises(CircuitOpenError):
+            client.get_account()
+        assert policy.state == "open"
+
+        sent = emulator.stats["requests"]
+        assert fetch_alpaca_latest_bars(client, ["AAA"]).empty
+        assert emulator.stats["requests"] == sent == 3
+
+        time.sleep(0.35)
+        assert client.get_account() is not None
+        assert policy.state == "closed"
+
+
+# Test rate-limit headers set the pace and the policy waits for the window reset instead of drawing 429s.
+def test_paces_from_rate_limit_headers():
+    with AlpacaEmulator(n_symbols=3, rate_limit=(5, 1.0)) as emulator:
+        client, policy = make_client(emulator, reserve=0.2, limit_window=1.0)
+        for _ in range(12):
+            client.get_account()
+        sent = emulator.stats["requests"]
+
+    stats = policy.stats()["GET /v2/account"]
+    assert sent == 12 and stats["throttled"] == 0 and stats["successes"] == 12
+    assert policy.bucket.rate == 5.0
+
+
+# Test requests made inside alpaca_utils helpers are attributed to the helper with call timings.
+def test_tracks_alpaca_utils_functions():
+    with AlpacaEmulator(n_symbols=5, start_date="2024-01-01", end_date="2024-02-01") as emulator:
+        client, policy = make_client(emulator)
+        frames = fetch_alpaca_bars_batched(client, emulator.symbols, "1Day", "2024-01-01", "2024-02-01", chunk_size=2)
+
+    assert len(frames) == 5
+    stats = policy.stats_frame().loc["fetch_alpaca_bars_batched"]
+    assert stats["calls"] == 1 and stats["requests"] == 3 and stats["successes"] == 3
+    assert stats["call_seconds"] >= stats["latency_seconds"] > 0
+
+
+if __name__ == "__main__":
+    test_endpoint_label()
+    test_retries_transient_errors()
+    test_circuit_breaker_opens_and_recovers()
+    test_paces_from_rate_limit_headers()
+    test_tracks_alpaca_utils_functions()
+    print("✅ All request policy tests passed successfully!")
@@ -2,7 +2,9 @@
 
 import numpy as np
 import pandas as pd
+import statsmodels.api as sm
 from src.statistics.smoothers import (
+    lowess_equal_spacing,
     smooth_lowess,
     exponential_smoother,
     sma_smoother,
@@ -133,6 +135,29 @@ def test_invalid_inputs():
         assert isinstance(e, ValueError), "SMA does not handle empty series."
 
 
+# Test the equal-spacing LOWESS matches statsmodels, including flat stretches and whole panels.
+def test_lowess_equal_spacing_matches_statsmodels():
+    rng = np.random.default_rng(0)
+    series = [
+        rng.standard_t(3, size=150).cumsum(),
+        rng.standard_normal(5000).cumsum(),
+        np.r_[np.full(80, 10.0), 10 + rng.standard_normal(70).cumsum()],
+        np.r_[np.zeros(50), np.ones(50)],
+        np.array([1.0, 2.0, 3.0]),
+    ]
+    for y in series:
+        x = np.arange(len(y))
+        for frac in (0.01, 0.2, 1.0):
+            for iterations in (0, 2):
+                expected = sm.nonparametric.lowess(y, x, frac=frac, it=iterations)[:, 1]
+                assert np.allclose(lowess_equal_spacing(y, frac, iterations), expected, rtol=0, atol=1e-8)
+
+    panel = 20 + rng.standard_normal((150, 6)).cumsum(axis=0)
+    smoothed = lowess_equal_spacing(panel, 0.2)
+    for j in range(panel.shape[1]):
+        assert np.allclose(smoothed[:, j], sm.nonparametric.lowess(panel[:, j], np.arange(150), frac=0.2, it=2)[:, 1])
+
+
 if __name__ == "__main__":
     test_smooth_lowess()
     test_exponential_smoother()
@@ -143,4 +168,5 @@ if __name__ == "__main__":
     test_short_series()
     test_constant_series()
     test_invalid_inputs()
+    test_lowess_equal_spacing_matches_statsmodels()
     print("✅ All smoothing function tests passed successfully!")
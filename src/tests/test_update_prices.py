@@ -0,0 +1,77 @@
+# src/tests/test_update_prices.py
+
+import sqlite3
+import src.utils.db_utils as db_utils
+from src.db_schema import DATABASES
+from src.etl.update_prices import plan_update_requests, update_daily_prices
+from src.utils.alpaca_emulator import AlpacaEmulator
+from src.utils.price_store import insert_price_bars
+
+
+# Test tickers missing the same range share a group, and nearby ranges merge only when bridged.
+def test_plan_groups_identical_ranges():
+    latest = {"AAA": "2024-03-22", "AAB": "2024-03-22", "AAC": "2024-03-20", "AAD": None, "AAE": "2024-03-29"}
+    assert plan_update_requests(latest, "2024-03-29", start_date="2024-01-01") == [
+        ("2024-01-01", "2024-03-29", ["AAD"]),
+        ("2024-03-21", "2024-03-29", ["AAC"]),
+        ("2024-03-23", "2024-03-29", ["AAA", "AAB"]),
+    ]
+    assert plan_update_requests(latest, "2024-03-29", start_date="2024-01-01", bridge_days=7)[1] == \
+        ("2024-03-21", "2024-03-29", ["AAC", "AAA", "AAB"])
+
+
+# Test a daily update costs one multi-symbol request per group and chunk, and keeps short ranges.
+def test_update_daily_prices_grouped_requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    with AlpacaEmulator(n_symbols=5, start_date="2024-01-01", end_date="2024-03-29") as emulator:
+        conn = sqlite3.connect(tmp_path / "assets.db")
+        for schema in DATABASES["assets.db"]:
+            conn.execute(schema)
+        conn.executemany("INSERT INTO asset_metadata (asset_id, symbol, is_active) VALUES (?, ?, 1)",
+                         list(enumerate(emulator.symbols, start=1)))
+        stored_until = {"AAA": "2024-03-22", "AAB": "2024-03-22", "AAC": "2024-03-22", "AAD": "2024-03-20"}
+        for asset_id, symbol in enumerate(emulator.symbols, start=1):
+            if symbol in stored_until:
+                bars = emulator.daily_bars(symbol)
+                insert_price_bars(conn, asset_id, bars[bars["date"] <= stored_until[symbol]])
+        conn.commit()
+
+        changed = update_daily_prices(emulator.client(), end_date="2024-03-29", start_date="2024-01-01", chunk_size=2)
+        first_requests = emulator.stats["by_endpoint"].get("GET /v2/stocks/bars", 0)
+        assert update_daily_prices(emulator.client(), end_date="2024-03-29", start_date="2024-01-01") == set()
+        second_requests = emulator.stats["by_endpoint"]["GET /v2/stocks/bars"] - first_requests
+
+    assert changed == set(emulator.symbols)
+    assert first_requests == 3 and second_requests == 0
+    last_dates = conn.execute("SELECT asset_id, MAX(date), COUNT(*) FROM asset_prices GROUP BY asset_id").fetchall()
+    assert {last for _, last, _ in last_dates} == {"2024-03-29"}
+    assert len({count for _, _, count in last_dates}) == 1
+
+
+# Test a failed chunk does not stop the update: the rest is committed and the failed tickers are retried.
+def test_update_daily_prices_survives_failed_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_DIR", tmp_path)
+    with AlpacaEmulator(n_symbols=5, start_date="2024-01-01", end_date="2024-03-29") as emulator:
+        conn = sqlite3.connect(tmp_path / "assets.db")
+        for schema in DATABASES["assets.db"]:
+            conn.execute(schema)
+        conn.executemany("INSERT INTO asset_metadata (asset_id, symbol, is_active) VALUES (?, ?, 1)",
+                         list(enumerate(emulator.symbols, start=1)))
+        conn.commit()
+
+        emulator.fail_next(1, status=500, path="/stocks/bars")
+        failed = {}
+        changed = update_daily_prices(emulator.client(), end_date="2024-03-29", start_date="2024-01-01",
+                                      chunk_size=2, failed=failed)
+        liquid = conn.execute("SELECT COUNT(*) FROM asset_liquidity").fetchone()[0]
+        retried = update_daily_prices(emulator.client(), end_date="2024-03-29", start_date="2024-01-01", chunk_size=2)
+
+    assert set(failed) == {"AAA", "AAB"} and changed == {"AAC", "AAD", "AAE"}
+    assert liquid == 3, "Liquidity must be refreshed for the tickers that were written."
+    assert retried == {"AAA", "AAB"}
+    assert conn.execute("SELECT COUNT(DISTINCT asset_id) FROM asset_prices").fetchone()[0] == 5
+
+
+if __name__ == "__main__":
+    test_plan_groups_identical_ranges()
+    print("✅ All update price tests passed successfully!")
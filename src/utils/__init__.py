@@ -8,6 +8,7 @@ from .alpaca_utils import (
     connect_to_alpaca,
     fetch_alpaca_stock_tickers,
     fetch_alpaca_historical_data,
+    fetch_alpaca_bars_batched,
     fetch_alpaca_yesterday_ohlc,
     fetch_alpaca_open_prices,
     fetch_alpaca_latest_bars,
@@ -19,27 +20,91 @@ from .db_utils import (
     get_db_connection,
     fetch_active_tickers,
     get_latest_price_date,
+    fetch_latest_price_dates,
     fetch_all_asset_metadata,  
     fetch_all_asset_prices, 
     last_data_date, 
     last_fetch_date,
     fetch_database_stock_tickers,
     fetch_price_range,
-    get_stock_name
+    fetch_price_panel,
+    get_stock_name,
+    ensure_schema
 )
 
+from .price_store import (
+    insert_price_bars,
+    get_price_fingerprint,
+    rebuild_price_fingerprints,
+    PriceFingerprint
+)
+
+from .price_validation import validate_price_bars, fetch_quality_scores
+
+from .liquidity import update_liquidity, fetch_liquidity
+
+from .price_writer import PriceWriter
+
+from .request_policy import RequestPolicy, CircuitOpenError, install_request_policy, get_request_policy
+
+from .ingest_telemetry import IngestRun, ingest_job, fetch_ingest_runs
+
+from .alpaca_async import (
+    download_bars,
+    download_bars_async
+)
+
+from .alpaca_stream import (
+    BarStream,
+    RollingBars,
+    DailyBarAggregator,
+    fetch_stream_symbols,
+    stream_minute_bars
+)
+
+from .alpaca_emulator import AlpacaEmulator
+
+from .rate_limit import TokenBucket
+
+from .bar_accumulator import BarAccumulator
+
+from .bar_cache import BarCache, get_default_cache
+
+from .market_calendar import load_trading_calendar, fetch_alpaca_calendar, session_bounds
+
+from .exogenous_sources import (
+    ExogenousSource,
+    FredSource,
+    YahooSource,
+    CsvDropSource,
+    default_sources
+)
+
+from .exogenous_utils import (
+    fetch_exogenous_metadata,
+    upsert_exogenous_values,
+    fetch_exogenous_values,
+    asof_align,
+    exogenous_asof_matrix,
+    fetch_exogenous_for_ticker
+)
+
+from .exogenous_alignment import ExogenousAligner, get_exogenous_aligner
+
 __all__ = [
     'get_alpaca_client',
     'connect_to_alpaca',
     'fetch_alpaca_stock_tickers',
     'update_stock_prices',
     'fetch_alpaca_historical_data',
+    'fetch_alpaca_bars_batched',
     'fetch_alpaca_yesterday_ohlc',
     'fetch_alpaca_open_prices',
     'fetch_alpaca_latest_bars',
     'get_db_connection',
     'fetch_active_tickers',
     'get_latest_price_date',
+    'fetch_latest_price_dates',
     'fetch_all_asset_metadata',  
     'fetch_all_asset_prices', 
     'last_data_date', 
@@ -47,5 +112,51 @@ __all__ = [
     'fetch_database_stock_tickers',
     'populate_alpaca_full_history',
     'fetch_price_range',
-    'get_stock_name'
+    'fetch_price_panel',
+    'load_trading_calendar',
+    'BarStream',
+    'RollingBars',
+    'DailyBarAggregator',
+    'fetch_stream_symbols',
+    'stream_minute_bars',
+    'AlpacaEmulator',
+    'BarCache',
+    'ExogenousSource',
+    'FredSource',
+    'YahooSource',
+    'CsvDropSource',
+    'default_sources',
+    'get_default_cache',
+    'fetch_alpaca_calendar',
+    'session_bounds',
+    'get_stock_name',
+    'ensure_schema',
+    'insert_price_bars',
+    'get_price_fingerprint',
+    'rebuild_price_fingerprints',
+    'PriceFingerprint',
+    'validate_price_bars',
+    'fetch_quality_scores',
+    'update_liquidity',
+    'fetch_liquidity',
+    'PriceWriter',
+    'RequestPolicy',
+    'CircuitOpenError',
+    'install_request_policy',
+    'get_request_policy',
+    'IngestRun',
+    'ingest_job',
+    'fetch_ingest_runs',
+    'fetch_exogenous_metadata',
+    'upsert_exogenous_values',
+    'fetch_exogenous_values',
+    'asof_align',
+    'exogenous_asof_matrix',
+    'fetch_exogenous_for_ticker',
+    'ExogenousAligner',
+    'get_exogenous_aligner',
+    'download_bars',
+    'download_bars_async',
+    'TokenBucket',
+    'BarAccumulator'
 ]
\ No newline at end of file
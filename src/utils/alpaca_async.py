@@ -0,0 +1,256 @@
+# src/utils/alpaca_async.py
+
+"""
+Concurrent Alpaca bar downloader built on asyncio and aiohttp.
+
+Instead of requesting one ticker at a time and sleeping after each, the
+downloader runs up to `max_concurrency` requests in flight and paces them with a
+shared `TokenBucket` sized to the account's request quota. Every HTTP request
+(including each pagination page) takes one token and is retried with exponential
+backoff on 429, 5xx and connection errors. Each ticker's bars are streamed to the
+`on_result` callback as soon as they are complete, so a writer can persist them
+while the rest of the universe is still downloading.
+
+Functions
+---------
+download_bars(tickers, start_date, end_date, on_result=None, ...)
+    Synchronous entry point; runs the event loop and returns a summary dict.
+    Also works where an event loop is already running (e.g. Jupyter).
+
+download_bars_async(tickers, start_date, end_date, on_result=None, ...)
+    Coroutine version for callers that already run an event loop.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import pandas as pd
+from alpaca_trade_api.common import get_data_url
+
+from src.utils import ingest_telemetry
+from src.utils.rate_limit import TokenBucket
+
+BAR_FIELDS = {
+    't': 'timestamp',
+    'o': 'open',
+    'h': 'high',
+    'l': 'low',
+    'c': 'close',
+    'v': 'volume',
+    'n': 'trade_count',
+    'vw': 'vwap',
+}
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+PAGE_LIMIT = 10000
+
+
+class DownloadError(Exception):
+    """Raised when a ticker cannot be downloaded after all retries."""
+
+
+def bars_to_frame(bars):
+    """
+    Convert raw Alpaca v2 bar dicts to a DataFrame.
+
+    Parameters
+    ----------
+    bars : list of dict
+        Bars as returned by the `/v2/stocks/{symbol}/bars` endpoint.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'timestamp' (UTC datetime64), 'date' ('YYYY-MM-DD'), 'open', 'high',
+        'low', 'close', 'volume', 'trade_count' and 'vwap'.
+    """
+    frame = pd.DataFrame.from_records(bars, columns=list(BAR_FIELDS)).rename(columns=BAR_FIELDS)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], utc=True)
+    frame['date'] = frame['timestamp'].dt.strftime('%Y-%m-%d')
+    return frame[['timestamp', 'date', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']]
+
+
+def credentials_from_client(alpaca_client):
+    """Return the (key_id, secret_key) pair an existing REST client was built with."""
+    return alpaca_client._key_id, alpaca_client._secret_key
+
+
+def _default_credentials():
+    # Imported lazily: credentials/__init__.py raises when .secrets is missing
+    from credentials import ALPACA_API_KEY, ALPACA_SECRET_KEY
+    return ALPACA_API_KEY, ALPACA_SECRET_KEY
+
+
+async def _request_json(session, url, params, bucket, stats, max_retries, retry_wait):
+    attempt = 0
+    while True:
+        wait_start = time.perf_counter()
+        await bucket.acquire_async()
+        ingest_telemetry.observe('wait', time.perf_counter() - wait_start)
+        stats['requests'] += 1
+        ingest_telemetry.count(requests=1)
+        start = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as resp:
+                body = await resp.read()
+                ingest_telemetry.observe('request', time.perf_counter() - start)
+                if resp.status == 200:
+                    with ingest_telemetry.stage('decode'):
+                        return json.loads(body)
+                body = body.decode(errors='replace')
+                ingest_telemetry.count(throttled=int(resp.status == 429))
+                if resp.status not in RETRY_STATUS_CODES:
+                    raise DownloadError(f"HTTP {resp.status}: {body[:200]}")
+                error = DownloadError(f"HTTP {resp.status}: {body[:200]}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            ingest_telemetry.observe('request', time.perf_counter() - start)
+            error = e
+
+        if attempt >= max_retries:
+            raise DownloadError(f"Gave up after {attempt + 1} attempts: {error}")
+        stats['retries'] += 1
+        ingest_telemetry.count(retries=1)
+        backoff = retry_wait * (2 ** attempt)
+        await asyncio.sleep(backoff)
+        ingest_telemetry.observe('wait', backoff)
+        attempt += 1
+
+
+async def _fetch_symbol(session, data_url, symbol, params, bucket, stats, max_retries, retry_wait):
+    url = f"{data_url}/v2/stocks/{symbol}/bars"
+    bars, page_token = [], None
+    while True:
+        page_params = dict(params)
+        if page_token:
+            page_params['page_token'] = page_token
+        payload = await _request_json(session, url, page_params, bucket, stats, max_retries, retry_wait)
+        bars.extend(payload.get('bars') or [])
+        page_token = payload.get('next_page_token')
+        if not page_token:
+            return bars
+
+
+async def download_bars_async(tickers, start_date, end_date, on_result=None, timeframe='1Day',
+                              feed=None, adjustment='raw', max_concurrency=8,
+                              requests_per_minute=200, bucket=None, max_retries=3,
+                              retry_wait=1.0, key_id=None, secret_key=None, data_url=None):
+    """
+    Download bars for many tickers concurrently.
+
+    Parameters
+    ----------
+    tickers : list of str
+        Symbols to download.
+    start_date, end_date : str
+        Range in 'YYYY-MM-DD' (or RFC-3339) format, passed through to Alpaca.
+    on_result : callable, optional
+        `on_result(symbol, frame)` is called on the event loop thread as each ticker
+        completes (frame as returned by `bars_to_frame`; empty when no bars exist).
+        If None, frames are collected and returned in the summary under 'frames'.
+    timeframe : str, optional
+        Alpaca timeframe (default: '1Day').
+    feed : str, optional
+        Data feed ('iex' or 'sip'). None uses the account default.
+    adjustment : str, optional
+        Corporate action adjustment (default: 'raw').
+    max_concurrency : int, optional
+        Maximum requests in flight (default: 8).
+    requests_per_minute : int, optional
+        Account quota used to size the token bucket (default: 200, Alpaca's free tier).
+    bucket : TokenBucket, optional
+        Shared bucket; overrides `requests_per_minute` when several jobs share a quota.
+    max_retries : int, optional
+        Retries per HTTP request on 429/5xx/connection errors (default: 3).
+    retry_wait : float, optional
+        Base backoff in seconds, doubled on each retry (default: 1.0).
+    key_id, secret_key : str, optional
+        API credentials. Default to the ones in `credentials/.secrets`.
+    data_url : str, optional
+        Market data base URL. Defaults to `APCA_API_DATA_URL` or Alpaca's data host.
+
+    Returns
+    -------
+    dict
+        'tickers', 'completed', 'empty', 'failed' ({symbol: error}), 'requests',
+        'retries', 'rows', 'seconds' and, without a callback, 'frames'.
+    """
+    if key_id is None or secret_key is None:
+        key_id, secret_key = _default_credentials()
+    data_url = str(data_url or get_data_url()).rstrip('/')
+    bucket = bucket or TokenBucket.per_minute(requests_per_minute, burst=max_concurrency)
+
+    params = {'timeframe': timeframe, 'start': start_date, 'end': end_date,
+              'adjustment': adjustment, 'limit': PAGE_LIMIT}
+    if feed:
+        params['feed'] = feed
+
+    stats = {'tickers': len(tickers), 'completed': 0, 'empty': 0, 'failed': {},
+             'requests': 0, 'retries': 0, 'rows': 0, 'seconds': 0.0}
+    frames = {}
+    start_time = time.time()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    headers = {'APCA-API-KEY-ID': key_id, 'APCA-API-SECRET-KEY': secret_key}
+
+    async def worker(session, symbol):
+        async with semaphore:
+            try:
+                bars = await _fetch_symbol(session, data_url, symbol, params, bucket,
+                                           stats, max_retries, retry_wait)
+            except DownloadError as e:
+                stats['failed'][symbol] = str(e)
+                return
+        with ingest_telemetry.stage('transform'):
+            frame = bars_to_frame(bars)
+        stats['completed'] += 1
+        stats['rows'] += len(frame)
+        if frame.empty:
+            stats['empty'] += 1
+        if on_result is None:
+            frames[symbol] = frame
+        else:
+            on_result(symbol, frame)
+
+    timeout = aiohttp.ClientTimeout(total=60)
+    connector = aiohttp.TCPConnector(limit=max_concurrency)
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as session:
+        await asyncio.gather(*(worker(session, symbol) for symbol in tickers))
+
+    stats['seconds'] = time.time() - start_time
+    if on_result is None:
+        stats['frames'] = frames
+    return stats
+
+
+def _run_sync(coro):
+    """
+    Run `coro` to completion from synchronous code and return its result.
+
+    `asyncio.run` cannot be called while the thread already runs an event loop, as
+    in a Jupyter notebook; the coroutine then runs on its own loop in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def download_bars(tickers, start_date, end_date, on_result=None, **kwargs):
+    """
+    Synchronous wrapper around `download_bars_async`.
+
+    If the calling thread already runs an event loop (e.g. Jupyter), the download
+    runs on a worker thread and `on_result` is called from that thread.
+
+    Examples
+    --------
+    >>> def write(symbol, frame):
+    ...     insert_price_bars(conn, tickers_dict[symbol], frame)
+    >>> summary = download_bars(tickers, '2020-01-01', '2024-12-31', on_result=write,
+    ...                         max_concurrency=16, requests_per_minute=200)
+    >>> print(summary['completed'], summary['failed'])
+    """
+    return _run_sync(download_bars_async(tickers, start_date, end_date, on_result=on_result, **kwargs))
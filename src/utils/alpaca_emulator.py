@@ -0,0 +1,567 @@
+# src/utils/alpaca_emulator.py
+
+"""
+Local emulator of the Alpaca REST endpoints used by the ETL and execution code.
+
+`AlpacaEmulator` serves the trading API (`/v2/assets`, `/v2/orders`,
+`/v2/account`, `/v2/calendar`, `/v2/corporate_actions/announcements`) and the market data API (`/v2/stocks/bars`,
+`/v2/stocks/{symbol}/bars`, `/v2/stocks/bars/latest`, `/v2/stocks/snapshots`)
+from one local aiohttp server running on a background thread. Both the
+`alpaca_trade_api` REST client and `download_bars` work against it unchanged,
+so ETL throughput and concurrency can be benchmarked and regression-tested
+without the network or credentials.
+
+Data is synthetic and deterministic: each symbol gets a seeded random-walk
+daily history on weekdays (no holiday calendar), and minute bars (09:30-16:00 New York time)
+are derived from each day's open, high, low and close. Recorded bars can be
+loaded in place of the synthetic ones with `load_daily_bars`, and corporate
+action announcements are registered with `add_announcement`.
+
+The emulator can also misbehave on purpose:
+
+- `rate_limit=(requests, seconds)` answers 429 once the window is exhausted,
+  with the `X-RateLimit-Limit/Remaining/Reset` headers Alpaca sends;
+- `latency` (plus random `jitter`) delays every response;
+- `error_rate` fails a random share of requests with 500/503, and `fail_next`
+  queues specific failures for a path.
+
+Examples
+--------
+>>> with AlpacaEmulator(n_symbols=50, latency=0.02) as emulator:
+...     client = emulator.client()
+...     bars = fetch_alpaca_bars_batched(client, emulator.symbols, '1Day', '2024-01-01', '2024-06-30')
+...     print(emulator.stats['requests'])
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+EXCHANGE_TIMEZONE = 'America/New_York'
+SUPPORTED_TIMEFRAMES = ('1Day', '1Min')
+MINUTES_PER_SESSION = 390
+DEFAULT_PAGE_LIMIT = 1000
+MAX_PAGE_LIMIT = 10000
+
+
+def _symbols(n):
+    """First `n` upper-case alphabetic tickers: AAA, AAB, ..."""
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    return [''.join(chars) for chars in itertools.islice(itertools.product(letters, repeat=3), n)]
+
+
+def _parse_bound(value, end=False):
+    """Parse a 'YYYY-MM-DD' or RFC-3339 bound to UTC; a date-only `end` covers the whole day."""
+    if value is None:
+        return None
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(EXCHANGE_TIMEZONE)
+        if end and len(str(value)) == 10:
+            stamp += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return stamp.tz_convert('UTC')
+
+
+def _iso(stamps):
+    return np.asarray(stamps.strftime('%Y-%m-%dT%H:%M:%SZ'), dtype=object)
+
+
+class AlpacaEmulator:
+    """
+    In-process Alpaca REST server backed by synthetic or recorded bars.
+
+    Parameters
+    ----------
+    symbols : list of str, optional
+        Tradable symbols. Defaults to the first `n_symbols` of AAA, AAB, ...
+    n_symbols : int, optional
+        Universe size when `symbols` is None (default: 100).
+    start_date, end_date : str, optional
+        Range of the synthetic daily history (default: '2020-01-01' to yesterday).
+    key_id, secret_key : str, optional
+        Credentials the emulator accepts (default: 'key' / 'secret'). Others get 403.
+    rate_limit : tuple of (int, float), optional
+        (requests, seconds) allowed per sliding window; None disables throttling.
+    latency : float, optional
+        Seconds added to every response (default: 0).
+    jitter : float, optional
+        Extra uniformly random delay, up to this many seconds (default: 0).
+    error_rate : float, optional
+        Share of requests that fail with a random 500/503 (default: 0).
+    seed : int, optional
+        Seed for the synthetic data and injected faults (default: 0).
+    """
+
+    def __init__(self, symbols=None, n_symbols=100, start_date='2020-01-01', end_date=None,
+                 key_id='key', secret_key='secret', rate_limit=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=0):
+        self.symbols = sorted(symbols) if symbols is not None else _symbols(n_symbols)
+        self.start_date = start_date
+        self.end_date = end_date or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.key_id = key_id
+        self.secret_key = secret_key
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+
+        self.assets = {symbol: self._asset(i, symbol) for i, symbol in enumerate(self.symbols)}
+        self.orders = {}
+        self.announcements = []
+        self.stats = {'requests': 0, 'throttled': 0, 'errors_injected': 0, 'by_endpoint': {}}
+        self._daily = {}
+        self._recent = deque()
+        self._failures = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._runner = None
+        self._saved_env = None
+        self.url = None
+
+    # ------------------------------------------------------------------ data
+
+    def _asset(self, i, symbol):
+        return {
+            'id': str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{symbol}.emulator")),
+            'class': 'us_equity',
+            'exchange': ('NASDAQ', 'NYSE', 'AMEX')[i % 3],
+            'symbol': symbol,
+            'name': f"{symbol} Emulated Corp",
+            'status': 'active',
+            'tradable': True,
+            'marginable': True,
+            'shortable': True,
+            'easy_to_borrow': True,
+            'fractionable': True,
+        }
+
+    def load_daily_bars(self, symbol, bars):
+        """
+        Serve recorded daily bars for `symbol` instead of synthetic ones.
+
+        Parameters
+        ----------
+        bars : pd.DataFrame
+            Columns 'date', 'open', 'high', 'low', 'close' and optionally 'volume',
+            'trade_count' and 'vwap'.
+        """
+        frame = bars.sort_values('date').reset_index(drop=True)
+        for column, default in (('volume', 0), ('trade_count', 0), ('vwap', np.nan)):
+            if column not in frame:
+                frame[column] = default
+        frame['vwap'] = frame['vwap'].fillna((frame['high'] + frame['low'] + frame['close']) / 3)
+        frame['timestamp'] = pd.DatetimeIndex(pd.to_datetime(frame['date'])).tz_localize(EXCHANGE_TIMEZONE).tz_convert('UTC')
+        self._daily[symbol] = frame
+        if symbol not in self.assets:
+            self.assets[symbol] = self._asset(len(self.assets), symbol)
+            self.symbols = sorted(self.assets)
+
+    def daily_bars(self, symbol):
+        """Full daily history for `symbol` (synthetic unless recorded bars were loaded)."""
+        if symbol not in self._daily:
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            dates = pd.bdate_range(self.start_date, self.end_date)
+            n = len(dates)
+            close = rng.uniform(10, 200) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+            open_ = np.concatenate([[close[0]], close[:-1]]) * np.exp(rng.normal(0, 0.005, n))
+            high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+            low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+            self._daily[symbol] = pd.DataFrame({
+                'timestamp': dates.tz_localize(EXCHANGE_TIMEZONE).tz_convert('UTC'),
+                'date': dates.strftime('%Y-%m-%d'),
+                'open': open_.round(4), 'high': high.round(4), 'low': low.round(4), 'close': close.round(4),
+                'volume': rng.integers(1_000, 5_000_000, n),
+                'trade_count': rng.integers(10, 50_000, n),
+                'vwap': ((high + low + close) / 3).round(4),
+            })
+        return self._daily[symbol]
+
+    def minute_bars(self, symbol, daily):
+        """Minute bars for the sessions in `daily`, each path running from open to close within [low, high]."""
+        n_days = len(daily)
+        if n_days == 0:
+            return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap'])
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), 1])
+        step = np.linspace(0, 1, MINUTES_PER_SESSION + 1)
+        o, h, l, c = (daily[k].to_numpy(dtype=float)[:, None] for k in ('open', 'high', 'low', 'close'))
+        path = o + (c - o) * step + rng.normal(0, 0.002, (n_days, MINUTES_PER_SESSION + 1)) * o
+        path[:, 0], path[:, -1] = o[:, 0], c[:, 0]
+        path = np.clip(path, l, h)
+        bar_open, bar_close = path[:, :-1], path[:, 1:]
+        session_open = (pd.DatetimeIndex(pd.to_datetime(daily['date'])) + pd.Timedelta(hours=9, minutes=30))
+        session_open = session_open.tz_localize(EXCHANGE_TIMEZONE).tz_convert('UTC').tz_localize(None)
+        stamps = (session_open.to_numpy()[:, None] + np.arange(MINUTES_PER_SESSION) * np.timedelta64(1, 'm')).ravel()
+        volume = np.maximum(daily['volume'].to_numpy()[:, None] // MINUTES_PER_SESSION, 1) * np.ones((1, MINUTES_PER_SESSION), dtype=np.int64)
+        return pd.DataFrame({
+            'timestamp': pd.DatetimeIndex(stamps).tz_localize('UTC'),
+            'open': bar_open.ravel().round(4),
+            'high': np.maximum(bar_open, bar_close).ravel().round(4),
+            'low': np.minimum(bar_open, bar_close).ravel().round(4),
+            'close': bar_close.ravel().round(4),
+            'volume': volume.ravel(),
+            'trade_count': np.maximum(volume.ravel() // 100, 1),
+            'vwap': ((bar_open + bar_close) / 2).ravel().round(4),
+        })
+
+    def _bars(self, symbol, timeframe, start, end):
+        daily = self.daily_bars(symbol)
+        if timeframe == '1Day':
+            frame = daily
+        else:
+            # Only sessions that can overlap the window are expanded to minutes
+            days = daily
+            if start is not None:
+                days = days[days['date'] >= start.tz_convert(EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')]
+            if end is not None:
+                days = days[days['date'] <= end.tz_convert(EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')]
+            frame = self.minute_bars(symbol, days)
+        mask = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            mask &= (frame['timestamp'] >= start).to_numpy()
+        if end is not None:
+            mask &= (frame['timestamp'] <= end).to_numpy()
+        return frame[mask]
+
+    @staticmethod
+    def _bar_dicts(frame):
+        return [
+            {'t': t, 'o': o, 'h': h, 'l': l, 'c': c, 'v': int(v), 'n': int(n), 'vw': vw}
+            for t, o, h, l, c, v, n, vw in zip(
+                _iso(pd.DatetimeIndex(frame['timestamp'])),
+                frame['open'], frame['high'], frame['low'], frame['close'],
+                frame['volume'], frame['trade_count'], frame['vwap'],
+            )
+        ]
+
+    # ------------------------------------------------------------ middleware
+
+    def fail_next(self, count=1, status=500, path=None):
+        """Fail the next `count` requests (optionally only those whose path contains `path`)."""
+        with self._lock:
+            self._failures.extend([(path, status)] * count)
+
+    def _take_failure(self, path):
+        with self._lock:
+            for i, (match, status) in enumerate(self._failures):
+                if match is None or match in path:
+                    del self._failures[i]
+                    return status
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._random.choice((500, 503))
+        return None
+
+    def _rate_headers(self):
+        """Apply the sliding-window limit; returns (allowed, headers)."""
+        if self.rate_limit is None:
+            return True, {}
+        limit, window = self.rate_limit
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= window:
+                self._recent.popleft()
+            allowed = len(self._recent) < limit
+            if allowed:
+                self._recent.append(now)
+            reset_in = window - (now - self._recent[0]) if self._recent else 0
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(max(limit - len(self._recent), 0)),
+            'X-RateLimit-Reset': str(int(time.time() + reset_in + 1)),
+        }
+        return allowed, headers
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        endpoint = f"{request.method} {route}"
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if (request.headers.get('APCA-API-KEY-ID') != self.key_id
+                or request.headers.get('APCA-API-SECRET-KEY') != self.secret_key):
+            return web.json_response({'code': 40110000, 'message': 'request is not authorized'}, status=403)
+
+        allowed, headers = self._rate_headers()
+        if not allowed:
+            with self._lock:
+                self.stats['throttled'] += 1
+            return web.json_response({'code': 42910000, 'message': 'too many requests'}, status=429, headers=headers)
+
+        status = self._take_failure(request.path)
+        if status is not None:
+            with self._lock:
+                self.stats['errors_injected'] += 1
+            return web.json_response({'code': status * 100000, 'message': 'injected error'}, status=status, headers=headers)
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # ------------------------------------------------------- data endpoints
+
+    def _bar_params(self, request):
+        timeframe = request.query.get('timeframe', '1Day')
+        if timeframe not in SUPPORTED_TIMEFRAMES:
+            raise web.HTTPUnprocessableEntity(text='{"message": "unsupported timeframe"}', content_type='application/json')
+        limit = min(int(request.query.get('limit') or DEFAULT_PAGE_LIMIT), MAX_PAGE_LIMIT)
+        offset = int(request.query.get('page_token') or 0)
+        start = _parse_bound(request.query.get('start'))
+        end = _parse_bound(request.query.get('end'), end=True)
+        return timeframe, start, end, limit, offset
+
+    async def _single_bars(self, request):
+        symbol = request.match_info['symbol']
+        timeframe, start, end, limit, offset = self._bar_params(request)
+        frame = self._bars(symbol, timeframe, start, end) if symbol in self.assets else self._bars_empty()
+        page = frame.iloc[offset:offset + limit]
+        next_token = str(offset + limit) if offset + limit < len(frame) else None
+        return web.json_response({'bars': self._bar_dicts(page) or None, 'symbol': symbol, 'next_page_token': next_token})
+
+    async def _multi_bars(self, request):
+        timeframe, start, end, limit, offset = self._bar_params(request)
+        symbols = sorted({s for s in request.query.get('symbols', '').split(',') if s in self.assets})
+        # A page is the slice [offset, offset + limit) of the (symbol, time)-ordered result
+        bars, position = {}, 0
+        for symbol in symbols:
+            frame = self._bars(symbol, timeframe, start, end)
+            lo = max(offset, position) - position
+            hi = min(offset + limit, position + len(frame)) - position
+            if hi > lo:
+                bars[symbol] = self._bar_dicts(frame.iloc[lo:hi])
+            position += len(frame)
+        next_token = str(offset + limit) if offset + limit < position else None
+        return web.json_response({'bars': bars, 'next_page_token': next_token})
+
+    @staticmethod
+    def _bars_empty():
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap'])
+
+    async def _latest_bars(self, request):
+        symbols = [s for s in request.query.get('symbols', '').split(',') if s in self.assets]
+        latest = {}
+        for symbol in symbols:
+            daily = self.daily_bars(symbol)
+            if len(daily):
+                minutes = self.minute_bars(symbol, daily.iloc[-1:])
+                latest[symbol] = self._bar_dicts(minutes.iloc[-1:])[0]
+        return web.json_response({'bars': latest})
+
+    async def _snapshots(self, request):
+        symbols = [s for s in request.query.get('symbols', '').split(',') if s in self.assets]
+        snapshots = {}
+        for symbol in symbols:
+            daily = self.daily_bars(symbol)
+            if not len(daily):
+                snapshots[symbol] = None
+                continue
+            last_minute = self._bar_dicts(self.minute_bars(symbol, daily.iloc[-1:]).iloc[-1:])[0]
+            daily_bars = self._bar_dicts(daily.iloc[-2:])
+            snapshots[symbol] = {
+                'latestTrade': {'t': last_minute['t'], 'p': last_minute['c'], 's': 100, 'x': 'V'},
+                'minuteBar': last_minute,
+                'dailyBar': daily_bars[-1],
+                'prevDailyBar': daily_bars[0] if len(daily_bars) > 1 else None,
+            }
+        return web.json_response(snapshots)
+
+    # ---------------------------------------------------- trading endpoints
+
+    async def _list_assets(self, request):
+        status = request.query.get('status')
+        assets = [a for a in self.assets.values() if status is None or a['status'] == status]
+        return web.json_response(assets)
+
+    async def _account(self, request):
+        return web.json_response({
+            'id': str(uuid.uuid5(uuid.NAMESPACE_DNS, 'account.emulator')), 'status': 'ACTIVE',
+            'currency': 'USD', 'cash': '100000', 'buying_power': '200000', 'equity': '100000',
+        })
+
+    def add_announcement(self, ca_type, symbol, ex_date, declaration_date=None, ca_sub_type=None,
+                         cash=0, old_rate=1, new_rate=1, target_symbol=None, **fields):
+        """Register a corporate action announcement; returns it as served."""
+        announcement = {
+            'id': str(uuid.uuid4()), 'corporate_action_id': f'{symbol}{ex_date}', 'ca_type': ca_type,
+            'ca_sub_type': ca_sub_type or {'dividend': 'cash', 'split': 'forward_split'}.get(ca_type, ca_type),
+            'initiating_symbol': symbol, 'target_symbol': target_symbol or symbol,
+            'declaration_date': declaration_date or ex_date, 'ex_date': ex_date,
+            'record_date': ex_date, 'payable_date': ex_date,
+            'cash': str(cash), 'old_rate': str(old_rate), 'new_rate': str(new_rate),
+        }
+        announcement.update(fields)
+        self.announcements.append(announcement)
+        return announcement
+
+    async def _announcements(self, request):
+        query = request.query
+        try:
+            since = datetime.strptime(query['since'], '%Y-%m-%d')
+            until = datetime.strptime(query['until'], '%Y-%m-%d')
+            ca_types = query['ca_types'].split(',')
+        except (KeyError, ValueError):
+            return web.json_response({'code': 42210000, 'message': 'ca_types, since and until are required'}, status=422)
+        if (until - since).days > 90:
+            return web.json_response({'code': 42210000, 'message': 'date range is limited to 90 days'}, status=422)
+        date_type = query.get('date_type', 'declaration_date')
+        symbol = query.get('symbol')
+        found = [a for a in self.announcements
+                 if a['ca_type'] in ca_types and query['since'] <= a[date_type] <= query['until']
+                 and (symbol is None or symbol in (a['initiating_symbol'], a['target_symbol']))]
+        return web.json_response(found)
+
+    async def _calendar(self, request):
+        start = request.query.get('start', self.start_date)
+        end = request.query.get('end', self.end_date)
+        dates = pd.bdate_range(start, end).strftime('%Y-%m-%d')
+        return web.json_response([{'date': d, 'open': '09:30', 'close': '16:00'} for d in dates])
+
+    async def _submit_order(self, request):
+        body = await request.json()
+        symbol = body.get('symbol')
+        if symbol not in self.assets:
+            return web.json_response({'code': 40010001, 'message': f'asset "{symbol}" not found'}, status=422)
+        if body.get('side') not in ('buy', 'sell') or float(body.get('qty') or body.get('notional') or 0) <= 0:
+            return web.json_response({'code': 40010001, 'message': 'invalid order'}, status=422)
+
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        order = {
+            'id': str(uuid.uuid4()),
+            'client_order_id': body.get('client_order_id') or str(uuid.uuid4()),
+            'symbol': symbol,
+            'asset_class': 'us_equity',
+            'qty': str(body.get('qty')) if body.get('qty') is not None else None,
+            'notional': body.get('notional'),
+            'side': body['side'],
+            'type': body.get('type', 'market'),
+            'time_in_force': body.get('time_in_force', 'day'),
+            'limit_price': body.get('limit_price'),
+            'stop_price': body.get('stop_price'),
+            'status': 'new',
+            'created_at': now,
+            'submitted_at': now,
+            'filled_at': None,
+            'filled_qty': '0',
+            'filled_avg_price': None,
+        }
+        if order['type'] == 'market':
+            price = float(self.daily_bars(symbol)['close'].iloc[-1])
+            order.update(status='filled', filled_at=now, filled_qty=order['qty'], filled_avg_price=str(price))
+        with self._lock:
+            self.orders[order['id']] = order
+        return web.json_response(order)
+
+    async def _list_orders(self, request):
+        status = request.query.get('status', 'open')
+        limit = int(request.query.get('limit') or 50)
+        open_statuses = ('new', 'accepted', 'partially_filled')
+        orders = [o for o in self.orders.values()
+                  if status == 'all' or (o['status'] in open_statuses) == (status == 'open')]
+        orders.sort(key=lambda o: o['submitted_at'], reverse=request.query.get('direction', 'desc') == 'desc')
+        return web.json_response(orders[:limit])
+
+    async def _get_order(self, request):
+        order = self.orders.get(request.match_info['order_id'])
+        if order is None:
+            return web.json_response({'code': 40410000, 'message': 'order not found'}, status=404)
+        return web.json_response(order)
+
+    async def _cancel_order(self, request):
+        order = self.orders.get(request.match_info['order_id'])
+        if order is None:
+            return web.json_response({'code': 40410000, 'message': 'order not found'}, status=404)
+        if order['status'] not in ('new', 'accepted', 'partially_filled'):
+            return web.json_response({'code': 42210000, 'message': 'order is not cancelable'}, status=422)
+        order['status'] = 'canceled'
+        return web.Response(status=204)
+
+    async def _cancel_all_orders(self, request):
+        canceled = []
+        for order in self.orders.values():
+            if order['status'] in ('new', 'accepted', 'partially_filled'):
+                order['status'] = 'canceled'
+                canceled.append({'id': order['id'], 'status': 200})
+        return web.json_response(canceled, status=207)
+
+    # -------------------------------------------------------------- serving
+
+    def _app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/v2/assets', self._list_assets)
+        app.router.add_get('/v2/account', self._account)
+        app.router.add_get('/v2/calendar', self._calendar)
+        app.router.add_get('/v2/corporate_actions/announcements', self._announcements)
+        app.router.add_post('/v2/orders', self._submit_order)
+        app.router.add_get('/v2/orders', self._list_orders)
+        app.router.add_delete('/v2/orders', self._cancel_all_orders)
+        app.router.add_get('/v2/orders/{order_id}', self._get_order)
+        app.router.add_delete('/v2/orders/{order_id}', self._cancel_order)
+        app.router.add_get('/v2/stocks/bars/latest', self._latest_bars)
+        app.router.add_get('/v2/stocks/snapshots', self._snapshots)
+        app.router.add_get('/v2/stocks/bars', self._multi_bars)
+        app.router.add_get('/v2/stocks/{symbol}/bars', self._single_bars)
+        return app
+
+    def start(self):
+        """Start serving on a free local port and point `APCA_API_DATA_URL` at it."""
+        started = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self._app())
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, '127.0.0.1', 0)
+            self._loop.run_until_complete(site.start())
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}"
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name='alpaca-emulator', daemon=True)
+        self._thread.start()
+        started.wait()
+        self._saved_env = os.environ.get('APCA_API_DATA_URL')
+        os.environ['APCA_API_DATA_URL'] = self.url
+        return self
+
+    def stop(self):
+        """Shut the server down and restore `APCA_API_DATA_URL`."""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        if self._saved_env is None:
+            os.environ.pop('APCA_API_DATA_URL', None)
+        else:
+            os.environ['APCA_API_DATA_URL'] = self._saved_env
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def client(self, **kwargs):
+        """An `alpaca_trade_api` REST client pointed at the emulator."""
+        from alpaca_trade_api.rest import REST
+        return REST(self.key_id, self.secret_key, base_url=self.url, **kwargs)
@@ -0,0 +1,695 @@
+# src/utils/alpaca_stream.py
+
+"""
+Streaming ingestion of live minute bars from Alpaca's market data websocket.
+
+`BarStream` connects to `wss://stream.data.alpaca.markets/v2/{feed}`,
+authenticates, subscribes to minute bars (and late corrections, 'updatedBars')
+for a set of symbols and then:
+
+- decodes each message straight into NumPy ring buffers (`RollingBars`), so the
+  latest `window` bars per symbol are always in memory without building a
+  DataFrame per bar;
+- queues rows for the `asset_prices_intraday` table in 'assets.db' and writes
+  them with one `executemany` per batch, when `flush_rows` rows are pending or
+  `flush_interval` seconds have passed, and once more on shutdown;
+- reconnects with exponential backoff if the socket drops.
+
+With `aggregate_daily=True` the stream also folds every regular-session bar
+into a running daily bar per symbol (`DailyBarAggregator`). Once the session
+close (plus `close_grace` seconds for late corrections) has passed, the daily
+bars are written to `asset_prices` in one transaction with the next flush, and
+the aggregator rolls over to the next session. Only complete bars are written:
+the symbol's first bar is the opening minute and the stream was connected for
+the whole session. Symbols that joined late or lived through a reconnect are
+left to the post-close `update_daily_prices` run, which finds the others up to
+date and requests nothing for them. Daily aggregation needs the 'sip' feed,
+since IEX bars only carry IEX's share of volume and trades.
+
+Functions
+---------
+fetch_stream_symbols(watchlist=None)
+    Symbols currently held in `asset_holdings` plus an optional watchlist.
+
+stream_minute_bars(symbols=None, watchlist=None, duration=None, **kwargs)
+    Synchronous entry point; streams until `duration` elapses or the stream stops.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import aiohttp
+import numpy as np
+import pandas as pd
+from alpaca_trade_api.common import get_data_stream_url
+
+from src.utils.db_utils import get_db_connection, fetch_active_tickers, ensure_schema
+from src.utils.alpaca_async import _default_credentials, _run_sync
+from src.utils.market_calendar import session_bounds, EXCHANGE_TIMEZONE
+from src.utils.price_store import insert_price_bars
+
+ROLLING_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']
+_MESSAGE_KEYS = ('o', 'h', 'l', 'c', 'v', 'n', 'vw')
+BAR_MESSAGE_TYPES = ('b', 'u')  # minute bars and corrected ('updated') bars
+DAILY_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']
+DAILY_FEEDS = ('sip',)  # feeds whose volume, trade count and VWAP cover the consolidated tape
+
+
+def _utcnow():
+    return pd.Timestamp.now(tz='UTC')
+
+
+def _as_datetime64(timestamp):
+    """tz-aware timestamp as a naive UTC np.datetime64[s]."""
+    return np.datetime64(pd.Timestamp(timestamp).tz_convert('UTC').tz_localize(None), 's')
+
+
+class StreamError(Exception):
+    """Raised when the stream rejects authentication or a subscription."""
+
+
+class RollingBars:
+    """
+    Fixed-size ring buffer of the latest bars for each symbol.
+
+    Updates are O(1): one row write into a preallocated array. Buffers grow only
+    when a symbol not seen before arrives.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Symbols to preallocate.
+    window : int, optional
+        Bars kept per symbol (default: 390, one regular session of minute bars).
+    """
+
+    def __init__(self, symbols, window=390):
+        self.window = window
+        self._index = {symbol: i for i, symbol in enumerate(symbols)}
+        self._values = np.full((len(self._index), window, len(ROLLING_FIELDS)), np.nan)
+        self._times = np.zeros((len(self._index), window), dtype='datetime64[s]')
+        self._count = np.zeros(len(self._index), dtype=np.int64)
+
+    def _row(self, symbol):
+        row = self._index.get(symbol)
+        if row is None:
+            row = self._index[symbol] = len(self._index)
+            self._values = np.concatenate([self._values, np.full((1, self.window, len(ROLLING_FIELDS)), np.nan)])
+            self._times = np.concatenate([self._times, np.zeros((1, self.window), dtype='datetime64[s]')])
+            self._count = np.append(self._count, 0)
+        return row
+
+    def update(self, symbol, timestamp, values):
+        """
+        Record one bar. A bar with the same timestamp as the latest one replaces it.
+
+        Parameters
+        ----------
+        symbol : str
+        timestamp : np.datetime64
+            Bar start time (UTC).
+        values : sequence of float
+            Values in `ROLLING_FIELDS` order.
+        """
+        row = self._row(symbol)
+        count = self._count[row]
+        if count and self._times[row, (count - 1) % self.window] == timestamp:
+            slot = (count - 1) % self.window
+        else:
+            slot = count % self.window
+            self._count[row] = count + 1
+        self._times[row, slot] = timestamp
+        self._values[row, slot] = values
+
+    def get(self, symbol, timestamp):
+        """Values of the bar held for `symbol` at `timestamp` (in `ROLLING_FIELDS` order), or None."""
+        row = self._index.get(symbol)
+        if row is None:
+            return None
+        count = int(self._count[row])
+        slots = np.arange(max(count - self.window, 0), count) % self.window
+        match = slots[self._times[row, slots] == timestamp]
+        return self._values[row, match[-1]].copy() if len(match) else None
+
+    def latest(self, symbol):
+        """Most recent bar for `symbol` as a dict, or None if none has arrived."""
+        row = self._index.get(symbol)
+        if row is None or self._count[row] == 0:
+            return None
+        slot = (self._count[row] - 1) % self.window
+        return {'timestamp': pd.Timestamp(self._times[row, slot], tz='UTC'),
+                **dict(zip(ROLLING_FIELDS, self._values[row, slot]))}
+
+    def frame(self, symbol):
+        """Bars held for `symbol`, oldest first, as a DataFrame indexed by UTC timestamp."""
+        row = self._index.get(symbol)
+        count = 0 if row is None else int(self._count[row])
+        if count == 0:
+            return pd.DataFrame(columns=ROLLING_FIELDS, index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+        order = np.arange(max(count - self.window, 0), count) % self.window
+        index = pd.DatetimeIndex(self._times[row, order], name='timestamp').tz_localize('UTC')
+        return pd.DataFrame(self._values[row, order], columns=ROLLING_FIELDS, index=index)
+
+
+class DailyBarAggregator:
+    """
+    Running daily OHLCV and VWAP per symbol, built from one session's minute bars.
+
+    State is kept in flat NumPy arrays with one slot per symbol, and each bar is an
+    O(1) update. The latest minute of each symbol is held apart from the running
+    totals of the earlier minutes, so a correction of that minute ('updatedBars')
+    replaces it exactly. A correction of an earlier minute adjusts the additive
+    totals by its difference to the `previous` values and widens high/low.
+    Bars outside the session (pre-market, after-hours) are ignored.
+
+    A symbol's bar is complete when its first bar is the opening minute and no
+    gap in coverage (`mark_gap`) overlaps the session.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Symbols to preallocate.
+    session : tuple of pd.Timestamp
+        (open, close) of the session, as returned by `session_bounds`.
+
+    Examples
+    --------
+    >>> daily = DailyBarAggregator(['AAPL'], session_bounds('2024-01-02'))
+    >>> daily.update('AAPL', np.datetime64('2024-01-02T14:30:00', 's'), [185.0, 185.5, 184.9, 185.2, 1200, 12, 185.1])
+    >>> daily.finalize()
+    """
+
+    def __init__(self, symbols, session):
+        self._index = {}
+        self._first = np.zeros(0, dtype='datetime64[s]')
+        self._last = np.zeros(0, dtype='datetime64[s]')
+        self._open = np.zeros(0)
+        # Totals of every minute before the latest one: high, low, volume, notional, trade_count
+        self._totals = np.zeros((0, 5))
+        # Latest minute in ROLLING_FIELDS order
+        self._latest = np.zeros((0, len(ROLLING_FIELDS)))
+        self._minutes = np.zeros(0, dtype=np.int64)
+        self._gapped = np.zeros(0, dtype=bool)
+        self.reset(session)
+        for symbol in symbols:
+            self._slot(symbol)
+
+    def reset(self, session):
+        """Start a new session; every symbol's running bar is cleared."""
+        self.session = session
+        self.date = pd.Timestamp(session[0]).tz_convert(EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')
+        self._session_open, self._session_close = (_as_datetime64(t) for t in session)
+        self._minutes[:] = 0
+        self._gapped[:] = False
+        self._session_gapped = False
+        self.finalized = False
+
+    def _slot(self, symbol):
+        slot = self._index.get(symbol)
+        if slot is None:
+            slot = self._index[symbol] = len(self._index)
+            self._first = np.append(self._first, np.datetime64(0, 's'))
+            self._last = np.append(self._last, np.datetime64(0, 's'))
+            self._open = np.append(self._open, np.nan)
+            self._totals = np.concatenate([self._totals, np.zeros((1, 5))])
+            self._latest = np.concatenate([self._latest, np.zeros((1, len(ROLLING_FIELDS)))])
+            self._minutes = np.append(self._minutes, 0)
+            self._gapped = np.append(self._gapped, self._session_gapped)
+        return slot
+
+    @staticmethod
+    def _additive(values):
+        # volume, notional (volume x VWAP, close when VWAP is missing) and trade count of one bar
+        volume = np.nan_to_num(values[4])
+        vwap = values[6] if not np.isnan(values[6]) else values[3]
+        return volume, volume * vwap, np.nan_to_num(values[5])
+
+    def update(self, symbol, timestamp, values, previous=None):
+        """
+        Fold one minute bar into the symbol's daily bar.
+
+        Parameters
+        ----------
+        symbol : str
+        timestamp : np.datetime64
+            Bar start time (UTC).
+        values : sequence of float
+            Values in `ROLLING_FIELDS` order.
+        previous : sequence of float, optional
+            Values this bar replaces, for corrections of an earlier minute.
+
+        Returns
+        -------
+        bool
+            False if the bar was ignored (outside the session or after `finalize`).
+        """
+        if self.finalized or not self._session_open <= timestamp < self._session_close:
+            return False
+        slot = self._slot(symbol)
+        values = np.asarray(values, dtype=np.float64)
+        totals = self._totals[slot]
+
+        if self._minutes[slot] == 0:
+            self._first[slot] = self._last[slot] = timestamp
+            self._open[slot] = values[0]
+            totals[:] = (-np.inf, np.inf, 0.0, 0.0, 0.0)
+            self._latest[slot] = values
+            self._minutes[slot] = 1
+            return True
+
+        if timestamp == self._last[slot]:
+            self._latest[slot] = values
+        elif timestamp > self._last[slot]:
+            latest = self._latest[slot]
+            totals[0] = max(totals[0], latest[1])
+            totals[1] = min(totals[1], latest[2])
+            totals[2:] += self._additive(latest)
+            self._latest[slot] = values
+            self._last[slot] = timestamp
+            self._minutes[slot] += 1
+        else:
+            # Late bar for an earlier minute: a correction if `previous` is known, else a new minute
+            totals[0] = max(totals[0], values[1])
+            totals[1] = min(totals[1], values[2])
+            totals[2:] += self._additive(values)
+            if previous is not None:
+                totals[2:] -= self._additive(np.asarray(previous, dtype=np.float64))
+            else:
+                self._minutes[slot] += 1
+        if timestamp < self._first[slot]:
+            self._first[slot] = timestamp
+            self._open[slot] = values[0]
+        elif timestamp == self._first[slot]:
+            self._open[slot] = values[0]
+        return True
+
+    def mark_gap(self, start, end=None):
+        """
+        Record a stretch without stream coverage, e.g. from a disconnect to the resubscription.
+
+        If it overlaps the session, no symbol's bar is complete.
+
+        Parameters
+        ----------
+        start : pd.Timestamp
+            Start of the gap (tz-aware).
+        end : pd.Timestamp, optional
+            End of the gap (tz-aware). Defaults to the session close.
+        """
+        end = self._session_close if end is None else _as_datetime64(end)
+        if _as_datetime64(start) < self._session_close and end > self._session_open:
+            self._gapped[:] = True
+            self._session_gapped = True
+
+    def is_due(self, now=None, grace=0.0):
+        """True once `grace` seconds have passed since the session close."""
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        return not self.finalized and now >= pd.Timestamp(self.session[1]) + pd.Timedelta(seconds=grace)
+
+    def frame(self):
+        """
+        Current daily bar of every symbol with at least one bar this session.
+
+        Columns are 'symbol', 'date', `DAILY_FIELDS`, 'minutes' (bars folded in) and
+        'complete' (first bar at the open and no gap in coverage).
+        """
+        symbols = np.array(list(self._index), dtype=object)
+        active = self._minutes > 0
+        latest, totals = self._latest[active], self._totals[active]
+        volume = totals[:, 2] + np.nan_to_num(latest[:, 4])
+        latest_vwap = np.where(np.isnan(latest[:, 6]), latest[:, 3], latest[:, 6])
+        notional = totals[:, 3] + np.nan_to_num(latest[:, 4]) * latest_vwap
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = np.where(volume > 0, notional / volume, latest[:, 3])
+        return pd.DataFrame({
+            'symbol': symbols[active],
+            'date': self.date,
+            'open': self._open[active],
+            'high': np.maximum(totals[:, 0], latest[:, 1]),
+            'low': np.minimum(totals[:, 1], latest[:, 2]),
+            'close': latest[:, 3],
+            'volume': volume,
+            'trade_count': totals[:, 4] + np.nan_to_num(latest[:, 5]),
+            'vwap': vwap,
+            'minutes': self._minutes[active],
+            'complete': (self._first[active] == self._session_open) & ~self._gapped[active],
+        })
+
+    def finalize(self):
+        """Close the session: later bars are ignored. Returns the final `frame()`."""
+        self.finalized = True
+        return self.frame()
+
+    def write(self, conn, asset_ids, bars=None, fetched_at=None):
+        """
+        Insert complete daily bars into `asset_prices` through `insert_price_bars`. The caller commits.
+
+        Parameters
+        ----------
+        conn : sqlite3.Connection
+            Open connection to 'assets.db'.
+        asset_ids : dict
+            {symbol: asset_id}. Symbols without an asset_id are skipped.
+        bars : pd.DataFrame, optional
+            Output of `finalize()` (default: the current `frame()`).
+        fetched_at : str, optional
+            Fetch timestamp ('YYYY-MM-DD HH:MM:SS'). Defaults to now.
+
+        Returns
+        -------
+        int
+            Rows inserted; dates already stored and incomplete bars are left untouched.
+        """
+        bars = self.frame() if bars is None else bars
+        bars = bars[bars['complete']]
+        written = 0
+        for symbol, bar in bars.groupby('symbol', sort=False):
+            asset_id = asset_ids.get(symbol)
+            if asset_id is not None:
+                written += insert_price_bars(conn, asset_id, bar[['date', *DAILY_FIELDS]], fetched_at=fetched_at)
+        return written
+
+
+class BarStream:
+    """
+    Asyncio client for Alpaca's market data websocket that persists minute bars in batches.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Symbols to subscribe to.
+    key_id, secret_key : str, optional
+        API credentials. Default to the ones in `credentials/.secrets`.
+    feed : str, optional
+        Data feed, 'iex' or 'sip' (default: 'iex'). Daily aggregation requires 'sip'.
+    url : str, optional
+        Full websocket URL. Defaults to `APCA_API_STREAM_URL` (or Alpaca's) + '/v2/{feed}'.
+    window : int, optional
+        Bars kept in memory per symbol (default: 390).
+    flush_rows : int, optional
+        Write once this many rows are pending (default: 500).
+    flush_interval : float, optional
+        Write pending rows at least this often, in seconds (default: 5.0).
+    conn : sqlite3.Connection, optional
+        Connection to 'assets.db'. If None, one is opened for the stream and closed after.
+    asset_ids : dict, optional
+        {symbol: asset_id} used for persistence. Defaults to `fetch_active_tickers()`.
+        Bars for symbols without an asset_id are kept in memory only.
+    on_bar : callable, optional
+        Called as `on_bar(symbol, bar_dict)` for every decoded bar.
+    max_reconnects : int, optional
+        Reconnect attempts after the socket drops before giving up (default: 5).
+    reconnect_wait : float, optional
+        Base reconnect delay in seconds, doubled per attempt (default: 1.0).
+    aggregate_daily : bool, optional
+        Build daily bars from the stream and write the complete ones to `asset_prices`
+        after each session close (default: False).
+    session : tuple of pd.Timestamp, optional
+        (open, close) of the first session to aggregate. Defaults to today's `session_bounds`.
+    close_grace : float, optional
+        Seconds after the close to wait for the last bars and corrections before
+        the daily bars are written (default: 120.0).
+
+    Examples
+    --------
+    >>> stream = BarStream(['AAPL', 'MSFT'])
+    >>> asyncio.run(stream.run(duration=60))
+    >>> stream.bars.latest('AAPL')['close']
+    """
+
+    def __init__(self, symbols, key_id=None, secret_key=None, feed='iex', url=None, window=390,
+                 flush_rows=500, flush_interval=5.0, conn=None, asset_ids=None, on_bar=None,
+                 max_reconnects=5, reconnect_wait=1.0, aggregate_daily=False, session=None, close_grace=120.0):
+        if aggregate_daily and feed not in DAILY_FEEDS:
+            raise ValueError(f"Daily bars need one of the {DAILY_FEEDS} feeds; '{feed}' volume and VWAP "
+                             "cover only part of the tape.")
+        if key_id is None or secret_key is None:
+            key_id, secret_key = _default_credentials()
+        if url is None:
+            stream_url = str(get_data_stream_url()).replace('https://', 'wss://').replace('http://', 'ws://')
+            url = f"{stream_url}/v2/{feed}"
+        self.symbols = list(symbols)
+        self.url = url
+        self._auth = {'action': 'auth', 'key': key_id, 'secret': secret_key}
+        self.bars = RollingBars(self.symbols, window=window)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_bar = on_bar
+        self.max_reconnects = max_reconnects
+        self.reconnect_wait = reconnect_wait
+        self.aggregate_daily = aggregate_daily
+        self.session = session
+        self.close_grace = close_grace
+        self.daily = None
+
+        self._own_conn = conn is None
+        self.conn = conn
+        self.asset_ids = asset_ids
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._stopped = False
+        # Disconnected since the epoch until the first subscription succeeds
+        self._disconnected_at = pd.Timestamp(0, tz='UTC')
+        self.stats = {'messages': 0, 'bars': 0, 'rows_written': 0, 'flushes': 0, 'reconnects': 0,
+                      'daily_rows_written': 0, 'daily_incomplete': 0}
+
+    def stop(self):
+        """Ask `run` to return after the current message; pending rows are flushed."""
+        self._stopped = True
+
+    def handle_message(self, raw):
+        """Decode one websocket text frame (a JSON array of events) and record its bars."""
+        self.stats['messages'] += 1
+        for event in json.loads(raw):
+            kind = event.get('T')
+            if kind in BAR_MESSAGE_TYPES:
+                self._record_bar(event, corrected=kind == 'u')
+            elif kind == 'error':
+                raise StreamError(f"Stream error {event.get('code')}: {event.get('msg')}")
+
+    def _record_bar(self, event, corrected=False):
+        symbol, stamp = event['S'], event['t']
+        values = [event.get(key, np.nan) for key in _MESSAGE_KEYS]
+        timestamp = np.datetime64(stamp.rstrip('Z'), 's')
+        if self.daily is not None:
+            previous = self.bars.get(symbol, timestamp) if corrected else None
+            self.daily.update(symbol, timestamp, values, previous=previous)
+        self.bars.update(symbol, timestamp, values)
+        self.stats['bars'] += 1
+
+        asset_id = self.asset_ids.get(symbol) if self.asset_ids else None
+        if asset_id is not None:
+            self._pending.append((asset_id, stamp, *values))
+        if self.on_bar is not None:
+            self.on_bar(symbol, dict(zip(['timestamp', *ROLLING_FIELDS], [stamp, *values])))
+
+    def _connected(self):
+        """Subscription confirmed: the time since the last disconnect is a gap in coverage."""
+        if self.daily is not None:
+            self.daily.mark_gap(self._disconnected_at, _utcnow())
+        self._disconnected_at = None
+
+    def _disconnected(self):
+        if self._disconnected_at is None:
+            self._disconnected_at = _utcnow()
+
+    def _next_session(self):
+        """Bounds of the first session after the one being aggregated, or None."""
+        day = pd.Timestamp(self.daily.date)
+        for offset in range(1, 8):
+            session = session_bounds((day + pd.Timedelta(days=offset)).strftime('%Y-%m-%d'), conn=self.conn)
+            if session is not None:
+                return session
+        return None
+
+    def flush(self):
+        """
+        Write every pending row to `asset_prices_intraday` in one transaction.
+
+        Once the session close plus `close_grace` has passed, the complete daily bars
+        go to `asset_prices` in the same transaction and aggregation moves on to the
+        next session.
+        """
+        self._last_flush = time.monotonic()
+        if self.conn is None:
+            return 0
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        daily_rows = 0
+        now = _utcnow()
+        if self.daily is not None and self.daily.is_due(now, grace=self.close_grace):
+            if self._disconnected_at is not None:
+                self.daily.mark_gap(self._disconnected_at, now)
+            bars = self.daily.finalize()
+            daily_rows = self.daily.write(self.conn, self.asset_ids or {}, bars, fetched_at)
+            self.stats['daily_rows_written'] += daily_rows
+            incomplete = bars.loc[~bars['complete'], 'symbol']
+            self.stats['daily_incomplete'] += int(incomplete.isin(list(self.asset_ids or {})).sum())
+            next_session = self._next_session()
+            if next_session is not None:
+                self.daily.reset(next_session)
+
+        written = len(self._pending)
+        if written:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO asset_prices_intraday
+                    (asset_id, timestamp, open, high, low, close, volume, trade_count, vwap, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(*row, fetched_at) for row in self._pending])
+            self._pending = []
+            self.stats['rows_written'] += written
+            self.stats['flushes'] += 1
+        if written or daily_rows:
+            self.conn.commit()
+        return written
+
+    def _flush_due(self):
+        return (len(self._pending) >= self.flush_rows
+                or (self._pending and time.monotonic() - self._last_flush >= self.flush_interval))
+
+    async def _expect(self, ws, status):
+        msg = await ws.receive()
+        if msg.type != aiohttp.WSMsgType.TEXT:
+            raise ConnectionError(f"Stream closed during handshake ({msg.type.name})")
+        events = json.loads(msg.data)
+        for event in events:
+            if event.get('T') == 'error':
+                raise StreamError(f"Stream error {event.get('code')}: {event.get('msg')}")
+        if status is not None and not any(event.get('msg') == status for event in events):
+            raise StreamError(f"Expected '{status}', got {events}")
+        return events
+
+    async def _consume(self, session, deadline):
+        async with session.ws_connect(self.url, heartbeat=30) as ws:
+            await self._expect(ws, 'connected')
+            await ws.send_str(json.dumps(self._auth))
+            await self._expect(ws, 'authenticated')
+            await ws.send_str(json.dumps({'action': 'subscribe', 'bars': self.symbols, 'updatedBars': self.symbols}))
+            await self._expect(ws, None)
+            self._connected()
+
+            while not self._stopped:
+                timeout = self.flush_interval
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        return
+                try:
+                    msg = await ws.receive(timeout=timeout)
+                except asyncio.TimeoutError:
+                    self.flush()
+                    continue
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    self.handle_message(msg.data)
+                    if self._flush_due():
+                        self.flush()
+                elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    raise ConnectionError(f"Stream closed ({msg.type.name})")
+
+    async def run(self, duration=None):
+        """
+        Stream until `stop()` is called, `duration` seconds elapse or reconnects run out.
+
+        Returns
+        -------
+        dict
+            Counters: 'messages', 'bars', 'rows_written', 'flushes', 'reconnects',
+            'daily_rows_written', 'daily_incomplete' (symbols left to the REST update).
+        """
+        deadline = time.monotonic() + duration if duration is not None else None
+        if self._own_conn:
+            self.conn = get_db_connection(print_statements=False)
+            ensure_schema(self.conn)
+        if self.asset_ids is None:
+            self.asset_ids = fetch_active_tickers()
+        if self.aggregate_daily and self.daily is None:
+            session = self.session or session_bounds(conn=self.conn)
+            if session is None:
+                print("Market closed today; daily bars are not aggregated.")
+            else:
+                self.daily = DailyBarAggregator(self.symbols, session)
+
+        attempt = 0
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stopped:
+                    try:
+                        await self._consume(session, deadline)
+                        break
+                    except (aiohttp.ClientError, ConnectionError, asyncio.TimeoutError) as e:
+                        self._disconnected()
+                        self.flush()
+                        if attempt >= self.max_reconnects:
+                            print(f"Stream disconnected, giving up: {e}")
+                            break
+                        await asyncio.sleep(self.reconnect_wait * (2 ** attempt))
+                        attempt += 1
+                        self.stats['reconnects'] += 1
+        finally:
+            self._disconnected()
+            self.flush()
+            if self._own_conn:
+                self.conn.close()
+                self.conn = None
+        return dict(self.stats)
+
+
+def fetch_stream_symbols(watchlist=None):
+    """
+    Symbols to stream: everything currently held plus an optional watchlist.
+
+    Parameters
+    ----------
+    watchlist : list of str, optional
+        Extra symbols to follow.
+
+    Returns
+    -------
+    list of str
+        Sorted, de-duplicated symbols.
+    """
+    conn = get_db_connection('portfolio_management.db', print_statements=False)
+    ensure_schema(conn, 'portfolio_management.db')
+    held_ids = pd.read_sql_query("""
+        SELECT h.asset_id FROM asset_holdings h
+        WHERE h.date = (SELECT MAX(date) FROM asset_holdings WHERE asset_id = h.asset_id)
+        AND h.quantity != 0
+    """, conn)['asset_id']
+    conn.close()
+
+    symbols_by_id = {asset_id: symbol for symbol, asset_id in fetch_active_tickers().items()}
+    held = {symbols_by_id[asset_id] for asset_id in held_ids if asset_id in symbols_by_id}
+    return sorted(held | set(watchlist or []))
+
+
+def stream_minute_bars(symbols=None, watchlist=None, duration=None, **kwargs):
+    """
+    Stream live minute bars into `asset_prices_intraday`.
+
+    Blocks until the stream ends. Inside a running event loop (e.g. Jupyter) the
+    stream runs on a worker thread; use `BarStream.run` directly to stream
+    alongside other coroutines.
+
+    Parameters
+    ----------
+    symbols : list of str, optional
+        Symbols to subscribe to. Defaults to `fetch_stream_symbols(watchlist)`.
+    watchlist : list of str, optional
+        Extra symbols added to the current holdings when `symbols` is None.
+    duration : float, optional
+        Seconds to stream. None streams until the connection gives up.
+    **kwargs
+        Passed to `BarStream`.
+
+    Returns
+    -------
+    dict
+        Counters from `BarStream.run`.
+    """
+    if symbols is None:
+        symbols = fetch_stream_symbols(watchlist)
+    if not symbols:
+        print("No symbols to stream.")
+        return {}
+    return _run_sync(BarStream(symbols, **kwargs).run(duration=duration))
@@ -3,129 +3,224 @@ import pandas as pd
 import time
 from datetime import datetime, timedelta
 
+import requests
 from tqdm import tqdm
-from alpaca_trade_api.rest import REST
-from credentials import ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPAKA_ENDPOINT_URL
-from src.utils.db_utils import get_db_connection, fetch_active_tickers
+from alpaca_trade_api.rest import REST, APIError
+from src.utils.db_utils import get_db_connection, fetch_active_tickers, ensure_schema
+from src.utils.price_store import insert_price_bars
+from src.utils.price_writer import PriceWriter
+from src.utils.alpaca_async import download_bars, credentials_from_client, bars_to_frame
+from src.utils.bar_accumulator import BarAccumulator, OHLC_RESULT_COLUMNS, BAR_RESULT_COLUMNS
+from src.utils.bar_cache import get_default_cache
+from src.utils.request_policy import CircuitOpenError, install_request_policy, tracked
+from src.utils.ingest_telemetry import api_call, stage
 
-def get_alpaca_client():
-    return REST(ALPACA_API_KEY, ALPACA_SECRET_KEY, base_url=ALPAKA_ENDPOINT_URL)
+# Failures an Alpaca call can raise once the request policy's retries are exhausted
+ALPACA_ERRORS = (APIError, requests.RequestException, CircuitOpenError)
+
+def get_alpaca_client(key_id=None, secret_key=None, base_url=None):
+    """
+    Build a REST client, by default from the keys in `credentials/.secrets`.
+
+    The credentials package is imported here rather than at module level (it raises
+    when `.secrets` is missing), so this module can be imported and exercised against
+    `AlpacaEmulator` without live credentials.
+
+    Every client shares the process-wide `RequestPolicy` (see `src.utils.request_policy`):
+    header-driven pacing, jittered retries and a circuit breaker.
+    """
+    if key_id is None or secret_key is None or base_url is None:
+        from credentials import ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPAKA_ENDPOINT_URL
+        key_id = key_id or ALPACA_API_KEY
+        secret_key = secret_key or ALPACA_SECRET_KEY
+        base_url = base_url or ALPAKA_ENDPOINT_URL
+    return install_request_policy(REST(key_id, secret_key, base_url=base_url))
 
 def connect_to_alpaca(ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPAKA_ENDPOINT_URL):
     try:
-        return REST(ALPACA_API_KEY, ALPACA_SECRET_KEY, base_url=ALPAKA_ENDPOINT_URL)
-    except Exception as e:
+        return get_alpaca_client(ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPAKA_ENDPOINT_URL)
+    except ValueError as e:
         print(f"Connection failed: {e}")
         return None
 
+@tracked
 def fetch_alpaca_stock_tickers(alpaca_client, exchanges=['NASDAQ', 'NYSE', 'AMEX']):
     try:
-        assets = alpaca_client.list_assets(status='active')
+        with api_call():
+            assets = alpaca_client.list_assets(status='active')
         stock_assets = [
             asset.symbol for asset in assets
             if asset.exchange in exchanges and asset.tradable
             and asset.symbol.isalpha() and asset.symbol.isupper()
         ]
         return stock_assets
-    except Exception as e:
+    except ALPACA_ERRORS as e:
         print(f"Error fetching tickers: {e}")
         return []
 
-def fetch_alpaca_historical_data(alpaca_client, tickers, start_date, end_date, years_back=5):
+@tracked
+def fetch_alpaca_bars_batched(alpaca_client, tickers, timeframe, start, end, chunk_size=200,
+                              feed=None, adjustment='raw', raw=False, cache=None, failed=None):
+    """
+    Fetch bars for many tickers with multi-symbol requests.
+
+    The universe is split into chunks of `chunk_size` symbols and each chunk is
+    requested from `/v2/stocks/bars?symbols=...`, following `next_page_token` until
+    the chunk is exhausted. A symbol's bars may span several pages; they are
+    reassembled before being split into one frame per symbol.
+
+    A chunk that fails (API error, network error or open circuit) is dropped as a
+    whole, pages already received included, and the other chunks still return
+    their bars. Failed chunks are not cached.
+
+    Args:
+        alpaca_client (REST): Initialized Alpaca REST client.
+        tickers (list): List of stock tickers to fetch.
+        timeframe (str): Alpaca timeframe, e.g. '1Day' or '1Min'.
+        start (str): Start date ('YYYY-MM-DD') or RFC-3339 timestamp.
+        end (str): End date ('YYYY-MM-DD') or RFC-3339 timestamp.
+        chunk_size (int): Symbols per request (default: 200, keeps URLs well under limits).
+        feed (str, optional): Data feed ('iex' or 'sip'). None uses the account default.
+        adjustment (str): Corporate action adjustment (default: 'raw').
+        raw (bool): If True, return the raw bar dicts instead of DataFrames, which avoids
+            building one frame per symbol when the caller feeds a `BarAccumulator`.
+        cache (BarCache, optional): On-disk cache for closed ranges. Cached symbols are
+            served from disk and only the misses are requested.
+        failed (dict, optional): Filled with {symbol: error message} for every symbol
+            of a failed chunk, so the caller can retry them.
+
+    Returns:
+        dict: {symbol: pd.DataFrame} with columns timestamp, date, open, high, low, close,
+        volume, trade_count, vwap ({symbol: list of dict} if `raw`). Symbols without bars
+        are omitted.
+    """
+    bars_by_symbol, cached = {}, {}
+    if cache is not None:
+        cached, tickers = cache.get_many(tickers, timeframe, start, end, feed, adjustment)
+
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        chunk_bars, page_token = {}, None
+        try:
+            while True:
+                params = {
+                    'symbols': ','.join(chunk),
+                    'timeframe': timeframe,
+                    'start': start,
+                    'end': end,
+                    'adjustment': adjustment,
+                    'limit': 10000,
+                }
+                if page_token:
+                    params['page_token'] = page_token
+                with api_call():
+                    resp = alpaca_client.data_get('/stocks/bars', data=params, feed=feed, api_version='v2')
+                for symbol, bars in (resp.get('bars') or {}).items():
+                    chunk_bars.setdefault(symbol, []).extend(bars or [])
+                page_token = resp.get('next_page_token')
+                if not page_token:
+                    break
+        except ALPACA_ERRORS as e:
+            print(f"Error fetching bars for {len(chunk)} tickers ({chunk[0]}..{chunk[-1]}): {e}")
+            if failed is not None:
+                failed.update(dict.fromkeys(chunk, str(e)))
+            continue
+        bars_by_symbol.update(chunk_bars)
+        if cache is not None:
+            cache.put_many({symbol: chunk_bars.get(symbol, []) for symbol in chunk},
+                           timeframe, start, end, feed, adjustment)
+
+    bars_by_symbol.update(cached)
+    if raw:
+        return {symbol: bars for symbol, bars in bars_by_symbol.items() if bars}
+    with stage('transform'):
+        return {symbol: bars_to_frame(bars) for symbol, bars in bars_by_symbol.items() if bars}
+
+@tracked
+def fetch_alpaca_historical_data(alpaca_client, tickers, start_date, end_date, years_back=None, cache=True):
     """
-    Fetch historical OHLC data from Alpaca for a list of tickers.
+    Fetch historical daily bars (OHLC, volume, trade count and VWAP) from Alpaca for a list of tickers.
     
     Args:
         alpaca_client (REST): Initialized Alpaca REST client.
         tickers (list): List of stock tickers to fetch.
         start_date (str): Start date in 'YYYY-MM-DD' format.
         end_date (str): End date in 'YYYY-MM-DD' format.
-        years_back (int): Number of years of data required (default: 5).
+        years_back (int, optional): Drop tickers with fewer than `years_back` years of bars
+            in the range. None (default) keeps every ticker, so short incremental ranges survive.
+        cache (bool or BarCache): Serve closed ranges from the on-disk bar cache
+            (default: True, the shared cache in `CACHE_DIR`). False always calls the API.
     
     Returns:
-        pd.DataFrame: Combined OHLC data for all tickers.
+        pd.DataFrame: Combined bars for all tickers, columns `BAR_RESULT_COLUMNS`.
     """
-    alpaca_df = pd.DataFrame()
     start_time = time.time()
-    missing_data_count = 0
-    not_enough_time_count = 0
-    processed_ticker_count = 0
-    trading_days_back = years_back * 252  # Approx trading days/year
+    trading_days_back = years_back * 252 if years_back else 0  # Approx trading days/year
 
-    for ticker in tqdm(tickers, desc="Alpaca Download Progress"):
-        try:
-            processed_ticker_count += 1
-            bars = alpaca_client.get_bars(ticker, "1Day", start_date, end_date).df
-            
-            if not bars.empty:
-                df = bars[['open', 'high', 'low', 'close']].reset_index()
-                if len(df) < trading_days_back:
-                    missing_data_count += 1
-                    not_enough_time_count += 1
-                    continue
-                
-                df['ticker'] = ticker
-                df['date'] = df['timestamp'].dt.strftime("%Y-%m-%d")
-                df = df[['ticker', 'date', 'open', 'high', 'low', 'close']]
-                alpaca_df = pd.concat([alpaca_df, df])
-            else:
-                missing_data_count += 1
-            
-            time.sleep(1)  # Avoid rate limiting
-        except Exception as e:
-            print(f"Error for {ticker}: {e}")
-            time.sleep(1)
+    failed = {}
+    try:
+        if cache is True:
+            cache = get_default_cache()
+        frames = fetch_alpaca_bars_batched(alpaca_client, tickers, "1Day", start_date, end_date, raw=True,
+                                           cache=cache or None, failed=failed)
+    except ALPACA_ERRORS as e:
+        print(f"Error fetching historical data: {e}")
+        frames = {}
 
+    accumulator = BarAccumulator(BAR_RESULT_COLUMNS)
+    not_enough_time_count = 0
+    for ticker, bars in frames.items():
+        if len(bars) < trading_days_back:
+            not_enough_time_count += 1
+            continue
+        accumulator.add_bars(ticker, bars)
+
+    alpaca_df = accumulator.to_frame()
+    missing_data_count = len(tickers) - len(frames) + not_enough_time_count
     total_seconds = time.time() - start_time
     seconds_per_ticker = round(total_seconds / len(tickers), 2)
     print(f"\nFetched {len(alpaca_df)} rows of stock data in {total_seconds:.2f} seconds.")
-    print(f"Processed {processed_ticker_count} tickers, missing {missing_data_count} tickers, "
-          f"{not_enough_time_count} tickers did not have enough time.")
+    print(f"Processed {len(tickers)} tickers, missing {missing_data_count} tickers "
+          f"({len(failed)} in failed requests), {not_enough_time_count} tickers did not have enough time.")
     print(f"Processing time per ticker: {seconds_per_ticker:.2f} seconds.")
     return alpaca_df
 
 
+@tracked
 def fetch_alpaca_yesterday_ohlc(alpaca_client, tickers):
     yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    daily_df = pd.DataFrame()
 
-    for ticker in tqdm(tickers, desc="Yesterday OHLC"):
-        try:
-            bars = alpaca_client.get_bars(ticker, "1Day", yesterday, yesterday).df
-            if not bars.empty:
-                bars.reset_index(inplace=True)
-                ohlc = bars[['timestamp', 'open', 'high', 'low', 'close']]
-                ohlc['ticker'] = ticker
-                ohlc['date'] = yesterday
-                daily_df = pd.concat([daily_df, ohlc[['ticker', 'date', 'open', 'high', 'low', 'close']]])
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
-            time.sleep(1)
-
-    return daily_df
+    try:
+        frames = fetch_alpaca_bars_batched(alpaca_client, tickers, "1Day", yesterday, yesterday, raw=True)
+    except ALPACA_ERRORS as e:
+        print(f"Error fetching yesterday's OHLC: {e}")
+        return pd.DataFrame()
+
+    accumulator = BarAccumulator(OHLC_RESULT_COLUMNS)
+    for ticker, bars in frames.items():
+        accumulator.add_bars(ticker, bars)
+
+    return accumulator.to_frame()
 
+@tracked
 def fetch_alpaca_open_prices(alpaca_client, tickers):
-    today = datetime.now().strftime("%Y-%m-%d")
-    market_open_dt = pd.Timestamp(f"{today}T09:30:00-05:00")
-    open_prices_df = pd.DataFrame()
+    """
+    Today's opening prices from batched snapshots (see `src.etl.capture_open`).
 
-    for ticker in tqdm(tickers, desc="Open Prices"):
-        try:
-            bars = alpaca_client.get_bars(ticker, "1Min", market_open_dt.isoformat(), (market_open_dt + timedelta(minutes=1)).isoformat()).df
-            if not bars.empty:
-                open_price = bars.iloc[0]['open']
-                open_prices_df = pd.concat([
-                    open_prices_df,
-                    pd.DataFrame({'ticker': [ticker], 'date': [today], 'open': [open_price]})
-                ])
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
-            time.sleep(1)
-
-    return open_prices_df
+    The session open comes from the trading calendar, so it is correct during
+    daylight saving time. Returns a DataFrame with 'ticker', 'date' and 'open'.
+    """
+    # Imported here: src.etl.capture_open imports this module
+    from src.etl.capture_open import capture_open_prices
 
+    try:
+        result = capture_open_prices(tickers, alpaca_client, wait=False, timeout=0)
+    except ALPACA_ERRORS as e:
+        print(f"Error fetching open prices: {e}")
+        return pd.DataFrame()
+    return result['prices'][['ticker', 'date', 'open']]
+
+@tracked
 def fetch_alpaca_latest_bars(alpaca_client, tickers):
     try:
         bars = alpaca_client.get_latest_bars(tickers)
@@ -141,10 +236,11 @@ def fetch_alpaca_latest_bars(alpaca_client, tickers):
             } for ticker, bar in bars.items()
         ]
         return pd.DataFrame(data)
-    except Exception as e:
+    except ALPACA_ERRORS as e:
         print(f"Error fetching latest bars: {e}")
         return pd.DataFrame()
 
+@tracked
 def update_stock_prices(db_path="assets.db"):
     """
     Queries the database for the last stock fetch and update times, then updates with latest prices.
@@ -212,16 +308,12 @@ def update_stock_prices(db_path="assets.db"):
                 
                 if not latest_bars_df.empty:
                     # Insert new records
-                    for _, row in latest_bars_df.iterrows():
-                        cursor.execute("""
-                            INSERT INTO asset_prices (
-                                asset_id, date, open, high, low, close, adjusted_close, volume, fetched_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            row['asset_id'], row['date'], row['open'], row['high'], row['low'],
-                            row['close'], row['adjusted_close'], row['volume'], row['fetched_at']
-                        ))
-                    result["new_records_added"] = len(latest_bars_df)
+                    ensure_schema(conn)
+                    latest_bars_df = latest_bars_df.dropna(subset=['asset_id'])
+                    for asset_id, rows in latest_bars_df.groupby('asset_id'):
+                        result["new_records_added"] += insert_price_bars(
+                            conn, int(asset_id), rows, fetched_at=rows['fetched_at'].iloc[0]
+                        )
                     result["status"] = f"Added {result['new_records_added']} new price records"
                     conn.commit()
                 else:
@@ -238,92 +330,69 @@ def update_stock_prices(db_path="assets.db"):
     return result
 
 def ensure_prices_table():
+    """Create `asset_prices` (and the rest of the 'assets.db' schema) or add its newer columns."""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS asset_prices (
-            price_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            asset_id INTEGER,
-            date TEXT,
-            open REAL,
-            high REAL,
-            low REAL,
-            close REAL,
-            adjusted_close REAL,
-            volume INTEGER,
-            fetched_at TEXT,
-            FOREIGN KEY(asset_id) REFERENCES asset_metadata(asset_id)
-        )
-    """)
-    conn.commit()
+    ensure_schema(conn)
     conn.close()
 
-def populate_alpaca_full_history(alpaca_client, tickers, end_date=None):
+@tracked
+def populate_alpaca_full_history(alpaca_client, tickers, end_date=None, max_concurrency=8,
+                                 requests_per_minute=200, max_retries=3):
     """
-    Populate full historical OHLC data from Alpaca for a list of tickers,
+    Populate full historical daily bars from Alpaca for a list of tickers,
     fetching data as far back as possible until the specified end date,
-    and inserting each record directly into the database.
+    and inserting each record directly into the database. Volume, trade count
+    and VWAP are stored with the prices.
+
+    Tickers are downloaded concurrently by `download_bars`, paced by a token bucket
+    sized to `requests_per_minute`. Each completed ticker is handed to a
+    `PriceWriter` thread, which writes while downloads continue and batches the commits.
 
     Args:
-        alpaca_client (REST): Initialized Alpaca REST client.
+        alpaca_client (REST): Initialized Alpaca REST client (supplies the API credentials).
         tickers (list): List of stock tickers to fetch.
         end_date (str, optional): End date in 'YYYY-MM-DD' format. Defaults to today's date.
+        max_concurrency (int): Maximum requests in flight (default: 8).
+        requests_per_minute (int): Account request quota (default: 200).
+        max_retries (int): Retries per request on 429/5xx/connection errors (default: 3).
+
+    Returns:
+        dict: Download summary from `download_bars` (completed, failed, requests, rows, seconds),
+        plus the writer's metrics under 'writer'.
     """
     if end_date is None:
         end_date = datetime.today().strftime('%Y-%m-%d')
 
-    start_time = time.time()
-    missing_data_count = 0
-    processed_ticker_count = 0
     tickers_dict = fetch_active_tickers()
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
     # Ensure the asset_prices table exists using the locally defined function
     ensure_prices_table()
 
-    for ticker in tqdm(tickers, desc="Alpaca Download Progress"):
-        try:
-            processed_ticker_count += 1
-            bars = alpaca_client.get_bars(ticker, "1Day", "1900-01-01", end_date, feed='iex').df
-
-            if not bars.empty:
-                df = bars[['open', 'high', 'low', 'close']].reset_index()
-                df['ticker'] = ticker
-                df['date'] = df['timestamp'].dt.strftime("%Y-%m-%d")
-                df = df[['ticker', 'date', 'open', 'high', 'low', 'close']]
-
-                asset_id = tickers_dict.get(ticker)
-                if asset_id:
-                    for _, row in df.iterrows():
-                        cursor.execute("""
-                            INSERT OR IGNORE INTO asset_prices (asset_id, date, open, high, low, close, fetched_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            asset_id,
-                            row['date'],
-                            row['open'],
-                            row['high'],
-                            row['low'],
-                            row['close'],
-                            datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        ))
-            else:
-                missing_data_count += 1
+    progress = tqdm(total=len(tickers), desc="Alpaca Download Progress")
 
-            conn.commit()
-            time.sleep(1)  # Avoid rate limiting
+    def write_ticker(ticker, df):
+        asset_id = tickers_dict.get(ticker)
+        if asset_id:
+            writer.put(asset_id, df, ticker)
+        progress.update(1)
 
-        except Exception as e:
-            print(f"Error for {ticker}: {e}")
-            missing_data_count += 1
-            time.sleep(1)
+    key_id, secret_key = credentials_from_client(alpaca_client)
+    with PriceWriter() as writer:
+        summary = download_bars(
+            tickers, "1900-01-01", end_date, on_result=write_ticker, feed='iex',
+            max_concurrency=max_concurrency, requests_per_minute=requests_per_minute,
+            max_retries=max_retries, key_id=key_id, secret_key=secret_key,
+        )
+    progress.close()
+    summary['writer'] = writer.metrics()
 
-    conn.close()
-    total_seconds = time.time() - start_time
-    seconds_per_ticker = round(total_seconds / len(tickers), 2)
-    print(f"\nProcessed {processed_ticker_count} tickers, missing data for {missing_data_count} tickers.")
-    print(f"Total time: {total_seconds:.2f} seconds. Avg time per ticker: {seconds_per_ticker:.2f} seconds.")
+    for ticker, error in summary['failed'].items():
+        print(f"Error for {ticker}: {error}")
+    missing_data_count = summary['empty'] + len(summary['failed'])
+    seconds_per_ticker = round(summary['seconds'] / max(len(tickers), 1), 2)
+    print(f"\nProcessed {len(tickers)} tickers, missing data for {missing_data_count} tickers.")
+    print(f"Total time: {summary['seconds']:.2f} seconds. Avg time per ticker: {seconds_per_ticker:.2f} seconds.")
+    return summary
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+# src/utils/bar_accumulator.py
+
+"""
+Columnar accumulator for per-ticker fetch loops.
+
+Growing a DataFrame with `pd.concat([df, new])` inside a loop copies every row
+collected so far on each iteration, which is quadratic in the universe size.
+`BarAccumulator` instead keeps one list of NumPy arrays per column and builds the
+result with a single concatenation, so the cost is linear in the rows fetched.
+
+Every fetch function returns the same result layout, `BAR_RESULT_COLUMNS`
+(a subset of it for fetches that only return some fields): 'ticker' and 'date'
+as strings, prices as float64 and counts as float64 (NaN when missing).
+"""
+
+import numpy as np
+import pandas as pd
+
+BAR_RESULT_COLUMNS = ['ticker', 'date', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']
+OHLC_RESULT_COLUMNS = ['ticker', 'date', 'open', 'high', 'low', 'close']
+
+_RAW_BAR_KEYS = {'open': 'o', 'high': 'h', 'low': 'l', 'close': 'c',
+                 'volume': 'v', 'trade_count': 'n', 'vwap': 'vw'}
+
+
+class BarAccumulator:
+    """
+    Collect per-ticker bars column by column and build one DataFrame at the end.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        Result columns; must start with 'ticker' and 'date'. Defaults to
+        `OHLC_RESULT_COLUMNS`.
+
+    Examples
+    --------
+    >>> acc = BarAccumulator()
+    >>> for ticker in tickers:
+    ...     acc.add_frame(ticker, bars_for(ticker))
+    >>> df = acc.to_frame()
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns or OHLC_RESULT_COLUMNS)
+        self._chunks = {column: [] for column in self.columns}
+        self._pending = {column: [] for column in self.columns}
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def add_frame(self, ticker, frame):
+        """Append every row of `frame` (must contain 'date' and the value columns) for `ticker`."""
+        n = len(frame)
+        if n == 0:
+            return
+        self._flush_pending()
+        self._chunks['ticker'].append(np.full(n, ticker, dtype=object))
+        for column in self.columns[1:]:
+            if column in frame:
+                values = frame[column].to_numpy()
+            else:
+                values = np.full(n, np.nan)
+            self._chunks[column].append(values)
+        self._rows += n
+
+    def add_bars(self, ticker, bars):
+        """Append raw Alpaca v2 bar dicts (keys 't', 'o', 'h', ...) without building a frame."""
+        n = len(bars)
+        if n == 0:
+            return
+        self._flush_pending()
+        self._chunks['ticker'].append(np.full(n, ticker, dtype=object))
+        for column in self.columns[1:]:
+            if column == 'date':
+                values = np.array([bar['t'][:10] for bar in bars], dtype=object)
+            else:
+                key = _RAW_BAR_KEYS[column]
+                values = np.array([bar.get(key, np.nan) for bar in bars], dtype=np.float64)
+            self._chunks[column].append(values)
+        self._rows += n
+
+    def add_row(self, ticker, **values):
+        """Append a single row; missing columns are NaN."""
+        self._pending['ticker'].append(ticker)
+        for column in self.columns[1:]:
+            self._pending[column].append(values.get(column, np.nan))
+        self._rows += 1
+
+    def _flush_pending(self):
+        # Rows from add_row become a chunk before the next frame, so insertion order is kept
+        if not self._pending['ticker']:
+            return
+        for column in self.columns:
+            dtype = object if column in ('ticker', 'date') else np.float64
+            self._chunks[column].append(np.array(self._pending[column], dtype=dtype))
+            self._pending[column] = []
+
+    def to_frame(self):
+        """Concatenate everything collected so far into one DataFrame with `self.columns`."""
+        self._flush_pending()
+        data = {}
+        for column in self.columns:
+            chunks = self._chunks[column]
+            if column in ('ticker', 'date'):
+                data[column] = np.concatenate(chunks).astype(object) if chunks else np.array([], dtype=object)
+            else:
+                data[column] = np.concatenate(chunks).astype(np.float64) if chunks else np.array([], dtype=np.float64)
+        return pd.DataFrame(data, columns=self.columns)
@@ -0,0 +1,268 @@
+# src/utils/bar_cache.py
+
+"""
+Content-addressed, compressed on-disk cache for historical bar responses.
+
+Research runs request the same closed historical ranges over and over. A
+response for a range that ended before today (exchange time) will not change,
+so it is stored once and served from disk afterwards:
+
+- each request is keyed by (symbol, timeframe, start, end, feed, adjustment);
+- the raw bars are stored as zlib-compressed JSON blobs named by the SHA-256 of
+  their content, so identical responses (e.g. the many empty ones) share a blob;
+- an SQLite index in the cache directory maps keys to blobs and tracks last
+  access, and the least recently used entries are evicted once the blobs
+  exceed `max_bytes`.
+
+Ranges that end today or later are never cached.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import CACHE_DIR
+
+EXCHANGE_TIMEZONE = 'America/New_York'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def is_closed_range(end, today=None):
+    """
+    True if a request ending at `end` covers only finished sessions.
+
+    Parameters
+    ----------
+    end : str
+        'YYYY-MM-DD' or RFC-3339 end of the request.
+    today : str, optional
+        Current exchange date ('YYYY-MM-DD'). Defaults to today in New York.
+    """
+    if today is None:
+        today = pd.Timestamp.now(tz=EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')
+    stamp = pd.Timestamp(end)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert(EXCHANGE_TIMEZONE)
+    return stamp.strftime('%Y-%m-%d') < today
+
+
+class BarCache:
+    """
+    On-disk cache of raw Alpaca bar lists for closed historical ranges.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Directory for the index and blobs (default: `CACHE_DIR / 'bars'`).
+    max_bytes : int, optional
+        Compressed size above which least recently used entries are evicted
+        (default: 2 GiB).
+
+    Examples
+    --------
+    >>> cache = BarCache()
+    >>> frames = fetch_alpaca_bars_batched(client, tickers, '1Day', '2015-01-01', '2024-12-31', cache=cache)
+    >>> cache.stats
+    {'hits': 4981, 'misses': 19, 'stored': 19, 'evicted': 0}
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = (CACHE_DIR / 'bars') if cache_dir is None else Path(cache_dir)
+        self.blob_dir = self.cache_dir / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+        # Shared by fetch worker threads; every index access holds the lock
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.cache_dir / 'index.db', check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key_hash TEXT PRIMARY KEY,
+                symbol TEXT,
+                timeframe TEXT,
+                range_start TEXT,
+                range_end TEXT,
+                feed TEXT,
+                adjustment TEXT,
+                content_hash TEXT,
+                created_at TEXT,
+                last_access TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                size INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(symbol, timeframe, start, end, feed=None, adjustment='raw'):
+        """SHA-256 of the canonical request key."""
+        canonical = json.dumps([symbol, str(timeframe), str(start), str(end), feed or '', adjustment])
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _blob_path(self, content_hash):
+        return self.blob_dir / content_hash[:2] / f"{content_hash}.json.z"
+
+    def get_many(self, symbols, timeframe, start, end, feed=None, adjustment='raw'):
+        """
+        Look up several symbols sharing one request range.
+
+        Returns
+        -------
+        tuple of (dict, list)
+            ({symbol: raw bars} for hits, [symbols] that missed). Open ranges always miss.
+        """
+        with self._lock:
+            if not is_closed_range(end):
+                self.stats['misses'] += len(symbols)
+                return {}, list(symbols)
+
+            keys = {self.key(symbol, timeframe, start, end, feed, adjustment): symbol for symbol in symbols}
+            found = {}
+            key_list = list(keys)
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                found.update(self.conn.execute(
+                    f"SELECT key_hash, content_hash FROM entries WHERE key_hash IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+
+            hits, misses, touched = {}, [], []
+            for key_hash, symbol in keys.items():
+                content_hash = found.get(key_hash)
+                path = self._blob_path(content_hash) if content_hash else None
+                if path is None or not path.exists():
+                    misses.append(symbol)
+                    continue
+                hits[symbol] = json.loads(zlib.decompress(path.read_bytes()))
+                touched.append(key_hash)
+
+            if touched:
+                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+                self.conn.executemany("UPDATE entries SET last_access = ? WHERE key_hash = ?", [(now, k) for k in touched])
+                self.conn.commit()
+            self.stats['hits'] += len(hits)
+            self.stats['misses'] += len(misses)
+            return hits, misses
+
+    def get(self, symbol, timeframe, start, end, feed=None, adjustment='raw'):
+        """Raw bars for one request, or None on a miss."""
+        hits, _ = self.get_many([symbol], timeframe, start, end, feed, adjustment)
+        return hits.get(symbol)
+
+    def put_many(self, bars_by_symbol, timeframe, start, end, feed=None, adjustment='raw'):
+        """
+        Store responses for several symbols sharing one closed range, then evict if over budget.
+
+        Parameters
+        ----------
+        bars_by_symbol : dict
+            {symbol: list of raw bar dicts}; an empty list records that the range has no bars.
+
+        Returns
+        -------
+        int
+            Entries stored (0 for open ranges).
+        """
+        with self._lock:
+            if not bars_by_symbol or not is_closed_range(end):
+                return 0
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+            entries, blobs = [], []
+            for symbol, bars in bars_by_symbol.items():
+                payload = json.dumps(bars, separators=(',', ':')).encode()
+                content_hash = hashlib.sha256(payload).hexdigest()
+                path = self._blob_path(content_hash)
+                if not path.exists():
+                    data = zlib.compress(payload, 6)
+                    path.parent.mkdir(exist_ok=True)
+                    tmp = path.with_suffix('.tmp')
+                    tmp.write_bytes(data)
+                    tmp.replace(path)  # Atomic, so readers never see a partial blob
+                    blobs.append((content_hash, len(data)))
+                entries.append((self.key(symbol, timeframe, start, end, feed, adjustment), symbol, str(timeframe),
+                                str(start), str(end), feed, adjustment, content_hash, now, now))
+
+            self.conn.executemany("INSERT OR REPLACE INTO blobs (content_hash, size) VALUES (?, ?)", blobs)
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO entries
+                    (key_hash, symbol, timeframe, range_start, range_end, feed, adjustment, content_hash, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, entries)
+            self.conn.commit()
+            self.stats['stored'] += len(entries)
+            self.evict()
+            return len(entries)
+
+    def put(self, symbol, bars, timeframe, start, end, feed=None, adjustment='raw'):
+        """Store one response. Returns True if it was cached."""
+        return self.put_many({symbol: bars}, timeframe, start, end, feed, adjustment) == 1
+
+    def size_bytes(self):
+        """Compressed size of all blobs."""
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used entries, and blobs no entry references, until under `max_bytes`."""
+        with self._lock:
+            evicted = 0
+            while (excess := self.size_bytes() - self.max_bytes) > 0:
+                # Oldest entries whose blobs add up to the excess (shared blobs may free less; loop again)
+                victims, freed = [], 0
+                for key_hash, size in self.conn.execute("""
+                    SELECT e.key_hash, b.size FROM entries e JOIN blobs b ON b.content_hash = e.content_hash
+                    ORDER BY e.last_access
+                """):
+                    victims.append((key_hash,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                if not victims:
+                    break
+                self.conn.executemany("DELETE FROM entries WHERE key_hash = ?", victims)
+                orphans = self.conn.execute("""
+                    SELECT content_hash FROM blobs
+                    WHERE content_hash NOT IN (SELECT content_hash FROM entries)
+                """).fetchall()
+                for (content_hash,) in orphans:
+                    self._blob_path(content_hash).unlink(missing_ok=True)
+                self.conn.executemany("DELETE FROM blobs WHERE content_hash = ?", orphans)
+                self.conn.commit()
+                evicted += len(victims)
+            self.stats['evicted'] += evicted
+            return evicted
+
+    def clear(self):
+        """Remove every entry and blob."""
+        with self._lock:
+            for (content_hash,) in self.conn.execute("SELECT content_hash FROM blobs").fetchall():
+                self._blob_path(content_hash).unlink(missing_ok=True)
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM blobs")
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Process-wide `BarCache` in `CACHE_DIR`, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BarCache()
+    return _default_cache
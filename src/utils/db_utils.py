@@ -5,6 +5,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import os 
 from src.config import DB_DIR
+from src.db_schema import DATABASES, ADDED_COLUMNS
 
 def get_db_connection(db_name='assets.db', print_statements=True):
     db_path = Path(DB_DIR) / db_name
@@ -12,9 +13,70 @@ def get_db_connection(db_name='assets.db', print_statements=True):
         print(f"Connecting to database: {db_path}")  # Debug: Show the path
     return sqlite3.connect(db_path)
 
-def fetch_active_tickers():
+def ensure_schema(conn, db_name='assets.db'):
+    """
+    Create any missing tables, indexes and columns defined for `db_name` in `src.db_schema`.
+
+    Every statement in the schema is idempotent (`IF NOT EXISTS`), and columns in
+    `ADDED_COLUMNS` are only added to tables that lack them, so this is safe to call
+    at the start of any job that writes to a database created before the schema
+    last changed.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to the database.
+    db_name : str, optional
+        Key into `DATABASES` (default: 'assets.db').
+    """
+    cursor = conn.cursor()
+    for schema in DATABASES[db_name]:
+        cursor.execute(schema)
+    for table, columns in ADDED_COLUMNS.get(db_name, {}).items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in columns:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    conn.commit()
+
+def fetch_active_tickers(min_quality=None, max_liquidity_rank=None, min_dollar_volume=None):
+    """
+    Active tickers as {symbol: asset_id}.
+
+    If `min_quality` is given, assets whose `price_quality.score` is below it are
+    left out; assets that were never validated are kept.
+
+    The liquidity filters screen the universe with the precomputed
+    `asset_liquidity` table (see `src.utils.liquidity.update_liquidity`) before any
+    modeling. When either is given, only ranked assets that pass it are kept.
+
+    Parameters
+    ----------
+    min_quality : float, optional
+        Minimum data-quality score.
+    max_liquidity_rank : int, optional
+        Keep the `max_liquidity_rank` most liquid assets (rank 1 = most liquid).
+    min_dollar_volume : float, optional
+        Minimum median daily dollar volume over the liquidity window.
+    """
+    query = "SELECT m.asset_id, m.symbol FROM asset_metadata m"
+    conditions, params = ["m.is_active = 1"], []
+    if min_quality is not None:
+        query += " LEFT JOIN price_quality q ON q.asset_id = m.asset_id"
+        conditions.append("(q.score IS NULL OR q.score >= ?)")
+        params.append(float(min_quality))
+    if max_liquidity_rank is not None or min_dollar_volume is not None:
+        query += " JOIN asset_liquidity l ON l.asset_id = m.asset_id"
+        conditions.append("l.liquidity_rank IS NOT NULL")
+        if max_liquidity_rank is not None:
+            conditions.append("l.liquidity_rank <= ?")
+            params.append(int(max_liquidity_rank))
+        if min_dollar_volume is not None:
+            conditions.append("l.median_dollar_volume >= ?")
+            params.append(float(min_dollar_volume))
+
     conn = get_db_connection()
-    df = pd.read_sql("SELECT asset_id, symbol FROM asset_metadata WHERE is_active = 1", conn)
+    df = pd.read_sql(f"{query} WHERE {' AND '.join(conditions)}", conn, params=params)
     conn.close()
     return df.set_index('symbol')['asset_id'].to_dict()
 
@@ -29,6 +91,23 @@ def get_latest_price_date(symbol):
     conn.close()
     return date
 
+def fetch_latest_price_dates(conn=None):
+    """
+    Last stored price date of every asset, in one query.
+
+    Returns
+    -------
+    dict
+        {asset_id: 'YYYY-MM-DD'} for assets with at least one price row.
+    """
+    close_conn = conn is None
+    if close_conn:
+        conn = get_db_connection(print_statements=False)
+    rows = conn.execute("SELECT asset_id, MAX(date) FROM asset_prices GROUP BY asset_id").fetchall()
+    if close_conn:
+        conn.close()
+    return dict(rows)
+
 def fetch_all_asset_metadata():
     """
     Fetch all asset metadata from the asset_metadata table.
@@ -204,7 +283,13 @@ def fetch_database_stock_tickers():
     conn.close()
     return past_ticker_list
 
-def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
+def _normalize_as_of(as_of):
+    """Convert an as-of timestamp to the 'YYYY-MM-DD HH:MM:SS' format used by fetched_at."""
+    if as_of is None:
+        return None
+    return pd.Timestamp(as_of).strftime('%Y-%m-%d %H:%M:%S')
+
+def fetch_price_range(ticker, days_back, conn=None, calendar_days=False, as_of=None):
     """
     Retrieve OHLC (Open, High, Low, Close) stock price data for a given ticker symbol over a specified number of calendar or trading days.
 
@@ -221,6 +306,10 @@ def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
     calendar_days : bool, optional
         If True, fetch prices from the last `days_back` calendar days.
         If False (default), fetch prices from the last `days_back` trading days only.
+    as_of : str or datetime-like, optional
+        Point-in-time read. If given, only rows with `fetched_at <= as_of` are visible, so the
+        result is exactly what the database contained at that moment (e.g. '2025-03-28 08:00:00').
+        If None (default), all stored rows are used.
 
     Returns
     -------
@@ -252,18 +341,28 @@ def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
 
     >>> df_trading = fetch_price_range('MSFT', 30, calendar_days=False)
     >>> print(df_trading.tail())
+
+    Replay a backtest with the data that was available at 08:00 on 2025-03-28:
+
+    >>> df_as_of = fetch_price_range('MSFT', 30, as_of='2025-03-28 08:00:00')
     """
     close_conn = False
     if conn is None:
         conn = get_db_connection('assets.db')
         close_conn = True
 
+    # Point-in-time filter; served by idx_asset_prices_asset_date_fetched
+    as_of = _normalize_as_of(as_of)
+    as_of_clause = "AND fetched_at <= ?" if as_of else ""
+    as_of_params = (as_of,) if as_of else ()
+
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT MAX(date)
         FROM asset_prices
         WHERE asset_id = (SELECT asset_id FROM asset_metadata WHERE symbol = ?)
-    """, (ticker,))
+        {as_of_clause}
+    """, (ticker, *as_of_params))
     most_recent_date = cursor.fetchone()[0]
 
     if most_recent_date:
@@ -274,24 +373,26 @@ def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
             start_date_str = start_date.strftime('%Y-%m-%d')
             print(f"Querying {ticker} prices from {start_date_str} to {most_recent_date.strftime('%Y-%m-%d')}")
             
-            query = """
+            query = f"""
                 SELECT date, open, high, low, close
                 FROM asset_prices
                 WHERE asset_id = (SELECT asset_id FROM asset_metadata WHERE symbol = ?)
                 AND date >= ?
+                {as_of_clause}
                 ORDER BY date ASC
             """
-            params = (ticker, start_date_str)
+            params = (ticker, start_date_str, *as_of_params)
 
         else:
             # Fetch trading days (recent N entries ordered descending)
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT date
                 FROM asset_prices
                 WHERE asset_id = (SELECT asset_id FROM asset_metadata WHERE symbol = ?)
+                {as_of_clause}
                 ORDER BY date DESC
                 LIMIT ?
-            """, (ticker, days_back))
+            """, (ticker, *as_of_params, days_back))
             dates = cursor.fetchall()
 
             if not dates:
@@ -301,14 +402,15 @@ def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
             earliest_date = dates[-1][0]  # last row fetched is earliest date
             print(f"Querying {ticker} prices for last {days_back} trading days from {earliest_date} to {most_recent_date.strftime('%Y-%m-%d')}")
 
-            query = """
+            query = f"""
                 SELECT date, open, high, low, close
                 FROM asset_prices
                 WHERE asset_id = (SELECT asset_id FROM asset_metadata WHERE symbol = ?)
                 AND date >= ?
+                {as_of_clause}
                 ORDER BY date ASC
             """
-            params = (ticker, earliest_date)
+            params = (ticker, earliest_date, *as_of_params)
 
         price_data = pd.read_sql_query(query, conn, params=params)
         price_data['date'] = pd.to_datetime(price_data['date'])
@@ -322,6 +424,83 @@ def fetch_price_range(ticker, days_back, conn=None, calendar_days=False):
     
     return price_data
 
+def fetch_price_panel(tickers, days_back, column='close', conn=None, as_of=None):
+    """
+    Load one price column for many tickers as a dates x tickers panel.
+
+    The window is the last `days_back` distinct trading dates stored for any of the
+    requested tickers. Both queries run against the (asset_id, date, fetched_at) index.
+
+    Parameters
+    ----------
+    tickers : list of str
+        Stock ticker symbols.
+    days_back : int
+        Number of trading days to load.
+    column : {'open', 'high', 'low', 'close', 'adjusted_close', 'volume', 'trade_count', 'vwap'}, optional
+        Price column to load (default: 'close').
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+    as_of : str or datetime-like, optional
+        Point-in-time read: only rows with `fetched_at <= as_of` are visible.
+
+    Returns
+    -------
+    pd.DataFrame
+        DatetimeIndex of trading dates (ascending), one column per ticker found.
+        Missing observations are NaN.
+
+    Examples
+    --------
+    >>> panel = fetch_price_panel(['AAPL', 'MSFT'], 150, as_of='2025-03-28 08:00:00')
+    """
+    if column not in ('open', 'high', 'low', 'close', 'adjusted_close', 'volume', 'trade_count', 'vwap'):
+        raise ValueError(f"Unsupported price column: {column}")
+
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    as_of = _normalize_as_of(as_of)
+    as_of_clause = "AND ap.fetched_at <= ?" if as_of else ""
+    as_of_params = [as_of] if as_of else []
+    symbol_placeholders = ', '.join(['?'] * len(tickers))
+    asset_filter = f"ap.asset_id IN (SELECT asset_id FROM asset_metadata WHERE symbol IN ({symbol_placeholders}))"
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT DISTINCT ap.date
+        FROM asset_prices ap
+        WHERE {asset_filter}
+        {as_of_clause}
+        ORDER BY ap.date DESC
+        LIMIT ?
+    """, [*tickers, *as_of_params, days_back])
+    dates = cursor.fetchall()
+
+    if not dates:
+        if close_conn:
+            conn.close()
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='date'))
+
+    rows = pd.read_sql_query(f"""
+        SELECT am.symbol, ap.date, ap.{column} AS value
+        FROM asset_prices ap
+        JOIN asset_metadata am ON am.asset_id = ap.asset_id
+        WHERE {asset_filter}
+        AND ap.date >= ?
+        {as_of_clause}
+    """, conn, params=[*tickers, dates[-1][0], *as_of_params])
+
+    if close_conn:
+        conn.close()
+
+    panel = rows.pivot_table(index='date', columns='symbol', values='value', aggfunc='last')
+    panel.index = pd.to_datetime(panel.index)
+    panel.columns.name = None
+    return panel.sort_index()
+
 def get_stock_name(symbol: str, conn=None, db_name='assets.db', print_statements=False) -> str:
     """
     Fetch the full stock name from the asset_metadata table based on the ticker symbol.
@@ -0,0 +1,246 @@
+# src/utils/exogenous_sources.py
+
+"""
+Source adapters for exogenous series.
+
+Every adapter implements `fetch(symbol, start_date, end_date)` and returns a
+DataFrame with a 'date' column ('YYYY-MM-DD') and any of the `exogenous_vals`
+value columns ('open', 'high', 'low', 'close', 'adjusted_close'), sorted by
+date. Adapters also declare the request budget the scheduler must respect
+(`requests_per_minute`, `max_concurrency`).
+
+Adapters
+--------
+FredSource
+    FRED `series/observations` JSON API; values go to 'close'.
+
+YahooSource
+    Yahoo-style `v8/finance/chart` OHLC endpoint (futures, indices, ETFs, FX).
+
+CsvDropSource
+    `<folder>/<symbol>.csv` files dropped by hand or by external jobs, for the
+    "Other" series that have no API.
+
+`source_for(label, sources)` maps the catalog's free-text source labels
+("YFinance (~iffy ~check)", "Other (ISM ~external fetch)", ...) to an adapter.
+"""
+
+import os
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import pandas as pd
+import requests
+
+from src.config import BASE_DIR, CREDENTIALS_DIR
+
+FRED_URL = 'https://api.stlouisfed.org/fred'
+YAHOO_URL = 'https://query1.finance.yahoo.com'
+EXOGENOUS_DROP_DIR = BASE_DIR / 'data' / 'exogenous_drop'
+VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'adjusted_close']
+
+
+class SourceError(Exception):
+    """Raised when a source cannot return data for a symbol."""
+
+
+def _empty():
+    return pd.DataFrame(columns=['date', 'close'])
+
+
+class ExogenousSource(ABC):
+    """
+    Abstract base class for exogenous data adapters.
+
+    Subclasses set `name`, `requests_per_minute` and `max_concurrency` and
+    must implement `fetch`; classes that do not cannot be instantiated.
+    """
+
+    name = 'base'
+    requests_per_minute = 60
+    max_concurrency = 1
+
+    @abstractmethod
+    def fetch(self, symbol, start_date, end_date):
+        """
+        Observations for `symbol` between two inclusive 'YYYY-MM-DD' dates.
+
+        Returns
+        -------
+        pd.DataFrame
+            'date' plus value columns, sorted by date; empty if there is nothing new.
+        """
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+
+class _HttpSource(ExogenousSource):
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _get_json(self, path, params):
+        resp = self._session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        if resp.status_code != 200:
+            raise SourceError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+        return resp.json()
+
+
+def _fred_api_key():
+    key = os.environ.get('FRED_API_KEY')
+    if key:
+        return key
+    secrets_path = CREDENTIALS_DIR / '.secrets'
+    if secrets_path.exists():
+        for line in secrets_path.read_text().splitlines():
+            name, _, value = line.partition('=')
+            if name.strip() == 'FRED_API_KEY':
+                return value.strip().strip('"').strip("'")
+    return None
+
+
+class FredSource(_HttpSource):
+    """
+    FRED observations via the JSON API.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        FRED API key. Defaults to `FRED_API_KEY` from the environment or `credentials/.secrets`.
+    base_url : str, optional
+        API root (default: FRED_URL).
+    requests_per_minute : int, optional
+        FRED allows 120 requests per minute per key (default: 120).
+    """
+
+    name = 'fred'
+    max_concurrency = 4
+
+    def __init__(self, api_key=None, base_url=FRED_URL, requests_per_minute=120, timeout=30):
+        super().__init__(base_url, timeout)
+        self.api_key = api_key or _fred_api_key()
+        self.requests_per_minute = requests_per_minute
+
+    def fetch(self, symbol, start_date, end_date):
+        if not self.api_key:
+            raise SourceError("No FRED API key (set FRED_API_KEY in the environment or credentials/.secrets).")
+        payload = self._get_json('/series/observations', {
+            'series_id': symbol,
+            'api_key': self.api_key,
+            'file_type': 'json',
+            'observation_start': start_date,
+            'observation_end': end_date,
+        })
+        observations = payload.get('observations') or []
+        if not observations:
+            return _empty()
+        frame = pd.DataFrame(observations, columns=['date', 'value'])
+        # FRED marks missing observations with '.'
+        frame['close'] = pd.to_numeric(frame['value'], errors='coerce')
+        return frame.dropna(subset=['close'])[['date', 'close']].reset_index(drop=True)
+
+
+class YahooSource(_HttpSource):
+    """
+    Daily OHLC from a Yahoo-style `v8/finance/chart/{symbol}` endpoint.
+
+    Parameters
+    ----------
+    base_url : str, optional
+        API root (default: YAHOO_URL).
+    requests_per_minute : int, optional
+        Self-imposed budget; the endpoint is unofficial and throttles bursts (default: 60).
+    """
+
+    name = 'yahoo'
+    max_concurrency = 4
+
+    def __init__(self, base_url=YAHOO_URL, requests_per_minute=60, timeout=30):
+        super().__init__(base_url, timeout)
+        self.requests_per_minute = requests_per_minute
+        self._session.headers['User-Agent'] = 'Mozilla/5.0'
+
+    def fetch(self, symbol, start_date, end_date):
+        period1 = int(datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+        period2 = int(datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) + 86400
+        payload = self._get_json(f'/v8/finance/chart/{symbol}', {
+            'period1': period1, 'period2': period2, 'interval': '1d', 'events': 'history',
+        })
+        chart = payload.get('chart') or {}
+        if chart.get('error'):
+            raise SourceError(f"{chart['error'].get('code')}: {chart['error'].get('description')}")
+        result = (chart.get('result') or [None])[0]
+        if not result or not result.get('timestamp'):
+            return _empty()
+
+        tz = (result.get('meta') or {}).get('exchangeTimezoneName', 'America/New_York')
+        quote = result['indicators']['quote'][0]
+        frame = pd.DataFrame({
+            'date': pd.to_datetime(result['timestamp'], unit='s', utc=True).tz_convert(tz).strftime('%Y-%m-%d'),
+            'open': quote.get('open'),
+            'high': quote.get('high'),
+            'low': quote.get('low'),
+            'close': quote.get('close'),
+        })
+        adjclose = result['indicators'].get('adjclose')
+        if adjclose:
+            frame['adjusted_close'] = adjclose[0].get('adjclose')
+        frame = frame.dropna(subset=['close'])
+        frame = frame[(frame['date'] >= start_date) & (frame['date'] <= end_date)]
+        return frame.drop_duplicates('date', keep='last').reset_index(drop=True)
+
+
+class CsvDropSource(ExogenousSource):
+    """
+    Series delivered as `<folder>/<symbol>.csv` files.
+
+    Files need a 'date' column and either value columns named like `exogenous_vals`
+    or a single 'value' column, which is stored as 'close'. Symbols are matched
+    case-sensitively after replacing characters that are awkward in file names
+    ('/', ':', '^', '=') with '_'.
+
+    Parameters
+    ----------
+    folder : str or Path, optional
+        Drop folder (default: `data/exogenous_drop` under the project root).
+    """
+
+    name = 'csv'
+    requests_per_minute = 6000
+    max_concurrency = 4
+
+    def __init__(self, folder=None):
+        self.folder = EXOGENOUS_DROP_DIR if folder is None else folder
+
+    def path_for(self, symbol):
+        return os.path.join(self.folder, re.sub(r'[/:^=]', '_', symbol) + '.csv')
+
+    def fetch(self, symbol, start_date, end_date):
+        path = self.path_for(symbol)
+        if not os.path.exists(path):
+            raise SourceError(f"No drop file for {symbol} at {path}")
+        frame = pd.read_csv(path, dtype={'date': str})
+        if 'value' in frame.columns and 'close' not in frame.columns:
+            frame = frame.rename(columns={'value': 'close'})
+        frame['date'] = pd.to_datetime(frame['date']).dt.strftime('%Y-%m-%d')
+        columns = ['date'] + [c for c in VALUE_COLUMNS if c in frame.columns]
+        frame = frame.loc[(frame['date'] >= start_date) & (frame['date'] <= end_date), columns]
+        return frame.sort_values('date').drop_duplicates('date', keep='last').reset_index(drop=True)
+
+
+def default_sources():
+    """One adapter per catalog source family, keyed like `source_key`."""
+    return {'yfinance': YahooSource(), 'fred': FredSource(), 'other': CsvDropSource()}
+
+
+def source_key(label):
+    """Normalize a catalog source label: 'YFinance (~iffy ~check)' -> 'yfinance'."""
+    return (label or '').split('(')[0].strip().lower() or 'other'
+
+
+def source_for(label, sources):
+    """Adapter for a catalog source label, or None if no adapter is registered for it."""
+    return sources.get(source_key(label))
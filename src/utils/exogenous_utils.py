@@ -0,0 +1,349 @@
+# src/utils/exogenous_utils.py
+
+"""
+Exogenous series store and as-of joins onto the stock trading calendar.
+
+Values live in `exogenous.db` keyed on `(exog_id, date)` (unique index), so
+reloading a series is an idempotent upsert. `asof_align` maps each series onto a
+ticker's trading days: an observation dated `d` only becomes usable on
+`d + lag` (the series' publication lag in `exogenous_metadata.lag`), after which
+it is carried forward until the next observation becomes available.
+
+Functions
+---------
+fetch_exogenous_metadata(conn=None, in_use_only=False)
+    Load `exogenous_metadata`.
+
+upsert_exogenous_values(conn, exog_id, values, fetched_at=None)
+    Bulk insert or replace observations for one series.
+
+fetch_exogenous_values(exog_ids=None, start_date=None, end_date=None, column='close', conn=None)
+    Load observations in long format (exog_id, date, value).
+
+asof_align(trading_dates, obs_dates, obs_values, lag_days=0)
+    Vectorized as-of join of one series onto trading dates.
+
+exogenous_asof_matrix(trading_dates, exog_ids=None, column='close', conn=None)
+    Dates x series matrix for the given calendar, cached per calendar.
+
+fetch_exogenous_for_ticker(ticker, days_back, exog_ids=None, column='close', as_of=None)
+    Exogenous matrix aligned to the trading days of one ticker.
+"""
+
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils import ingest_telemetry
+from src.utils.db_utils import get_db_connection, fetch_price_range
+
+EXOGENOUS_DB = 'exogenous.db'
+EXOGENOUS_VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'adjusted_close']
+
+_MATRIX_CACHE = OrderedDict()
+_MATRIX_CACHE_SIZE = 32
+# Per-series write counter, so in-process caches can tell which series changed
+_SERIES_GENERATION = {}
+
+
+def fetch_exogenous_metadata(conn=None, in_use_only=False):
+    """
+    Load the exogenous series catalog.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection, optional
+        Existing connection to 'exogenous.db'. If None, one is opened and closed.
+    in_use_only : bool, optional
+        If True, only return series flagged `in_use = 1`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per series, indexed by `exog_id`.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(EXOGENOUS_DB, print_statements=False)
+        close_conn = True
+
+    query = "SELECT * FROM exogenous_metadata"
+    if in_use_only:
+        query += " WHERE in_use = 1"
+    metadata = pd.read_sql_query(query, conn).set_index('exog_id')
+
+    if close_conn:
+        conn.close()
+    return metadata
+
+
+def upsert_exogenous_values(conn, exog_id, values, fetched_at=None):
+    """
+    Insert or replace observations for one exogenous series.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to 'exogenous.db'. The caller is responsible for committing.
+    exog_id : int
+        Series identifier from `exogenous_metadata`.
+    values : pd.DataFrame
+        Rows with a 'date' column ('YYYY-MM-DD') and any of
+        'open', 'high', 'low', 'close', 'adjusted_close'.
+    fetched_at : str, optional
+        Fetch timestamp ('YYYY-MM-DD HH:MM:SS'). Defaults to now.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    if values is None or values.empty:
+        return 0
+    if fetched_at is None:
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    values = values.drop_duplicates(subset='date', keep='last')
+    columns = ['date'] + [c for c in EXOGENOUS_VALUE_COLUMNS if c in values.columns]
+    records = values[columns].astype(object).where(values[columns].notna(), None)
+    placeholders = ', '.join(['?'] * (len(columns) + 2))
+    with ingest_telemetry.stage('write'):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO exogenous_vals (exog_id, {', '.join(columns)}, fetched_at) VALUES ({placeholders})",
+            [(exog_id, *row, fetched_at) for row in records.itertuples(index=False, name=None)],
+        )
+    ingest_telemetry.count(rows=len(records))
+    _MATRIX_CACHE.clear()
+    _SERIES_GENERATION[exog_id] = _SERIES_GENERATION.get(exog_id, 0) + 1
+    return len(records)
+
+
+def series_generation(exog_id):
+    """Number of `upsert_exogenous_values` writes to `exog_id` in this process."""
+    return _SERIES_GENERATION.get(exog_id, 0)
+
+
+def fetch_exogenous_values(exog_ids=None, start_date=None, end_date=None, column='close', conn=None):
+    """
+    Load exogenous observations in long format.
+
+    Parameters
+    ----------
+    exog_ids : list of int, optional
+        Series to load. If None, all series are loaded.
+    start_date, end_date : str, optional
+        Inclusive 'YYYY-MM-DD' bounds on the observation date.
+    column : str, optional
+        Value column to load (default: 'close').
+    conn : sqlite3.Connection, optional
+        Existing connection to 'exogenous.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'exog_id', 'date' (datetime64) and 'value', sorted by series then date.
+    """
+    if column not in EXOGENOUS_VALUE_COLUMNS:
+        raise ValueError(f"Unsupported exogenous value column: {column}")
+
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(EXOGENOUS_DB, print_statements=False)
+        close_conn = True
+
+    clauses, params = [f"{column} IS NOT NULL"], []
+    if exog_ids is not None:
+        clauses.append(f"exog_id IN ({', '.join(['?'] * len(exog_ids))})")
+        params.extend(int(i) for i in exog_ids)
+    if start_date is not None:
+        clauses.append("date >= ?")
+        params.append(start_date)
+    if end_date is not None:
+        clauses.append("date <= ?")
+        params.append(end_date)
+
+    values = pd.read_sql_query(f"""
+        SELECT exog_id, date, {column} AS value
+        FROM exogenous_vals
+        WHERE {' AND '.join(clauses)}
+        ORDER BY exog_id, date
+    """, conn, params=params)
+    values['date'] = pd.to_datetime(values['date'])
+
+    if close_conn:
+        conn.close()
+    return values
+
+
+def asof_align(trading_dates, obs_dates, obs_values, lag_days=0):
+    """
+    Align one exogenous series onto trading dates with an as-of join.
+
+    For every trading date `t` the result holds the most recent observation whose
+    availability date (`obs_date + lag_days`) is on or before `t`. The join is a
+    single `np.searchsorted` over the sorted availability dates.
+
+    Parameters
+    ----------
+    trading_dates : array-like of datetime64
+        Target calendar, sorted ascending.
+    obs_dates : array-like of datetime64
+        Observation dates, sorted ascending.
+    obs_values : array-like of float
+        Observation values, same length as `obs_dates`.
+    lag_days : float, optional
+        Publication lag in calendar days (default: 0).
+
+    Returns
+    -------
+    np.ndarray
+        float64 array aligned to `trading_dates`; NaN before the first available
+        observation.
+
+    Examples
+    --------
+    >>> asof_align(pd.to_datetime(['2024-01-02', '2024-01-09']),
+    ...            pd.to_datetime(['2024-01-01']), [5.0], lag_days=7)
+    array([nan,  5.])
+    """
+    trading_dates = np.asarray(trading_dates, dtype='datetime64[ns]')
+    obs_values = np.asarray(obs_values, dtype=np.float64)
+    available = np.asarray(obs_dates, dtype='datetime64[ns]')
+    if lag_days and not np.isnan(lag_days):
+        available = available + np.timedelta64(int(round(lag_days * 86400)), 's')
+
+    positions = np.searchsorted(available, trading_dates, side='right') - 1
+    aligned = np.full(len(trading_dates), np.nan)
+    valid = positions >= 0
+    aligned[valid] = obs_values[positions[valid]]
+    return aligned
+
+
+def _store_version(conn, exog_ids):
+    """Cheap change marker for the selected series: row count and latest fetch time."""
+    query = "SELECT COUNT(*), MAX(fetched_at) FROM exogenous_vals"
+    params = []
+    if exog_ids is not None:
+        query += f" WHERE exog_id IN ({', '.join(['?'] * len(exog_ids))})"
+        params = [int(i) for i in exog_ids]
+    return tuple(conn.execute(query, params).fetchone())
+
+
+def _db_identity(conn):
+    """File path of the connection's main database; in-memory databases are per connection."""
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return path or f":memory:{id(conn)}"
+
+
+def exogenous_asof_matrix(trading_dates, exog_ids=None, column='close', conn=None):
+    """
+    Build a dates x exogenous-series matrix aligned to a trading calendar.
+
+    Each series is shifted by its configured `lag` and carried forward with
+    `asof_align`. Results are cached per database, calendar (a hash of every date),
+    series selection and store version, so repeated calls for tickers that share a
+    calendar reuse the same matrix until new values are loaded.
+
+    Parameters
+    ----------
+    trading_dates : array-like of datetime64
+        Target calendar, sorted ascending (e.g. a ticker's price dates).
+    exog_ids : list of int, optional
+        Series to include. If None, all series flagged `in_use = 1` are used.
+    column : str, optional
+        Value column to align (default: 'close').
+    conn : sqlite3.Connection, optional
+        Existing connection to 'exogenous.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Index = `trading_dates`, one float column per series (named by `exog_symbol`).
+
+    Raises
+    ------
+    ValueError
+        If an id in `exog_ids` is not in `exogenous_metadata`.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection(EXOGENOUS_DB, print_statements=False)
+        close_conn = True
+
+    trading_dates = pd.DatetimeIndex(trading_dates)
+    metadata = fetch_exogenous_metadata(conn, in_use_only=exog_ids is None)
+    if exog_ids is not None:
+        exog_ids = [int(i) for i in exog_ids]
+        missing = sorted(set(exog_ids).difference(metadata.index))
+        if missing:
+            if close_conn:
+                conn.close()
+            raise ValueError(f"Unknown exog_ids {missing}: not in exogenous_metadata.")
+        metadata = metadata.loc[exog_ids]
+    selected = tuple(int(i) for i in metadata.index)
+
+    key = (
+        _db_identity(conn),
+        hashlib.sha1(trading_dates.asi8.tobytes()).hexdigest(),
+        selected,
+        column,
+        _store_version(conn, selected),
+    )
+    if key in _MATRIX_CACHE:
+        _MATRIX_CACHE.move_to_end(key)
+        if close_conn:
+            conn.close()
+        return _MATRIX_CACHE[key].copy()
+
+    end_date = trading_dates[-1].strftime('%Y-%m-%d') if len(trading_dates) else None
+    values = fetch_exogenous_values(selected, end_date=end_date, column=column, conn=conn)
+    if close_conn:
+        conn.close()
+
+    matrix = np.full((len(trading_dates), len(selected)), np.nan)
+    grouped = {exog_id: rows for exog_id, rows in values.groupby('exog_id', sort=False)}
+    for j, exog_id in enumerate(selected):
+        rows = grouped.get(exog_id)
+        if rows is None:
+            continue
+        matrix[:, j] = asof_align(
+            trading_dates.values,
+            rows['date'].values,
+            rows['value'].values,
+            lag_days=metadata.at[exog_id, 'lag'] or 0,
+        )
+
+    result = pd.DataFrame(matrix, index=trading_dates, columns=metadata['exog_symbol'].tolist())
+    _MATRIX_CACHE[key] = result
+    if len(_MATRIX_CACHE) > _MATRIX_CACHE_SIZE:
+        _MATRIX_CACHE.popitem(last=False)
+    return result.copy()
+
+
+def fetch_exogenous_for_ticker(ticker, days_back, exog_ids=None, column='close', as_of=None):
+    """
+    Exogenous matrix aligned to the last `days_back` trading days of a ticker.
+
+    Parameters
+    ----------
+    ticker : str
+        Stock ticker symbol (e.g., 'AAPL').
+    days_back : int
+        Number of trading days.
+    exog_ids : list of int, optional
+        Series to include. If None, all in-use series.
+    column : str, optional
+        Value column to align (default: 'close').
+    as_of : str or datetime-like, optional
+        Point-in-time read of the ticker's price calendar (see `fetch_price_range`).
+
+    Returns
+    -------
+    pd.DataFrame
+        Trading dates x exogenous series.
+    """
+    prices = fetch_price_range(ticker, days_back, as_of=as_of)
+    return exogenous_asof_matrix(prices['date'], exog_ids=exog_ids, column=column)
@@ -0,0 +1,280 @@
+# src/utils/ingest_telemetry.py
+
+"""
+Structured per-run telemetry for the ETL entry points in `src/etl`.
+
+Every entry point is decorated with `ingest_job(name)`. While it runs, an
+`IngestRun` is active on the calling thread, and the shared building blocks
+report to it:
+
+- `request`: HTTP time of every request. `RequestPolicy` reports requests made
+  through the REST client, and `download_bars` reports its aiohttp requests.
+  Each sample also feeds the latency percentiles and histogram, and retries and
+  429s are counted.
+- `wait`: time held back by pacing, rate-limit pauses and retry backoff.
+- `decode`: time inside SDK calls (`api_call`) not spent in HTTP or waiting,
+  mostly parsing JSON into Python objects; JSON decoding in `download_bars`.
+- `transform`: converting payloads to frames and other pandas work before a write.
+- `write`: `insert_price_bars`, `upsert_exogenous_values`, other bulk upserts
+  and commits.
+
+Stage seconds are summed over threads and concurrent requests, so with
+concurrency they can add up to more than the wall time (`total_seconds`).
+When the job returns (or raises), the run is stored in `ingest_runs` in the
+database the job writes to (its `conn`, or a new connection to `db_name`) and a
+short summary is printed. Nested entry points (e.g. `populate_prices` calling
+`run_backfill`) report to the outer run on the same thread; a job started on
+another thread gets and records its own run. Helper threads that did not start
+a job themselves (request pools, `to_thread` workers) report to the most
+recently started run.
+
+Reporting helpers (`observe`, `count`, `stage`, `api_call`) do almost nothing
+when no run is active, so library code can call them unconditionally.
+
+Examples
+--------
+>>> update_daily_prices()
+[update_daily_prices] ok in 6.2 s: 5012 items, 5012 rows (808 rows/s), 26 requests, 1 retries, 0 throttled
+  stages:  request 4.10 s | wait 0.00 s | decode 0.62 s | transform 0.35 s | write 0.71 s
+  latency: p50 0.152 s | p90 0.210 s | p99 0.480 s | max 0.512 s
+>>> fetch_ingest_runs(job='update_daily_prices', limit=5)
+"""
+
+import functools
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection, ensure_schema
+
+STAGES = ('request', 'wait', 'decode', 'transform', 'write')
+COUNTERS = ('items', 'rows', 'requests', 'retries', 'throttled')
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_active_runs = []  # runs in progress, oldest first
+_active_lock = threading.Lock()
+_thread_state = threading.local()  # .run: the run started on this thread; .io_seconds
+
+
+class IngestRun:
+    """
+    Stage timings, counters and request latencies of one ingest job run.
+
+    Parameters
+    ----------
+    job : str
+        Job name stored in `ingest_runs.job`.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.status = 'running'
+        self.error = None
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.latencies = []
+        self._start = time.perf_counter()
+        self._total = None
+        self._lock = threading.Lock()
+
+    def observe(self, stage_name, seconds):
+        """Add `seconds` to a stage; request samples also feed the latency statistics."""
+        with self._lock:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+            if stage_name == 'request':
+                self.latencies.append(seconds)
+
+    def count(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def finish(self, status='ok', error=None):
+        self.status = status
+        self.error = None if error is None else f"{type(error).__name__}: {error}"
+        self._total = time.perf_counter() - self._start
+
+    def summary(self):
+        """The run as one `ingest_runs` row (dict)."""
+        with self._lock:
+            latencies = np.asarray(self.latencies, dtype=np.float64)
+            stages, counters = dict(self.stages), dict(self.counters)
+        total = self._total if self._total is not None else time.perf_counter() - self._start
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (None, None, None)
+        histogram = np.bincount(np.searchsorted(LATENCY_BUCKETS, latencies, side='left'),
+                                minlength=len(LATENCY_BUCKETS) + 1)
+        return {
+            'job': self.job, 'started_at': self.started_at, 'status': self.status, 'error': self.error,
+            **counters,
+            **{f'{name}_seconds': stages[name] for name in STAGES},
+            'total_seconds': total,
+            'rows_per_second': counters['rows'] / total if total > 0 else 0.0,
+            'latency_p50': p50, 'latency_p90': p90, 'latency_p99': p99,
+            'latency_max': float(latencies.max()) if len(latencies) else None,
+            'latency_histogram': json.dumps(dict(zip([f'<={b:g}' for b in LATENCY_BUCKETS] + ['>10'],
+                                                     histogram.tolist()))),
+        }
+
+    def report(self):
+        """Printable three-line summary."""
+        s = self.summary()
+        lines = [
+            f"[{s['job']}] {s['status']} in {s['total_seconds']:.1f} s: {s['items']} items, {s['rows']} rows "
+            f"({s['rows_per_second']:.0f} rows/s), {s['requests']} requests, {s['retries']} retries, "
+            f"{s['throttled']} throttled",
+            "  stages:  " + " | ".join(f"{name} {s[f'{name}_seconds']:.2f} s" for name in STAGES),
+        ]
+        if s['latency_max'] is not None:
+            lines.append("  latency: " + " | ".join(
+                f"{name} {s[f'latency_{name}']:.3f} s" for name in ('p50', 'p90', 'p99', 'max')))
+        if s['error']:
+            lines.append(f"  error:   {s['error']}")
+        return "\n".join(lines)
+
+
+def current_run():
+    """The `IngestRun` of this thread's job, else the latest run in progress, or None."""
+    run = getattr(_thread_state, 'run', None)
+    if run is None and _active_runs:
+        with _active_lock:
+            run = _active_runs[-1] if _active_runs else None
+    return run
+
+
+def observe(stage_name, seconds):
+    """Report stage time to the active run (no-op without one)."""
+    if stage_name in ('request', 'wait'):
+        _thread_state.io_seconds = getattr(_thread_state, 'io_seconds', 0.0) + seconds
+    run = current_run()
+    if run is not None:
+        run.observe(stage_name, seconds)
+
+
+def count(**counters):
+    """Add to counters of the active run (no-op without one)."""
+    run = current_run()
+    if run is not None:
+        run.count(**counters)
+
+
+@contextmanager
+def stage(stage_name):
+    """Time the block as `stage_name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - start)
+
+
+@contextmanager
+def api_call():
+    """Time an SDK call; the part not spent in requests or waits (JSON decoding) is recorded as 'decode'."""
+    start = time.perf_counter()
+    before = getattr(_thread_state, 'io_seconds', 0.0)
+    try:
+        yield
+    finally:
+        io = getattr(_thread_state, 'io_seconds', 0.0) - before
+        observe('decode', max(time.perf_counter() - start - io, 0.0))
+
+
+def record_ingest_run(run, conn=None, db_name='assets.db'):
+    """Append `run` to `ingest_runs`; returns its run_id."""
+    close_conn = conn is None
+    if close_conn:
+        conn = get_db_connection(db_name, print_statements=False)
+    ensure_schema(conn, db_name)
+    row = run.summary()
+    cursor = conn.execute(f"INSERT INTO ingest_runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                          [float(v) if isinstance(v, np.floating) else v for v in row.values()])
+    conn.commit()
+    if close_conn:
+        conn.close()
+    return cursor.lastrowid
+
+
+def fetch_ingest_runs(job=None, limit=20, conn=None, db_name='assets.db'):
+    """
+    Latest runs from `ingest_runs`, newest first.
+
+    Parameters
+    ----------
+    job : str, optional
+        Only runs of this job.
+    limit : int, optional
+        Maximum rows (default: 20).
+    conn : sqlite3.Connection, optional
+        Connection to `db_name`. If None, one is opened and closed.
+    db_name : str, optional
+        Database holding the runs (default: 'assets.db').
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per run.
+    """
+    close_conn = conn is None
+    if close_conn:
+        conn = get_db_connection(db_name, print_statements=False)
+    ensure_schema(conn, db_name)
+    query, params = "SELECT * FROM ingest_runs", []
+    if job is not None:
+        query += " WHERE job = ?"
+        params.append(job)
+    runs = pd.read_sql_query(query + " ORDER BY run_id DESC LIMIT ?", conn, params=[*params, limit])
+    if close_conn:
+        conn.close()
+    return runs
+
+
+def ingest_job(job, db_name='assets.db'):
+    """
+    Decorator: record telemetry for every call of an ETL entry point.
+
+    Parameters
+    ----------
+    job : str
+        Name stored with each run.
+    db_name : str, optional
+        Database the job writes to. The run is stored through the call's `conn`
+        argument when one is given, otherwise through a new connection to it.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_thread_state, 'run', None) is not None:
+                return func(*args, **kwargs)
+            run = _thread_state.run = IngestRun(job)
+            with _active_lock:
+                _active_runs.append(run)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                run.finish('failed', e)
+                raise
+            else:
+                run.finish('ok')
+            finally:
+                _thread_state.run = None
+                with _active_lock:
+                    _active_runs.remove(run)
+                conn = signature.bind_partial(*args, **kwargs).arguments.get('conn')
+                try:
+                    record_ingest_run(run, conn=conn, db_name=db_name)
+                except sqlite3.Error as e:
+                    print(f"Could not record ingest run for '{job}': {e}")
+                print(run.report())
+            return result
+        return wrapper
+    return decorate
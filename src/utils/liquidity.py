@@ -0,0 +1,141 @@
+# src/utils/liquidity.py
+
+"""
+Precomputed liquidity of every asset, used to cut the universe before modeling.
+
+`update_liquidity` reads the last `window` trading dates of `asset_prices` in one
+query and stores, per asset, its rolling dollar volume (volume x VWAP, or x close
+where VWAP is missing), average volume and trade count, and a rank by median
+dollar volume (1 = most liquid) in `asset_liquidity`. Missing days count as zero
+volume in the averages, so stale and newly listed tickers rank low, and assets
+with fewer than `min_days` observations get no rank at all.
+
+Screening uses the table through `fetch_active_tickers(max_liquidity_rank=...,
+min_dollar_volume=...)`, so illiquid tickers never reach ARIMAX fitting or MCMC.
+`update_daily_prices` refreshes it after every update that writes rows.
+
+Functions
+---------
+update_liquidity(window=20, min_days=None, conn=None)
+    Recompute `asset_liquidity` from the stored prices.
+
+fetch_liquidity(top_n=None, min_dollar_volume=None, conn=None)
+    Liquidity of ranked assets, most liquid first.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection, ensure_schema
+
+LIQUIDITY_WINDOW = 20
+LIQUIDITY_COLUMNS = ['asset_id', 'last_date', 'window', 'days', 'median_dollar_volume', 'avg_dollar_volume',
+                     'avg_volume', 'avg_trade_count', 'liquidity_rank', 'updated_at']
+
+
+def update_liquidity(window=LIQUIDITY_WINDOW, min_days=None, conn=None):
+    """
+    Recompute `asset_liquidity` over the last `window` trading dates.
+
+    Parameters
+    ----------
+    window : int, optional
+        Trading dates in the rolling window (default: 20).
+    min_days : int, optional
+        Observations an asset needs within the window to be ranked
+        (default: half the window).
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        The new table contents, one row per asset with volume in the window.
+    """
+    if min_days is None:
+        min_days = max(window // 2, 1)
+    close_conn = conn is None
+    if close_conn:
+        conn = get_db_connection('assets.db', print_statements=False)
+    ensure_schema(conn)
+
+    cutoff = conn.execute("SELECT DISTINCT date FROM asset_prices ORDER BY date DESC LIMIT 1 OFFSET ?",
+                          (window - 1,)).fetchone()
+    rows = pd.read_sql_query("""
+        SELECT asset_id, date, volume, trade_count, volume * COALESCE(vwap, close) AS dollar_volume
+        FROM asset_prices
+        WHERE date >= ? AND volume IS NOT NULL
+    """, conn, params=(cutoff[0] if cutoff else '',))
+
+    grouped = rows.groupby('asset_id')
+    liquidity = pd.DataFrame({
+        'last_date': grouped['date'].max(),
+        'window': window,
+        'days': grouped['date'].nunique(),
+        'median_dollar_volume': grouped['dollar_volume'].median(),
+        'avg_dollar_volume': grouped['dollar_volume'].sum() / window,
+        'avg_volume': grouped['volume'].sum() / window,
+        'avg_trade_count': grouped['trade_count'].sum(min_count=1) / window,
+    })
+    ranked = liquidity['days'] >= min_days
+    liquidity['liquidity_rank'] = (liquidity['median_dollar_volume'].where(ranked)
+                                   .rank(ascending=False, method='first').astype('Int64'))
+    liquidity['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    liquidity = liquidity.reset_index()[LIQUIDITY_COLUMNS]
+
+    records = liquidity.astype(object).where(liquidity.notna(), None)
+    with conn:
+        conn.execute("DELETE FROM asset_liquidity")
+        conn.executemany(
+            f"INSERT INTO asset_liquidity ({', '.join(LIQUIDITY_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(LIQUIDITY_COLUMNS))})",
+            [tuple(int(v) if isinstance(v, np.integer) else v for v in row)
+             for row in records.itertuples(index=False, name=None)],
+        )
+    if close_conn:
+        conn.close()
+    return liquidity
+
+
+def fetch_liquidity(top_n=None, min_dollar_volume=None, conn=None):
+    """
+    Ranked assets from `asset_liquidity`, most liquid first.
+
+    Parameters
+    ----------
+    top_n : int, optional
+        Only the `top_n` most liquid assets.
+    min_dollar_volume : float, optional
+        Only assets whose median daily dollar volume is at least this much.
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by `asset_id`, with 'symbol' and the `asset_liquidity` columns.
+    """
+    close_conn = conn is None
+    if close_conn:
+        conn = get_db_connection('assets.db', print_statements=False)
+    ensure_schema(conn)
+
+    query, params = """
+        SELECT m.symbol, l.*
+        FROM asset_liquidity l
+        JOIN asset_metadata m ON m.asset_id = l.asset_id
+        WHERE l.liquidity_rank IS NOT NULL
+    """, []
+    if top_n is not None:
+        query += " AND l.liquidity_rank <= ?"
+        params.append(int(top_n))
+    if min_dollar_volume is not None:
+        query += " AND l.median_dollar_volume >= ?"
+        params.append(float(min_dollar_volume))
+    liquidity = pd.read_sql_query(query + " ORDER BY l.liquidity_rank", conn, params=params).set_index('asset_id')
+
+    if close_conn:
+        conn.close()
+    return liquidity
@@ -0,0 +1,158 @@
+# src/utils/market_calendar.py
+
+"""
+Exchange trading calendar backed by Alpaca's `/v2/calendar` endpoint.
+
+Sessions (date, open and close in exchange local time, America/New_York) are
+cached in the `market_calendar` table of 'assets.db', and the downloaded date
+range in `market_calendar_coverage`, so the API is only called for date ranges
+that have not been seen before.
+
+Functions
+---------
+fetch_alpaca_calendar(alpaca_client, start_date, end_date)
+    Download sessions from Alpaca.
+
+load_trading_calendar(start_date, end_date, alpaca_client=None, conn=None)
+    Sessions between two dates, served from the cache and topped up from Alpaca.
+
+session_bounds(date=None, alpaca_client=None, conn=None)
+    DST-correct open and close of one session, in UTC.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection
+
+EXCHANGE_TIMEZONE = 'America/New_York'
+
+
+def fetch_alpaca_calendar(alpaca_client, start_date, end_date):
+    """
+    Download trading sessions from Alpaca.
+
+    Parameters
+    ----------
+    alpaca_client : REST
+        Initialized Alpaca REST client.
+    start_date, end_date : str
+        Inclusive range in 'YYYY-MM-DD' format.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'date' ('YYYY-MM-DD'), 'open' and 'close' ('HH:MM', exchange local time).
+    """
+    sessions = alpaca_client.get_calendar(start=start_date, end=end_date)
+    records = [getattr(session, '_raw', session) for session in sessions]
+    return pd.DataFrame(
+        [(r['date'], r['open'], r['close']) for r in records],
+        columns=['date', 'open', 'close'],
+    )
+
+
+def load_trading_calendar(start_date, end_date, alpaca_client=None, conn=None):
+    """
+    Return the trading sessions between two dates.
+
+    Cached sessions are read from `market_calendar`. If the cache does not cover the
+    requested range and `alpaca_client` is given, the range is downloaded and stored.
+
+    Parameters
+    ----------
+    start_date, end_date : str
+        Inclusive range in 'YYYY-MM-DD' format.
+    alpaca_client : REST, optional
+        Client used to fill the cache. If None, only cached sessions are returned.
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'date' ('YYYY-MM-DD'), 'open', 'close', sorted by date.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    # Requested range already downloaded (sessions alone can't tell: weekends/holidays at the edges)
+    coverage = conn.execute("SELECT start_date, end_date FROM market_calendar_coverage").fetchone()
+    cached_start, cached_end = coverage if coverage else (None, None)
+    covered = cached_start is not None and cached_start <= start_date and cached_end >= end_date
+    if not covered and alpaca_client is not None:
+        # Fetch the union with the cached range so the cache never has holes
+        fetch_start = min(start_date, cached_start) if cached_start else start_date
+        fetch_end = max(end_date, cached_end) if cached_end else end_date
+        sessions = fetch_alpaca_calendar(alpaca_client, fetch_start, fetch_end)
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.executemany(
+            "INSERT OR REPLACE INTO market_calendar (date, open, close, fetched_at) VALUES (?, ?, ?, ?)",
+            [(*row, fetched_at) for row in sessions.itertuples(index=False, name=None)],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO market_calendar_coverage (coverage_id, start_date, end_date) VALUES (1, ?, ?)",
+            (fetch_start, fetch_end),
+        )
+        conn.commit()
+
+    calendar = pd.read_sql_query("""
+        SELECT date, open, close FROM market_calendar
+        WHERE date BETWEEN ? AND ?
+        ORDER BY date
+    """, conn, params=(start_date, end_date))
+
+    if close_conn:
+        conn.close()
+    return calendar
+
+
+def session_bounds(date=None, alpaca_client=None, conn=None):
+    """
+    Open and close of one trading session as tz-aware UTC timestamps.
+
+    Session times come from the calendar (so early closes are respected) and are
+    localized in America/New_York, which makes them correct on both sides of a
+    daylight saving change. If the calendar has no entry for the date and cannot be
+    filled, regular hours (09:30-16:00) are assumed on weekdays.
+
+    Parameters
+    ----------
+    date : str, optional
+        Session date 'YYYY-MM-DD' (default: today in New York).
+    alpaca_client : REST, optional
+        Client used to fill the calendar cache.
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    tuple of pd.Timestamp or None
+        (open, close) in UTC, or None if the market is closed that day.
+    """
+    if date is None:
+        date = pd.Timestamp.now(tz=EXCHANGE_TIMEZONE).strftime('%Y-%m-%d')
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    calendar = load_trading_calendar(date, date, alpaca_client=alpaca_client, conn=conn)
+    coverage = conn.execute("SELECT start_date, end_date FROM market_calendar_coverage").fetchone()
+    covered = coverage is not None and coverage[0] <= date <= coverage[1]
+    if close_conn:
+        conn.close()
+
+    if not calendar.empty:
+        open_time, close_time = calendar.iloc[0][['open', 'close']]
+    elif covered or pd.Timestamp(date).dayofweek >= 5:
+        return None
+    else:
+        open_time, close_time = '09:30', '16:00'
+    return tuple(
+        pd.Timestamp(f"{date} {t}").tz_localize(EXCHANGE_TIMEZONE).tz_convert('UTC')
+        for t in (open_time, close_time)
+    )
@@ -0,0 +1,299 @@
+# src/utils/price_store.py
+
+"""
+Write path for `asset_prices` and per-ticker data fingerprints.
+
+Every price write goes through `insert_price_bars`, which skips dates already
+stored for the asset and keeps a running fingerprint (last date, row count and an
+additive row checksum) in the `price_fingerprints` table. Downstream caches in
+`src/statistics` and `src/models` can key their results on `get_price_fingerprint`
+and only recompute when a ticker's input window actually changed.
+
+Functions
+---------
+row_checksums(bars)
+    Stable 64-bit checksum of each (date, open, high, low, close) row.
+
+insert_price_bars(conn, asset_id, bars, fetched_at=None, validate=True)
+    Validate and insert new daily bars for one asset and update its fingerprint.
+
+get_price_fingerprint(asset_id, window=None, conn=None)
+    Fingerprint of an asset's full history or of its last `window` rows.
+
+rebuild_price_fingerprints(conn=None)
+    Recompute every stored fingerprint from `asset_prices`.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils import ingest_telemetry
+from src.utils.db_utils import get_db_connection
+from src.utils.price_validation import load_price_context, validate_price_bars, record_price_quality
+
+CHECKSUM_COLUMNS = ['date', 'open', 'high', 'low', 'close']
+OPTIONAL_PRICE_COLUMNS = ['adjusted_close', 'volume', 'trade_count', 'vwap']
+
+PriceFingerprint = namedtuple(
+    'PriceFingerprint', ['asset_id', 'window', 'last_date', 'row_count', 'checksum']
+)
+
+_UINT64_MOD = 1 << 64
+
+
+def _to_signed(value):
+    """Map an unsigned 64-bit checksum onto SQLite's signed INTEGER range."""
+    value = int(value) % _UINT64_MOD
+    return value - _UINT64_MOD if value >= (1 << 63) else value
+
+
+def row_checksums(bars):
+    """
+    Compute a stable 64-bit checksum for each price row.
+
+    Parameters
+    ----------
+    bars : pd.DataFrame
+        Rows with 'date' ('YYYY-MM-DD' strings) and 'open', 'high', 'low', 'close'.
+
+    Returns
+    -------
+    np.ndarray
+        uint64 checksum per row. Checksums are additive, so the checksum of a set of
+        rows is the sum of its row checksums modulo 2**64.
+    """
+    frame = pd.DataFrame({
+        'date': bars['date'].astype(str).to_numpy(),
+        'open': bars['open'].to_numpy(dtype=np.float64),
+        'high': bars['high'].to_numpy(dtype=np.float64),
+        'low': bars['low'].to_numpy(dtype=np.float64),
+        'close': bars['close'].to_numpy(dtype=np.float64),
+    })
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+def _combine_checksums(checksums, start=0):
+    total = int(start) % _UINT64_MOD
+    # Python ints avoid silent uint64 overflow warnings in np.sum
+    for value in checksums.tolist():
+        total = (total + value) % _UINT64_MOD
+    return _to_signed(total)
+
+
+def _fingerprint_from_rows(asset_id, window, rows):
+    if rows.empty:
+        return PriceFingerprint(asset_id, window, None, 0, 0)
+    return PriceFingerprint(
+        asset_id,
+        window,
+        rows['date'].max(),
+        len(rows),
+        _combine_checksums(row_checksums(rows)),
+    )
+
+
+def _read_price_rows(conn, asset_id, window=None):
+    query = """
+        SELECT date, open, high, low, close
+        FROM asset_prices
+        WHERE asset_id = ?
+        ORDER BY date DESC
+    """
+    params = [asset_id]
+    if window is not None:
+        query += " LIMIT ?"
+        params.append(int(window))
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def insert_price_bars(conn, asset_id, bars, fetched_at=None, validate=True):
+    """
+    Insert daily bars for one asset, skipping dates that are already stored.
+
+    New rows are validated first (see `src.utils.price_validation`): rows that
+    fail a check go to `price_quarantine` instead of `asset_prices`, and the
+    asset's `price_quality` counters are updated. The asset's fingerprint in
+    `price_fingerprints` is updated in the same transaction. The caller is
+    responsible for committing.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to 'assets.db'.
+    asset_id : int
+        Asset identifier from `asset_metadata`.
+    bars : pd.DataFrame
+        Rows with 'date', 'open', 'high', 'low', 'close' and optionally
+        'adjusted_close', 'volume', 'trade_count' and 'vwap'.
+    fetched_at : str, optional
+        Fetch timestamp ('YYYY-MM-DD HH:MM:SS'). Defaults to now.
+    validate : bool, optional
+        Run the data-quality checks before writing (default: True).
+
+    Returns
+    -------
+    int
+        Number of rows inserted. Zero means the asset's fingerprint is unchanged.
+    """
+    with ingest_telemetry.stage('write'):
+        rows = _insert_new_bars(conn, asset_id, bars, fetched_at, validate)
+    ingest_telemetry.count(rows=rows)
+    return rows
+
+
+def _insert_new_bars(conn, asset_id, bars, fetched_at, validate):
+    if bars is None or bars.empty:
+        return 0
+    if fetched_at is None:
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT date FROM asset_prices
+        WHERE asset_id = ? AND date BETWEEN ? AND ?
+    """, (asset_id, bars['date'].min(), bars['date'].max()))
+    existing_dates = {row[0] for row in cursor.fetchall()}
+    new_bars = bars[~bars['date'].isin(existing_dates)]
+    if new_bars.empty:
+        return 0
+
+    if validate:
+        checked = len(new_bars)
+        context = load_price_context(conn, asset_id, new_bars['date'])
+        new_bars, rejected = validate_price_bars(new_bars, context)
+        record_price_quality(conn, asset_id, checked, rejected, fetched_at)
+        if new_bars.empty:
+            return 0
+    else:
+        new_bars = new_bars.drop_duplicates(subset='date', keep='last')
+
+    columns = CHECKSUM_COLUMNS + [c for c in OPTIONAL_PRICE_COLUMNS if c in new_bars.columns]
+    records = new_bars[columns].astype(object).where(new_bars[columns].notna(), None)
+    placeholders = ', '.join(['?'] * (len(columns) + 2))
+    cursor.executemany(
+        f"INSERT INTO asset_prices (asset_id, {', '.join(columns)}, fetched_at) VALUES ({placeholders})",
+        [(asset_id, *row, fetched_at) for row in records.itertuples(index=False, name=None)],
+    )
+
+    cursor.execute(
+        "SELECT last_date, row_count, checksum FROM price_fingerprints WHERE asset_id = ?",
+        (asset_id,),
+    )
+    previous = cursor.fetchone()
+    if previous is None:
+        # First write tracked for this asset: fingerprint whatever is stored now
+        fingerprint = _fingerprint_from_rows(asset_id, None, _read_price_rows(conn, asset_id))
+    else:
+        last_date, row_count, checksum = previous
+        new_last = new_bars['date'].max()
+        fingerprint = PriceFingerprint(
+            asset_id,
+            None,
+            max(last_date, new_last) if last_date else new_last,
+            row_count + len(new_bars),
+            _combine_checksums(row_checksums(new_bars), start=checksum),
+        )
+
+    cursor.execute("""
+        INSERT OR REPLACE INTO price_fingerprints (asset_id, last_date, row_count, checksum, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (asset_id, fingerprint.last_date, fingerprint.row_count, fingerprint.checksum, fetched_at))
+    return len(new_bars)
+
+
+def get_price_fingerprint(asset_id, window=None, conn=None):
+    """
+    Return the fingerprint of an asset's price history.
+
+    Parameters
+    ----------
+    asset_id : int
+        Asset identifier from `asset_metadata`.
+    window : int, optional
+        If given, fingerprint only the most recent `window` rows (the input window
+        of a smoother or model). If None (default), return the full-history
+        fingerprint maintained at write time.
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    PriceFingerprint
+        Hashable `(asset_id, window, last_date, row_count, checksum)` tuple, suitable
+        as a cache key. An unchanged fingerprint means the input rows are unchanged.
+
+    Examples
+    --------
+    >>> key = get_price_fingerprint(42, window=150)
+    >>> if key not in smooth_cache:
+    ...     smooth_cache[key] = smooth_lowess(prices)
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    fingerprint = None
+    if window is None:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT last_date, row_count, checksum FROM price_fingerprints WHERE asset_id = ?",
+            (asset_id,),
+        )
+        stored = cursor.fetchone()
+        if stored is not None:
+            fingerprint = PriceFingerprint(asset_id, None, *stored)
+
+    if fingerprint is None:
+        fingerprint = _fingerprint_from_rows(asset_id, window, _read_price_rows(conn, asset_id, window))
+
+    if close_conn:
+        conn.close()
+    return fingerprint
+
+
+def rebuild_price_fingerprints(conn=None):
+    """
+    Recompute all full-history fingerprints from `asset_prices`.
+
+    Only needed for databases populated before fingerprints were tracked, or after
+    rows were edited outside `insert_price_bars`.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    int
+        Number of assets fingerprinted.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    prices = pd.read_sql_query(
+        "SELECT asset_id, date, open, high, low, close FROM asset_prices", conn
+    )
+    updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    records = []
+    for asset_id, rows in prices.groupby('asset_id', sort=False):
+        fp = _fingerprint_from_rows(int(asset_id), None, rows)
+        records.append((fp.asset_id, fp.last_date, fp.row_count, fp.checksum, updated_at))
+
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM price_fingerprints")
+    cursor.executemany("""
+        INSERT INTO price_fingerprints (asset_id, last_date, row_count, checksum, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, records)
+    conn.commit()
+
+    if close_conn:
+        conn.close()
+    return len(records)
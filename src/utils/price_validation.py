@@ -0,0 +1,206 @@
+# src/utils/price_validation.py
+
+"""
+Data-quality checks for daily bars, run on each batch before it is written.
+
+`insert_price_bars` validates every batch of new rows. Rows that fail a check
+are kept out of `asset_prices` and stored in `price_quarantine` together with
+the reasons. Per-asset counters and a quality score go to `price_quality`, so
+screening can drop unreliable series with one indexed read
+(`fetch_quality_scores`, or `fetch_active_tickers(min_quality=...)`).
+
+Checks (all vectorized over the batch)
+--------------------------------------
+nonpositive
+    Any of open/high/low/close missing, zero or negative, or a negative volume.
+ohlc
+    high < low, or open/close outside [low, high].
+duplicate
+    Repeated date within the batch; the last occurrence is kept.
+outlier
+    Close jumps by more than `max_ratio` against the median of the previous
+    `window` closes, and the next close jumps back by more than `max_ratio`
+    (a one-bar spike). Stored rows around the batch are used as context.
+    Persistent level shifts such as an unadjusted split are not flagged, and
+    neither is the last row of a batch when no later close exists to confirm it.
+
+The quality score is `1 - rows_quarantined / rows_checked` over all batches
+written for the asset.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils.db_utils import get_db_connection
+
+QUALITY_CHECKS = ['nonpositive', 'ohlc', 'duplicate', 'outlier']
+MAX_RETURN_RATIO = 10.0
+OUTLIER_WINDOW = 5
+
+
+def validate_price_bars(bars, context=None, max_ratio=MAX_RETURN_RATIO, window=OUTLIER_WINDOW):
+    """
+    Split a batch of daily bars into clean and rejected rows.
+
+    Parameters
+    ----------
+    bars : pd.DataFrame
+        Rows with 'date', 'open', 'high', 'low', 'close' and optionally 'volume'.
+    context : pd.DataFrame, optional
+        Already stored ('date', 'close') rows around the batch, used as the reference
+        for the outlier check. Assumed clean.
+    max_ratio : float, optional
+        Jump factor that counts as a spike (default: 10, i.e. x10 or /10).
+    window : int, optional
+        Number of previous closes whose median is the spike reference (default: 5).
+
+    Returns
+    -------
+    clean : pd.DataFrame
+        Rows that passed every check, one per date, in input order.
+    rejected : pd.DataFrame
+        Failed rows with a 'reasons' column (comma-separated names from QUALITY_CHECKS).
+    """
+    bars = bars.reset_index(drop=True)
+    prices = bars[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64)
+    o, h, l, c = prices.T
+
+    with np.errstate(invalid='ignore'):
+        nonpositive = ~(np.isfinite(prices) & (prices > 0)).all(axis=1)
+        if 'volume' in bars.columns:
+            nonpositive |= bars['volume'].to_numpy(dtype=np.float64) < 0
+        ohlc = (h < l) | (h < np.maximum(o, c)) | (l > np.minimum(o, c))
+    duplicate = bars['date'].duplicated(keep='last').to_numpy()
+    outlier = np.zeros(len(bars), dtype=bool)
+
+    candidates = np.flatnonzero(~(nonpositive | ohlc | duplicate))
+    if len(candidates):
+        series = pd.DataFrame({'date': bars['date'].to_numpy()[candidates], 'close': c[candidates], 'row': candidates})
+        if context is not None and not context.empty:
+            series = pd.concat([series, context[['date', 'close']].assign(row=-1)], ignore_index=True)
+        series = series.sort_values('date', kind='stable')
+        closes = series['close'].to_numpy(dtype=np.float64)
+        reference = pd.Series(closes).rolling(window, min_periods=1).median().shift(1).to_numpy()
+        following = np.append(closes[1:], np.nan)
+        limit = np.log(max_ratio)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spike = (np.abs(np.log(closes / reference)) > limit) & (np.abs(np.log(closes / following)) > limit)
+        rows = series['row'].to_numpy()
+        outlier[rows[spike & (rows >= 0)]] = True
+
+    flags = np.column_stack([nonpositive, ohlc, duplicate, outlier])
+    bad = flags.any(axis=1)
+    rejected = bars[bad].copy()
+    rejected['reasons'] = [
+        ','.join(name for name, hit in zip(QUALITY_CHECKS, row) if hit) for row in flags[bad]
+    ]
+    return bars[~bad], rejected
+
+
+def load_price_context(conn, asset_id, dates, window=OUTLIER_WINDOW):
+    """Stored closes around a batch: `window` rows before it, every row inside it and the next one after."""
+    first, last = dates.min(), dates.max()
+    before = pd.read_sql_query("""
+        SELECT date, close FROM asset_prices
+        WHERE asset_id = ? AND date < ?
+        ORDER BY date DESC LIMIT ?
+    """, conn, params=(asset_id, first, window))
+    inside = pd.read_sql_query("""
+        SELECT date, close FROM asset_prices
+        WHERE asset_id = ? AND date >= ?
+          AND date <= COALESCE((SELECT MIN(date) FROM asset_prices WHERE asset_id = ? AND date > ?), ?)
+    """, conn, params=(asset_id, first, asset_id, last, last))
+    return pd.concat([before, inside], ignore_index=True)
+
+
+def record_price_quality(conn, asset_id, rows_checked, rejected, fetched_at=None):
+    """
+    Quarantine rejected rows and update the asset's quality counters.
+
+    The caller is responsible for committing.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to 'assets.db'.
+    asset_id : int
+        Asset identifier from `asset_metadata`.
+    rows_checked : int
+        Number of rows validated in this batch (clean and rejected).
+    rejected : pd.DataFrame
+        Rejected rows as returned by `validate_price_bars`.
+    fetched_at : str, optional
+        Fetch timestamp ('YYYY-MM-DD HH:MM:SS'). Defaults to now.
+    """
+    if rows_checked == 0:
+        return
+    if fetched_at is None:
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    if not rejected.empty:
+        columns = ['date', 'open', 'high', 'low', 'close', 'volume', 'reasons']
+        records = rejected.reindex(columns=columns).astype(object)
+        records = records.where(records.notna(), None)
+        conn.executemany("""
+            INSERT OR REPLACE INTO price_quarantine
+                (asset_id, date, open, high, low, close, volume, reasons, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(asset_id, *row, fetched_at) for row in records.itertuples(index=False, name=None)])
+
+    reasons = rejected['reasons'].str.split(',').explode().value_counts() if not rejected.empty else pd.Series(dtype=int)
+    counts = [int(reasons.get(name, 0)) for name in QUALITY_CHECKS]
+    last_issue = rejected['date'].max() if not rejected.empty else None
+    conn.execute("""
+        INSERT INTO price_quality (
+            asset_id, rows_checked, rows_quarantined, nonpositive_issues, ohlc_issues,
+            duplicate_issues, outlier_issues, score, last_issue_date, updated_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, 1.0 - CAST(? AS REAL) / ?, ?, ?)
+        ON CONFLICT (asset_id) DO UPDATE SET
+            rows_checked = rows_checked + excluded.rows_checked,
+            rows_quarantined = rows_quarantined + excluded.rows_quarantined,
+            nonpositive_issues = nonpositive_issues + excluded.nonpositive_issues,
+            ohlc_issues = ohlc_issues + excluded.ohlc_issues,
+            duplicate_issues = duplicate_issues + excluded.duplicate_issues,
+            outlier_issues = outlier_issues + excluded.outlier_issues,
+            score = 1.0 - CAST(rows_quarantined + excluded.rows_quarantined AS REAL)
+                / (rows_checked + excluded.rows_checked),
+            last_issue_date = NULLIF(MAX(COALESCE(last_issue_date, ''), COALESCE(excluded.last_issue_date, '')), ''),
+            updated_at = excluded.updated_at
+    """, (asset_id, rows_checked, len(rejected), *counts, len(rejected), rows_checked, last_issue, fetched_at))
+
+
+def fetch_quality_scores(min_score=None, conn=None):
+    """
+    Per-asset data-quality scores.
+
+    Parameters
+    ----------
+    min_score : float, optional
+        If given, only return assets scoring at least this much.
+    conn : sqlite3.Connection, optional
+        Existing connection to 'assets.db'. If None, one is opened and closed.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by `asset_id`: 'score', 'rows_checked', 'rows_quarantined' and the
+        per-check issue counts. Assets never validated are absent.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_db_connection('assets.db', print_statements=False)
+        close_conn = True
+
+    query = "SELECT * FROM price_quality"
+    params = ()
+    if min_score is not None:
+        query += " WHERE score >= ?"
+        params = (float(min_score),)
+    scores = pd.read_sql_query(query, conn, params=params).set_index('asset_id')
+
+    if close_conn:
+        conn.close()
+    return scores
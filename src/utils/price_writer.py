@@ -0,0 +1,191 @@
+# src/utils/price_writer.py
+
+"""
+Single-writer SQLite sink for pipelined price ETL.
+
+Fetch workers (threads, or the `download_bars` event loop) hand finished frames
+to `PriceWriter.put`. The frames go onto a bounded queue, and one writer thread
+owns the only write connection. It applies each frame with `insert_price_bars`
+and commits when `commit_rows` rows are pending or `commit_interval` seconds
+have passed since the last commit. Network waits and disk commits overlap
+instead of serializing each other, and SQLite never sees competing writers.
+`update_daily_prices` and `run_backfill` write through it.
+
+When the queue is full, `put` blocks. This backpressure keeps memory bounded
+when the disk is slower than the network. `close` (or leaving the `with`
+block) drains the queue, commits what is pending and closes the connection.
+
+Bookkeeping that must commit together with the rows (e.g. backfill checkpoints)
+is passed as `put(..., on_write=...)`, and other statements as `submit(fn)`; both
+run on the writer connection in queue order. `flush` waits until everything
+queued so far is committed.
+
+Examples
+--------
+>>> with PriceWriter() as writer:
+...     download_bars(tickers, start, end, on_result=lambda s, df: writer.put(tickers_dict[s], df, s))
+>>> writer.metrics()
+{'items': 5012, 'rows': 1250331, 'commits': 41, 'queue_depth': 0, 'max_queue_depth': 256, ...}
+"""
+
+import queue
+import threading
+import time
+
+from src.utils import ingest_telemetry
+from src.utils.db_utils import get_db_connection, ensure_schema
+from src.utils.price_store import insert_price_bars
+
+_STOP = object()
+
+
+class PriceWriter:
+    """
+    Bounded-queue writer thread for `asset_prices`.
+
+    Parameters
+    ----------
+    db_name : str, optional
+        Database file under DB_DIR (or an absolute path) (default: 'assets.db').
+    queue_size : int, optional
+        Frames buffered before `put` blocks (default: 256).
+    commit_rows : int, optional
+        Commit once this many rows have been written since the last commit (default: 20000).
+    commit_interval : float, optional
+        Commit at least this often while rows are pending, in seconds (default: 2.0).
+    """
+
+    def __init__(self, db_name='assets.db', queue_size=256, commit_rows=20000, commit_interval=2.0):
+        self.db_name = db_name
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval
+        self.changed = set()
+        self.errors = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats = {
+            'items': 0, 'rows': 0, 'commits': 0, 'max_queue_depth': 0,
+            'put_wait_seconds': 0.0, 'write_seconds': 0.0, 'commit_seconds': 0.0,
+        }
+        self._lock = threading.Lock()
+        self._started = self._finished = None
+        self._thread = threading.Thread(target=self._run, name='price-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, asset_id, frame, symbol=None, on_write=None):
+        """
+        Queue one asset's bars for writing; blocks while the queue is full.
+
+        `on_write(conn, rows)` runs on the writer connection after the bars are
+        inserted, in the same transaction. It is skipped if the insert fails (see
+        `errors`). With `on_write`, an empty frame is still queued for the callback.
+        """
+        if (frame is None or frame.empty) and on_write is None:
+            return
+        self._enqueue((asset_id, frame, symbol, on_write))
+
+    def submit(self, fn):
+        """Queue `fn(conn)` to run on the writer connection, in order with the frames."""
+        self._enqueue((None, None, None, lambda conn, rows: fn(conn)))
+
+    def flush(self):
+        """Block until everything queued so far is written and committed."""
+        done = threading.Event()
+        self._enqueue(done)
+        done.wait()
+
+    def _enqueue(self, item):
+        if not self._thread.is_alive():
+            raise RuntimeError("PriceWriter is closed.")
+        wait_start = time.perf_counter()
+        self._queue.put(item)
+        with self._lock:
+            self._stats['put_wait_seconds'] += time.perf_counter() - wait_start
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue.qsize())
+
+    def _run(self):
+        conn = get_db_connection(self.db_name, print_statements=False)
+        conn.execute("PRAGMA journal_mode=WAL")  # Fetch workers keep reading while the writer holds a transaction
+        ensure_schema(conn)
+        self._started = time.perf_counter()
+        pending, dirty, last_commit = 0, False, time.perf_counter()
+
+        def commit():
+            commit_start = time.perf_counter()
+            with ingest_telemetry.stage('write'):
+                conn.commit()
+            with self._lock:
+                self._stats['commits'] += 1
+                self._stats['commit_seconds'] += time.perf_counter() - commit_start
+
+        while True:
+            timeout = max(self.commit_interval - (time.perf_counter() - last_commit), 0.01) if dirty else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if isinstance(item, threading.Event):
+                if dirty:
+                    commit()
+                    pending, dirty, last_commit = 0, False, time.perf_counter()
+                item.set()
+                continue
+            if item is not None:
+                asset_id, frame, symbol, on_write = item
+                write_start = time.perf_counter()
+                try:
+                    rows = insert_price_bars(conn, asset_id, frame) if frame is not None and not frame.empty else 0
+                    if on_write is not None:
+                        on_write(conn, rows)
+                except Exception as e:
+                    self.errors[symbol or asset_id] = str(e)
+                    rows = 0
+                if frame is not None:
+                    with self._lock:
+                        self._stats['items'] += 1
+                        self._stats['rows'] += rows
+                        self._stats['write_seconds'] += time.perf_counter() - write_start
+                if rows:
+                    self.changed.add(symbol or asset_id)
+                    pending += rows
+                dirty = dirty or rows > 0 or on_write is not None
+            if dirty and (pending >= self.commit_rows or time.perf_counter() - last_commit >= self.commit_interval):
+                commit()
+                pending, dirty, last_commit = 0, False, time.perf_counter()
+
+        if dirty:
+            commit()
+        conn.close()
+        self._finished = time.perf_counter()
+
+    def metrics(self):
+        """
+        Writer throughput and queue state.
+
+        Returns
+        -------
+        dict
+            'items', 'rows', 'commits', 'queue_depth', 'max_queue_depth',
+            'put_wait_seconds' (producer time blocked on a full queue),
+            'write_seconds', 'commit_seconds', 'elapsed_seconds' and 'rows_per_second'.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        elapsed = ((self._finished or time.perf_counter()) - self._started) if self._started else 0.0
+        stats['queue_depth'] = self._queue.qsize()
+        stats['elapsed_seconds'] = elapsed
+        stats['rows_per_second'] = stats['rows'] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+    def close(self):
+        """Write everything queued, commit and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,87 @@
+# src/utils/rate_limit.py
+
+"""
+Token-bucket rate limiting shared by threaded and asyncio API clients.
+
+A single `TokenBucket` can be shared by every worker that talks to the same API
+account, so the combined request rate never exceeds the account quota regardless
+of how many workers are running.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts up to `capacity`.
+
+    Parameters
+    ----------
+    rate : float
+        Sustained tokens added per second.
+    capacity : float, optional
+        Maximum tokens held (burst size). Defaults to `rate`, i.e. one second of burst.
+
+    Examples
+    --------
+    >>> bucket = TokenBucket.per_minute(200)
+    >>> bucket.acquire()            # blocking, thread-safe
+    >>> await bucket.acquire_async()  # inside a coroutine
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute, burst=None):
+        """Build a bucket from a per-minute quota (Alpaca quotes limits per minute)."""
+        return cls(requests_per_minute / 60.0, capacity=burst)
+
+    def set_rate(self, rate, capacity=None):
+        """Change the sustained rate (and optionally the burst size) in place."""
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self, tokens):
+        """Take `tokens` if available; otherwise return the seconds to wait before retrying."""
+        with self._lock:
+            if tokens > self.capacity:
+                raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity:g}.")
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block the calling thread until `tokens` are available, then take them."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Wait without blocking the event loop until `tokens` are available."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
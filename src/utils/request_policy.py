@@ -0,0 +1,309 @@
+# src/utils/request_policy.py
+
+"""
+Shared request policy for Alpaca REST calls: pacing, retries and a circuit breaker.
+
+`install_request_policy(client)` routes every HTTP request of an
+`alpaca_trade_api` REST client through a `RequestPolicy`. The SDK's own
+fixed-wait retry is switched off. `get_alpaca_client` installs the process-wide
+policy (`get_request_policy()`), so every helper in `alpaca_utils` shares one
+budget. For each request the policy:
+
+- paces it with a token bucket sized to the account quota. The bucket follows
+  the `X-RateLimit-Limit` header, and when `X-RateLimit-Remaining` falls below
+  `reserve` of the limit, requests wait for `X-RateLimit-Reset` instead of
+  running into 429s;
+- retries 429, 5xx and connection errors with full-jitter exponential backoff,
+  honouring `Retry-After`;
+- counts consecutive failures (5xx and connection errors, not throttling).
+  After `failure_threshold` of them the circuit opens and calls fail fast with
+  `CircuitOpenError` for `cooldown` seconds. One trial request is then let
+  through (half-open), and its outcome closes or re-opens the circuit.
+
+Counters are kept per endpoint. Requests made inside `policy.scope(name)`
+(every public `alpaca_utils` helper, via `tracked`) are attributed to `name`;
+others to their method and path, with symbols and ids normalized. The counters
+are requests, successes, failures, throttled, retries, latency, plus calls and
+call_seconds for tracked functions. `policy.stats_frame()` returns them as a
+DataFrame.
+"""
+
+import functools
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+from src.utils import ingest_telemetry
+from src.utils.rate_limit import TokenBucket
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+_SYMBOL_SEGMENT = re.compile(r'^[A-Z][A-Z.]*$')
+_ID_SEGMENT = re.compile(r'^[0-9a-fA-F-]{16,}$')
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+def endpoint_label(method, url):
+    """'GET /v2/stocks/{symbol}/bars' for 'GET https://.../v2/stocks/AAPL/bars?...'."""
+    segments = [
+        '{symbol}' if _SYMBOL_SEGMENT.match(s) else '{id}' if _ID_SEGMENT.match(s) else s
+        for s in urlsplit(str(url)).path.split('/')
+    ]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class RequestPolicy:
+    """
+    Adaptive pacing, jittered retries and a circuit breaker for one API account.
+
+    Parameters
+    ----------
+    requests_per_minute : int, optional
+        Initial quota; replaced by `X-RateLimit-Limit` once a response carries it (default: 200).
+    max_retries : int, optional
+        Retries per request on 429/5xx/connection errors (default: 5).
+    backoff_base, backoff_cap : float, optional
+        Retry `n` waits uniform(0, min(cap, base * 2**n)) seconds (defaults: 0.5, 30).
+    failure_threshold : int, optional
+        Consecutive failures that open the circuit (default: 5).
+    cooldown : float, optional
+        Seconds the circuit stays open before a trial request (default: 30).
+    reserve : float, optional
+        Share of the quota kept in reserve before waiting for the window reset (default: 0.05).
+    limit_window : float, optional
+        Seconds the `X-RateLimit-Limit` quota covers (default: 60, Alpaca's per-minute quota).
+    seed : int, optional
+        Seed for the backoff jitter.
+    """
+
+    def __init__(self, requests_per_minute=200, max_retries=5, backoff_base=0.5, backoff_cap=30.0,
+                 failure_threshold=5, cooldown=30.0, reserve=0.05, limit_window=60.0, seed=None):
+        self.bucket = TokenBucket.per_minute(requests_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.reserve = reserve
+        self.limit_window = limit_window
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._paused_until = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+
+    # ------------------------------------------------------------- counters
+
+    def _count(self, endpoint, **increments):
+        with self._lock:
+            row = self._stats.setdefault(endpoint, {
+                'calls': 0, 'requests': 0, 'successes': 0, 'failures': 0, 'throttled': 0, 'retries': 0,
+                'latency_seconds': 0.0, 'max_latency': 0.0, 'call_seconds': 0.0,
+            })
+            for key, value in increments.items():
+                if key == 'max_latency':
+                    row[key] = max(row[key], value)
+                else:
+                    row[key] += value
+
+    @contextmanager
+    def scope(self, name):
+        """Attribute requests made by this thread inside the block to `name`, and time the block."""
+        previous = getattr(self._local, 'scope', None)
+        self._local.scope = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.scope = previous
+            self._count(name, calls=1, call_seconds=time.perf_counter() - start)
+
+    def stats(self):
+        """{endpoint: counters} snapshot."""
+        with self._lock:
+            return {endpoint: dict(row) for endpoint, row in self._stats.items()}
+
+    def stats_frame(self):
+        """Counters as a DataFrame indexed by endpoint, with mean request latency."""
+        frame = pd.DataFrame.from_dict(self.stats(), orient='index')
+        if not frame.empty:
+            frame['mean_latency'] = frame['latency_seconds'] / frame['requests'].where(frame['requests'] > 0)
+        return frame.sort_index()
+
+    # --------------------------------------------------------------- breaker
+
+    def _admit(self):
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    raise CircuitOpenError(f"Circuit open after {self._failures} consecutive failures.")
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'half_open':
+                if self._trial_in_flight:
+                    raise CircuitOpenError("Circuit half-open; trial request in flight.")
+                self._trial_in_flight = True
+
+    def _record_outcome(self, failed):
+        with self._lock:
+            if not failed:
+                self._failures = 0
+                self.state = 'closed'
+            else:
+                self._failures += 1
+                if self.state == 'half_open' or self._failures >= self.failure_threshold:
+                    self.state = 'open'
+                    self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    # ---------------------------------------------------------------- pacing
+
+    def _adapt(self, headers):
+        try:
+            limit = int(headers['X-RateLimit-Limit'])
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = float(headers['X-RateLimit-Reset'])
+        except (KeyError, TypeError, ValueError):
+            return
+        if limit > 0 and abs(limit / self.limit_window - self.bucket.rate) > 1e-9:
+            self.bucket.set_rate(limit / self.limit_window)
+        if remaining <= self.reserve * limit:
+            self._pause(reset - time.time())
+
+    def _pause(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_turn(self):
+        with ingest_telemetry.stage('wait'):
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.bucket.acquire()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+        return self._random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    # --------------------------------------------------------------- request
+
+    def request(self, send, endpoint):
+        """
+        Run `send()` (returning a `requests.Response`) under the policy.
+
+        Returns the last response, which may still be an error status once the
+        retries are used up; connection errors are re-raised after the last retry.
+        """
+        endpoint = getattr(self._local, 'scope', None) or endpoint
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            self._wait_turn()
+            start = time.perf_counter()
+            try:
+                resp = send()
+            except (requests.ConnectionError, requests.Timeout):
+                latency = time.perf_counter() - start
+                self._count(endpoint, requests=1, failures=1, latency_seconds=latency, max_latency=latency)
+                ingest_telemetry.observe('request', latency)
+                ingest_telemetry.count(requests=1)
+                self._record_outcome(failed=True)
+                if attempt == self.max_retries:
+                    raise
+                self._count(endpoint, retries=1)
+                ingest_telemetry.count(retries=1)
+                with ingest_telemetry.stage('wait'):
+                    time.sleep(self.backoff(attempt))
+                continue
+
+            latency = time.perf_counter() - start
+            self._count(endpoint, requests=1, latency_seconds=latency, max_latency=latency)
+            ingest_telemetry.observe('request', latency)
+            ingest_telemetry.count(requests=1)
+            self._adapt(resp.headers)
+            if resp.status_code not in RETRY_STATUSES:
+                self._count(endpoint, **({'successes': 1} if resp.status_code < 400 else {'failures': 1}))
+                self._record_outcome(failed=False)
+                return resp
+
+            throttled = resp.status_code == 429
+            self._count(endpoint, **({'throttled': 1} if throttled else {'failures': 1}))
+            ingest_telemetry.count(throttled=int(throttled))
+            self._record_outcome(failed=not throttled)
+            if attempt == self.max_retries:
+                return resp
+            self._count(endpoint, retries=1)
+            ingest_telemetry.count(retries=1)
+            wait = self.backoff(attempt)
+            try:
+                wait = max(wait, float(resp.headers.get('Retry-After', 0)))
+            except ValueError:
+                pass
+            self._pause(wait)
+        return resp
+
+
+def install_request_policy(alpaca_client, policy=None):
+    """
+    Route every request of an `alpaca_trade_api` REST client through `policy`.
+
+    Parameters
+    ----------
+    alpaca_client : REST
+        Client to instrument (idempotent).
+    policy : RequestPolicy, optional
+        Defaults to the process-wide `get_request_policy()`.
+
+    Returns
+    -------
+    REST
+        The same client.
+    """
+    if getattr(alpaca_client, '_request_policy', None) is not None:
+        return alpaca_client
+    policy = policy or get_request_policy()
+    session_request = alpaca_client._session.request
+
+    def request(method, url, **kwargs):
+        return policy.request(lambda: session_request(method, url, **kwargs), endpoint_label(method, url))
+
+    alpaca_client._retry = 0  # The policy retries; the SDK's fixed 3 s wait would stack on top
+    alpaca_client._session.request = request
+    alpaca_client._request_policy = policy
+    return alpaca_client
+
+
+def tracked(func):
+    """Decorator: run `func` in a `scope` of the client's policy (or the default one) named after it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        client = kwargs.get('alpaca_client', args[0] if args else None)
+        policy = getattr(client, '_request_policy', None) or get_request_policy()
+        with policy.scope(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+_default_policy = None
+_default_lock = threading.Lock()
+
+
+def get_request_policy():
+    """Process-wide `RequestPolicy`, created on first use."""
+    global _default_policy
+    with _default_lock:
+        if _default_policy is None:
+            _default_policy = RequestPolicy()
+        return _default_policy